@@ -0,0 +1,92 @@
+"""
+generate_walls 벤치마크 - 기존 파이썬 루프 vs 형태학적 팽창(dilation)
+
+사용법:
+    python backend/benchmarks/bench_generate_walls.py
+    python backend/benchmarks/bench_generate_walls.py 150 300 600 1000
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from map_templates.base import MapTemplate, Tile, TileGrid
+
+
+def legacy_generate_walls(map_array: np.ndarray):
+    """기존 구현 (셀마다 3x3 이웃을 파이썬 set으로 검사) - 비교용"""
+    s = map_array.shape[0]
+    new_map = map_array.copy()
+    walkable = {Tile.FLOOR, Tile.COVER_HALF, Tile.COVER_FULL, Tile.BOX,
+               Tile.SITE_A, Tile.SITE_B, Tile.SPAWN_ATK, Tile.SPAWN_DEF, 
+               Tile.RAMP, Tile.PILLAR}
+    
+    for y in range(s):
+        for x in range(s):
+            if map_array[y, x] == Tile.VOID:
+                for dy in range(-1, 2):
+                    for dx in range(-1, 2):
+                        ny, nx = y + dy, x + dx
+                        if 0 <= ny < s and 0 <= nx < s:
+                            if map_array[ny, nx] in walkable:
+                                new_map[y, x] = Tile.WALL
+                                break
+                    if new_map[y, x] == Tile.WALL:
+                        break
+    
+    map_array[:] = new_map
+
+
+def build_test_map(s: int, seed: int = 0) -> np.ndarray:
+    """방 + 복도로 이루어진 테스트 맵 (150 맵과 비슷한 밀도)"""
+    np.random.seed(seed)
+    m = TileGrid(s)
+    rooms = {}
+    
+    room_count = max(12, 16 * (s * s) // (150 * 150))
+    for i in range(room_count):
+        w = np.random.randint(10, 28)
+        h = np.random.randint(10, 28)
+        x = np.random.randint(2, s - w - 2)
+        y = np.random.randint(2, s - h - 2)
+        MapTemplate.create_room(m, rooms, f"R{i}", x, y, w, h, Tile.SITE_A if i % 7 == 0 else None)
+    
+    names = [n for n in rooms if not n.startswith('_')]
+    for a, b in zip(names, names[1:]):
+        MapTemplate.connect_rooms(m, rooms, a, b, np.random.randint(4, 7))
+    
+    return m
+
+
+def bench(fn, m: np.ndarray, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        work = m.copy()
+        t0 = time.perf_counter()
+        fn(work)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(sizes):
+    print(f"{'size':>6} {'legacy (s)':>12} {'dilation (s)':>14} {'speedup':>9}  same")
+    for s in sizes:
+        m = build_test_map(s)
+        
+        legacy_map = m.copy()
+        legacy_generate_walls(legacy_map)
+        new_map = m.copy()
+        MapTemplate.generate_walls(new_map)
+        same = np.array_equal(legacy_map, new_map)
+        
+        t_legacy = bench(legacy_generate_walls, m, repeat=1)
+        t_new = bench(MapTemplate.generate_walls, m, repeat=5)
+        print(f"{s:>6} {t_legacy:>12.4f} {t_new:>14.5f} {t_legacy / t_new:>8.0f}x  {same}")
+
+
+if __name__ == '__main__':
+    sizes = [int(a) for a in sys.argv[1:]] or [150, 300, 600]
+    main(sizes)
@@ -0,0 +1,88 @@
+"""
+post-process 세션 검사 - 세션 응답이 일반 /post-process/walls, /post-process/cliff와 같은지 확인
+
+1. 세션 첫 응답 == 같은 objects의 일반 응답 (id까지 그대로)
+2. 레벨에서 id가 겹치는 바닥을 delta로 삭제한 뒤 세션 상태 == 삭제한 objects의 일반 응답
+
+사용법:
+    python backend/benchmarks/check_post_process_sessions.py
+    python backend/benchmarks/check_post_process_sessions.py Village_01.json my_level.json
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import map_api
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+ROUTES = (('/post-process/walls', 'walls'), ('/post-process/cliff', 'cliffs'))
+
+
+def post(client, route: str, body: dict) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = client.post(route, json=body)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def canonical(item: dict) -> tuple:
+    """id/체인 시작점과 무관한 비교용 키 (증분 결과는 id와 닫힌 체인 시작점이 다를 수 있음)"""
+    points = [(p['x'], p['y']) for p in item['points']]
+    if item.get('closed'):
+        ring = points[:-1]
+        start = ring.index(min(ring))
+        points = ring[start:] + ring[:start]
+    return tuple(points), item.get('closed'), item.get('depth'), item.get('fromHeight')
+
+
+def check_level(client, name: str, objects: list) -> bool:
+    ok = True
+    floor_ids = Counter(obj.get('id') for obj in map_api.post_process_floors(objects))
+    duplicates = [floor_id for floor_id, count in floor_ids.items()
+                  if count > 1 and map_api.is_session_floor_id(floor_id)]
+
+    for route, kind in ROUTES:
+        session = f'check-{name}'
+        full = post(client, route, {'objects': objects, 'options': {}})[kind]
+        first = post(client, route, {'objects': objects, 'options': {}, 'session': session})[kind]
+        same_first = first == full
+
+        same_delta = None
+        if duplicates:
+            state = {item['id']: item for item in first}
+            delta = post(client, route, {'session': session, 'options': {},
+                                         'delta': {'removed': duplicates}})
+            for item_id in delta['removed']:
+                del state[item_id]
+            state.update((item['id'], item) for item in delta['added'])
+            rest = [obj for obj in objects if obj.get('id') not in duplicates]
+            expected = post(client, route, {'objects': rest, 'options': {}})[kind]
+            same_delta = (sorted(map(canonical, state.values()))
+                          == sorted(map(canonical, expected)))
+
+        ok = ok and same_first and same_delta is not False
+        print(f"{name:>20} {kind:>7} {len(full):>7} {str(same_first):>7} {str(same_delta):>7}")
+    return ok
+
+
+def main(paths):
+    client = map_api.app.test_client()
+    print(f"{'level':>20} {'kind':>7} {'items':>7} {'first':>7} {'delta':>7}")
+    ok = True
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            objects = json.load(f)['objects']
+        ok = check_level(client, os.path.splitext(os.path.basename(path))[0], objects) and ok
+    return ok
+
+
+if __name__ == '__main__':
+    paths = sys.argv[1:] or [os.path.join(ROOT, 'Village_01.json'), os.path.join(ROOT, 'Village_02.json')]
+    sys.exit(0 if main(paths) else 1)
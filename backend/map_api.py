@@ -10,15 +10,24 @@ import numpy as np
 import random
 import sys
 import os
-from typing import List, Tuple, Set
-from collections import deque
+import json
+import hashlib
+import threading
+import time
+import math
+import multiprocessing
+from multiprocessing.connection import wait
+from functools import cached_property
+from collections import OrderedDict
+from scipy import ndimage
 
 sys.path.insert(0, os.path.dirname(__file__))
 
 from map_templates.procedural_v2 import ProceduralV2Template
 from map_templates.procedural_v3 import ProceduralV3Template
 from map_templates.procedural_vector import generate_vector_map
-from map_templates.base import Tile
+from map_templates.base import TileGrid, WALKABLE_LUT
+from map_templates.metrics import compute_timing_metrics, score_candidate, distance_field
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "OPTIONS"]}})
@@ -28,15 +37,12 @@ class TileMapConverter:
     """타일맵 → 개별 방/통로 폴리곤 (경계 접합)"""
     
     SCALE = 32
-    WALKABLE = {Tile.FLOOR}
-    
-    for attr in ['COVER', 'COVER_HALF', 'COVER_FULL', 'BOX']:
-        if hasattr(Tile, attr):
-            WALKABLE.add(getattr(Tile, attr))
+    CORRIDOR_SPLIT_TILES = 60  # 이보다 큰 통로는 분할
     
     def __init__(self, tile_map: np.ndarray, rooms: dict, scale_factor: float = 1.0):
         # 타일맵의 작은 구멍 채우기
-        self.map = self._fill_small_holes(tile_map)
+        self.map = TileGrid.from_array(self._fill_small_holes(tile_map))
+        self.walkable = self.map.mask(WALKABLE_LUT)
         self.rooms = rooms
         self.scale = self.SCALE * scale_factor
         self.size = tile_map.shape[0]
@@ -54,11 +60,16 @@ class TileMapConverter:
         # 1. 마커
         self._add_markers()
         
-        # 2. 각 방을 개별 폴리곤으로
-        self._add_room_polygons()
+        # 2. 방/통로 영역 라벨 래스터 → 모든 영역 외곽선을 한 번에 추적
+        self._build_owner_raster()
+        self._build_corridor_regions()
+        contours = self._trace_contours(self.regions)
+        
+        # 3. 각 방을 개별 폴리곤으로
+        self._add_room_polygons(contours)
         
-        # 3. 통로 (방에 속하지 않는 영역)
-        self._add_corridor_polygons()
+        # 4. 통로 (방에 속하지 않는 영역)
+        self._add_corridor_polygons(contours)
         
         return self.objects
     
@@ -111,66 +122,87 @@ class TileMapConverter:
                     'label': name.upper().replace('_', ' ')
                 })
     
-    def _add_room_polygons(self):
-        """각 방을 개별 폴리곤으로 (겹침 방지)"""
-        # 방 우선순위: SITE > SPAWN > CHOKE > 나머지
-        priority_order = []
-        for name in self.rooms.keys():
-            if 'SITE' in name.upper():
-                priority_order.append((0, name))
-            elif 'SPAWN' in name.upper() or 'ATK' in name.upper() or 'DEF' in name.upper():
-                priority_order.append((1, name))
-            elif 'CHOKE' in name.upper():
-                priority_order.append((2, name))
-            else:
-                priority_order.append((3, name))
-        
-        priority_order.sort(key=lambda x: x[0])
-        
-        # 이미 할당된 타일 추적
-        assigned_tiles = set()
-        
-        for _, name in priority_order:
+    @staticmethod
+    def _room_priority(name: str) -> int:
+        """방 우선순위: SITE > SPAWN > CHOKE > 나머지 (작을수록 먼저)"""
+        upper = name.upper()
+        if 'SITE' in upper:
+            return 0
+        if 'SPAWN' in upper or 'ATK' in upper or 'DEF' in upper:
+            return 1
+        if 'CHOKE' in upper:
+            return 2
+        return 3
+    
+    def _build_owner_raster(self):
+        """
+        방 소유 라벨 래스터 (겹침 방지)
+        
+        우선순위 순서로 방 사각형의 미할당 walkable 타일을 칠함.
+        - self.owner: int32 (0 = 미할당, i = self.room_labels[i] 방)
+        - self.in_room: 어느 방 사각형에든 들어가는 타일 (통로 판정용)
+        walkable 타일이 4개 미만인 방은 칠하지 않음 (폴리곤도 만들지 않음)
+        """
+        self.owner = np.zeros(self.map.shape, dtype=np.int32)
+        self.in_room = np.zeros(self.map.shape, dtype=bool)
+        self.room_labels = {}
+        
+        order = sorted(self.rooms.keys(), key=self._room_priority)
+        for label, name in enumerate(order, start=1):
             room = self.rooms[name]
             rx = room.get('x', 0)
             ry = room.get('y', 0)
             rw = room.get('w', 10)
             rh = room.get('h', 10)
             
-            # 방 내의 walkable 타일 수집 (이미 할당된 타일 제외)
-            tiles = set()
-            for y in range(ry, min(ry + rh, self.size)):
-                for x in range(rx, min(rx + rw, self.size)):
-                    if 0 <= y < self.size and 0 <= x < self.size:
-                        if self.map[y, x] in self.WALKABLE:
-                            if (y, x) not in assigned_tiles:
-                                tiles.add((y, x))
+            area = (slice(max(ry, 0), min(ry + rh, self.size)),
+                    slice(max(rx, 0), min(rx + rw, self.size)))
+            self.in_room[area] = True
             
-            if len(tiles) < 4:
+            # 방 내의 walkable 타일 (이미 할당된 타일 제외)
+            free = self.walkable[area] & (self.owner[area] == 0)
+            if np.count_nonzero(free) < 4:
                 continue
             
-            # 할당된 타일로 마킹
-            assigned_tiles.update(tiles)
+            self.owner[area][free] = label
+            self.room_labels[label] = name
+    
+    def _build_corridor_regions(self):
+        """
+        통로 영역을 방 라벨 뒤 번호로 붙인 영역 래스터 생성
+        
+        - self.regions: int32 (0 = 없음, 방 라벨 + 통로 라벨)
+        - self.corridor_labels: 통로 라벨 (생성 순서)
+        """
+        self.regions = self.owner.copy()
+        self.corridor_labels = []
+        next_label = len(self.rooms) + 1
+        
+        # 어느 방 사각형에도 속하지 않은 walkable 타일 → 4방향 연결 요소
+        components, count = ndimage.label(self.walkable & ~self.in_room)
+        
+        for index, area in enumerate(ndimage.find_objects(components), start=1):
+            region = components[area] == index
+            size = np.count_nonzero(region)
             
-            # 외곽선 추출
-            contour = self._extract_contour(tiles)
-            if len(contour) < 3:
+            if size < 4:
                 continue
             
-            simplified = self._simplify_contour(contour)
-            if len(simplified) < 3:
-                simplified = contour
-            
-            # 폴리곤 생성
-            points = []
-            for ty, tx in simplified:
-                wx = (tx - self.size/2) * self.scale
-                wy = (ty - self.size/2) * self.scale
-                points.append({'x': wx, 'y': wy, 'z': 0})
-            
-            xs = [p['x'] for p in points]
-            ys = [p['y'] for p in points]
+            # 통로가 너무 길면 분할 (25타일 = 25m = 5초)
+            if size > self.CORRIDOR_SPLIT_TILES:  # 대략 25m 이상
+                pieces = self._split_long_corridor(region)
+            else:
+                pieces = region.astype(np.int32)
             
+            target = self.regions[area]
+            for piece in np.unique(pieces[pieces > 0]):
+                target[pieces == piece] = next_label
+                self.corridor_labels.append(next_label)
+                next_label += 1
+    
+    def _add_room_polygons(self, contours: dict):
+        """각 방을 개별 폴리곤으로 (겹침 방지)"""
+        for label, name in self.room_labels.items():
             # 방 타입에 따른 색상
             if 'site' in name.lower():
                 color = 'hsla(45, 50%, 40%, 0.7)'
@@ -179,237 +211,276 @@ class TileMapConverter:
             else:
                 color = 'hsla(200, 50%, 35%, 0.7)'
             
-            self.objects.append({
-                'id': self._get_id(),
-                'type': 'polyfloor',
-                'category': 'floors',
-                'floor': 0,
-                'color': color,
-                'points': points,
-                'x': min(xs),
-                'y': min(ys),
-                'width': max(xs) - min(xs),
-                'height': max(ys) - min(ys),
-                'floorHeight': 0,
-                'closed': True,
-                'label': name.replace('_', ' ')
-            })
+            for polygon in contours.get(label, []):
+                self._add_polyfloor(polygon, color, name.replace('_', ' '))
     
-    def _add_corridor_polygons(self):
+    def _add_corridor_polygons(self, contours: dict):
         """방에 속하지 않는 영역 = 통로"""
-        # 방에 속한 WALKABLE 타일만 마킹 (겹침 방지)
-        room_tiles = set()
-        for name, room in self.rooms.items():
-            rx = room.get('x', 0)
-            ry = room.get('y', 0)
-            rw = room.get('w', 10)
-            rh = room.get('h', 10)
-            
-            for y in range(ry, min(ry + rh, self.size)):
-                for x in range(rx, min(rx + rw, self.size)):
-                    if 0 <= y < self.size and 0 <= x < self.size:
-                        if self.map[y, x] in self.WALKABLE:
-                            room_tiles.add((y, x))
-        
-        # 방에 속하지 않은 walkable 타일
-        corridor_tiles = set()
-        for y in range(self.size):
-            for x in range(self.size):
-                if (y, x) not in room_tiles and self.map[y, x] in self.WALKABLE:
-                    corridor_tiles.add((y, x))
-        
-        if not corridor_tiles:
-            return
-        
-        # 연결된 통로 영역 분리
-        visited = set()
-        corridor_id = 1
-        
-        for start in corridor_tiles:
-            if start in visited:
-                continue
-            
-            # BFS로 연결된 영역 찾기
-            region = set()
-            queue = deque([start])
+        for label in self.corridor_labels:
+            for polygon in contours.get(label, []):
+                self._add_polyfloor(polygon, 'hsla(200, 40%, 30%, 0.7)', '')
+    
+    def _ring_points(self, ring: np.ndarray) -> list:
+        """타일 꼭짓점 (y, x) 배열 → 월드 좌표 점 리스트"""
+        return [{'x': (tx - self.size/2) * self.scale, 'y': (ty - self.size/2) * self.scale, 'z': 0}
+                for ty, tx in ring.tolist()]
+    
+    @staticmethod
+    def _merge_holes(outer: np.ndarray, holes: list) -> np.ndarray:
+        """
+        구멍을 외곽 링에 왕복 다리로 이어 링 하나로 만듦 (keyhole 폴리곤)
+        
+        에디터/3D 뷰어/FBX는 'points' 링 하나만 그리므로 구멍도 그 링 안에 넣어야 함.
+        구멍의 가장 왼쪽 세로 변 중간(y + 0.5)에서 왼쪽으로 수평선을 그어 처음 만나는
+        세로 변에 잇고, 구멍은 왼쪽 것부터 붙여서 다리가 아직 안 붙은 구멍을 지나지 않음.
+        다리는 같은 선을 왕복하므로 even-odd/nonzero 채우기 모두 면적이 그대로.
+        """
+        ring = outer.astype(float).tolist()  # [[y, x], ...]
+        for hole in sorted(holes, key=lambda h: int(h[:, 1].min())):
+            hole = hole.astype(float).tolist()
+            n = len(hole)
+            # hole[0] = 가장 왼쪽-위 꼭짓점, 아래로 이어진 이웃과의 변 중간이 다리 끝
+            y0, x0 = hole[0]
+            a, b = (0, 1) if hole[1][1] == x0 and hole[1][0] > y0 else (n - 1, 0)
+            bridge_y = y0 + 0.5
+            loop = [[bridge_y, x0]] + hole[b:] + hole[:b] + [[bridge_y, x0]]
             
-            while queue:
-                y, x = queue.popleft()
-                if (y, x) in visited:
-                    continue
-                if (y, x) not in corridor_tiles:
-                    continue
-                
-                visited.add((y, x))
-                region.add((y, x))
-                
-                for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                    ny, nx = y + dy, x + dx
-                    if (ny, nx) in corridor_tiles and (ny, nx) not in visited:
-                        queue.append((ny, nx))
-            
-            if len(region) < 4:
-                continue
-            
-            # 통로가 너무 길면 분할 (25타일 = 25m = 5초)
-            if len(region) > 60:  # 대략 25m 이상
-                sub_regions = self._split_long_corridor(region)
-            else:
-                sub_regions = [region]
-            
-            for sub_region in sub_regions:
-                if len(sub_region) < 4:
-                    continue
-                
-                # 외곽선 추출
-                contour = self._extract_contour(sub_region)
-                if len(contour) < 3:
-                    continue
-                
-                simplified = self._simplify_contour(contour)
-                if len(simplified) < 3:
-                    simplified = contour
-                
-                points = []
-                for ty, tx in simplified:
-                    wx = (tx - self.size/2) * self.scale
-                    wy = (ty - self.size/2) * self.scale
-                    points.append({'x': wx, 'y': wy, 'z': 0})
-                
-                xs = [p['x'] for p in points]
-                ys = [p['y'] for p in points]
-                
-                self.objects.append({
-                    'id': self._get_id(),
-                    'type': 'polyfloor',
-                    'category': 'floors',
-                    'floor': 0,
-                    'color': 'hsla(200, 40%, 30%, 0.7)',
-                    'points': points,
-                    'x': min(xs),
-                    'y': min(ys),
-                    'width': max(xs) - min(xs),
-                    'height': max(ys) - min(ys),
-                    'floorHeight': 0,
-                    'closed': True,
-                    'label': ''
-                })
-                corridor_id += 1
-    
-    def _split_long_corridor(self, tiles: Set[Tuple[int, int]]) -> List[Set[Tuple[int, int]]]:
-        """긴 통로를 여러 개로 분할"""
-        if len(tiles) <= 60:
-            return [tiles]
-        
-        # 타일들의 바운딩 박스
-        ys = [t[0] for t in tiles]
-        xs = [t[1] for t in tiles]
-        min_y, max_y = min(ys), max(ys)
-        min_x, max_x = min(xs), max(xs)
-        
-        height = max_y - min_y
-        width = max_x - min_x
-        
-        # 더 긴 축으로 분할
-        if height > width:
-            # 수직 분할
-            mid_y = (min_y + max_y) // 2
-            region1 = {t for t in tiles if t[0] <= mid_y}
-            region2 = {t for t in tiles if t[0] > mid_y}
-        else:
-            # 수평 분할
-            mid_x = (min_x + max_x) // 2
-            region1 = {t for t in tiles if t[1] <= mid_x}
-            region2 = {t for t in tiles if t[1] > mid_x}
-        
-        # 재귀적으로 더 분할
-        result = []
-        for r in [region1, region2]:
-            if len(r) > 60:
-                result.extend(self._split_long_corridor(r))
-            elif len(r) >= 4:
-                result.append(r)
-        
-        return result if result else [tiles]
-    
-    def _extract_contour(self, tiles: Set[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        """타일 집합의 외곽선 추출"""
-        if not tiles:
-            return []
-        
-        edge_map = {}
-        
-        for ty, tx in tiles:
-            if (ty - 1, tx) not in tiles:
-                p1, p2 = (ty, tx), (ty, tx + 1)
-                if p1 not in edge_map: edge_map[p1] = []
-                edge_map[p1].append(p2)
-            
-            if (ty, tx + 1) not in tiles:
-                p1, p2 = (ty, tx + 1), (ty + 1, tx + 1)
-                if p1 not in edge_map: edge_map[p1] = []
-                edge_map[p1].append(p2)
-            
-            if (ty + 1, tx) not in tiles:
-                p1, p2 = (ty + 1, tx + 1), (ty + 1, tx)
-                if p1 not in edge_map: edge_map[p1] = []
-                edge_map[p1].append(p2)
-            
-            if (ty, tx - 1) not in tiles:
-                p1, p2 = (ty + 1, tx), (ty, tx)
-                if p1 not in edge_map: edge_map[p1] = []
-                edge_map[p1].append(p2)
-        
-        if not edge_map:
-            return []
-        
-        start = min(edge_map.keys(), key=lambda p: (p[1], p[0]))
-        contour = [start]
-        current = start
-        used_edges = set()
-        
-        for _ in range(len(tiles) * 4 + 100):
-            if current not in edge_map:
-                break
-            
-            found = False
-            for next_pt in edge_map[current]:
-                edge = (current, next_pt)
-                if edge not in used_edges:
-                    used_edges.add(edge)
-                    current = next_pt
-                    if current == start:
-                        return contour
-                    contour.append(current)
-                    found = True
-                    break
-            
-            if not found:
+            # 왼쪽으로 가장 가까운 세로 변 (반열린 구간 - 다리로 쪼개진 변도 한 번만 맞음)
+            best = None
+            for i in range(len(ring)):
+                (ya, xa), (yb, xb) = ring[i], ring[(i + 1) % len(ring)]
+                if xa == xb < x0 and min(ya, yb) <= bridge_y < max(ya, yb):
+                    if best is None or xa > ring[best][1]:
+                        best = i
+            point = [bridge_y, ring[best][1]]
+            head = ring[:best + 1] if ring[best] != point else ring[:best]
+            tail = ring[best + 1:]
+            after = ring[(best + 1) % len(ring)]
+            ring = head + [point] + loop + ([point] if after != point else []) + tail
+        return np.array(ring)
+    
+    def _add_polyfloor(self, polygon: tuple, color: str, label: str):
+        """(외곽 링, [구멍 링...]) → polyfloor 오브젝트 (구멍은 다리로 이어 'points' 링 하나에 포함)"""
+        outer, holes = polygon
+        points = self._ring_points(self._merge_holes(outer, holes) if holes else outer)
+        
+        xs = [p['x'] for p in points]
+        ys = [p['y'] for p in points]
+        
+        obj = {
+            'id': self._get_id(),
+            'type': 'polyfloor',
+            'category': 'floors',
+            'floor': 0,
+            'color': color,
+            'points': points,
+            'x': min(xs),
+            'y': min(ys),
+            'width': max(xs) - min(xs),
+            'height': max(ys) - min(ys),
+            'floorHeight': 0,
+            'closed': True,
+            'label': label
+        }
+        self.objects.append(obj)
+    
+    def _split_long_corridor(self, region: np.ndarray) -> np.ndarray:
+        """
+        긴 통로를 측지 거리 띠로 분할
+        
+        통로 한쪽 끝(임의 타일에서 가장 먼 타일)에서 통로를 따라 걷는 거리를 재고,
+        거리 순으로 타일 수가 비슷한 띠(약 CORRIDOR_SPLIT_TILES개)로 자름.
+        띠가 갈래길에서 끊기면 연결 요소마다 다른 조각이 되고,
+        4타일 미만 조각은 이웃 조각에 합침 → 모든 조각이 4방향 연결.
+        
+        Args:
+            region: 통로 하나의 bool 마스크 (4방향 연결)
+        
+        Returns:
+            int32 조각 라벨 배열 (0 = 통로 밖)
+        """
+        size = np.count_nonzero(region)
+        
+        # 양끝 찾기 (두 번 BFS)
+        first = np.unravel_index(np.argmax(region), region.shape)
+        end = np.unravel_index(np.argmax(distance_field(region, [first])), region.shape)
+        dist = distance_field(region, [end])
+        
+        # 같은 거리는 같은 띠, 누적 타일 수로 띠 번호 결정
+        n_bands = -(-size // self.CORRIDOR_SPLIT_TILES)
+        counts = np.bincount(dist[region])
+        band_of_dist = (np.cumsum(counts) - counts) * n_bands // size + 1
+        bands = np.zeros(region.shape, dtype=np.int32)
+        bands[region] = band_of_dist[dist[region]]
+        
+        # 띠 안의 연결 요소 = 조각
+        pieces = np.zeros(region.shape, dtype=np.int32)
+        next_piece = 1
+        for band in range(1, n_bands + 1):
+            labels, count = ndimage.label(bands == band)
+            pieces[labels > 0] = labels[labels > 0] + (next_piece - 1)
+            next_piece += count
+        
+        # 작은 조각 타일은 맞닿은 큰 조각 라벨을 받음 (큰 조각 쪽에서 한 칸씩 번짐)
+        small = region & (np.bincount(pieces.ravel())[pieces] < 4)
+        padded = np.pad(pieces, 1)
+        open_padded = np.pad(region & ~small, 1)
+        h, w = region.shape
+        while small.any():
+            grown = False
+            for dy, dx in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                neighbor = (slice(1 + dy, 1 + dy + h), slice(1 + dx, 1 + dx + w))
+                take = small & open_padded[neighbor]
+                if take.any():
+                    padded[1:-1, 1:-1][take] = padded[neighbor][take]
+                    open_padded[1:-1, 1:-1] |= take
+                    small &= ~take
+                    grown = True
+            if not grown:
                 break
         
-        return contour
-    
-    def _simplify_contour(self, contour):
-        if len(contour) <= 3:
-            return contour
-        
-        simplified = [contour[0]]
-        for i in range(1, len(contour) - 1):
-            prev = contour[i - 1]
-            curr = contour[i]
-            next_pt = contour[i + 1]
-            
-            dy1, dx1 = curr[0] - prev[0], curr[1] - prev[1]
-            dy2, dx2 = next_pt[0] - curr[0], next_pt[1] - curr[1]
-            
-            if (dy1, dx1) != (dy2, dx2):
-                simplified.append(curr)
-        
-        simplified.append(contour[-1])
-        if len(simplified) > 1 and simplified[0] == simplified[-1]:
-            simplified = simplified[:-1]
-        
-        return simplified
+        return padded[1:-1, 1:-1]
+    
+    # 변 방향: 0 = +x, 1 = +y, 2 = -x, 3 = -y (타일 좌표, y는 아래로 +)
+    DIR_DY = np.array([0, 1, 0, -1])
+    DIR_DX = np.array([1, 0, -1, 0])
+    
+    @classmethod
+    def _crack_edges(cls, regions: np.ndarray) -> tuple:
+        """
+        라벨 경계의 방향 변 그래프 (crack following)
+        
+        라벨이 바뀌는 타일 경계마다 영역을 오른쪽에 두는 방향 변을 만들고,
+        변 끝점에서 우회전 > 직진 > 좌회전 순으로 같은 라벨의 다음 변을 이음.
+        (대각선으로만 닿은 타일은 별도 링 = 4방향 연결 기준)
+        
+        Args:
+            regions: int 라벨 배열 (0 = 배경)
+        
+        Returns:
+            (sy, sx, d, lab, nxt) - 변 시작 꼭짓점, 방향, 오른쪽 라벨, 다음 변 번호
+            (변이 없으면 None)
+        """
+        h, w = regions.shape
+        padded = np.zeros((h + 2, w + 2), dtype=np.int32)
+        padded[1:-1, 1:-1] = regions
+        
+        # 수평 경계: 위 타일 | 아래 타일 (꼭짓점 행 y = 0..h)
+        above, below = padded[:-1, 1:-1], padded[1:, 1:-1]
+        hy, hx = np.nonzero(above != below)
+        # 수직 경계: 왼쪽 타일 | 오른쪽 타일 (꼭짓점 열 x = 0..w)
+        left, right = padded[1:-1, :-1], padded[1:-1, 1:]
+        vy, vx = np.nonzero(left != right)
+        
+        # 방향 변 (시작 y, 시작 x, 방향, 라벨)
+        sy = np.concatenate([hy, hy, vy, vy + 1])
+        sx = np.concatenate([hx, hx + 1, vx, vx])
+        d = np.concatenate([np.full(hy.size, 0), np.full(hy.size, 2),
+                            np.full(vy.size, 1), np.full(vy.size, 3)])
+        lab = np.concatenate([below[hy, hx],   # 아래 타일의 윗변 →
+                              above[hy, hx],   # 위 타일의 아랫변 ←
+                              left[vy, vx],    # 왼쪽 타일의 오른변 ↓
+                              right[vy, vx]])  # 오른쪽 타일의 왼변 ↑
+        keep = lab > 0
+        sy, sx, d, lab = sy[keep], sx[keep], d[keep], lab[keep]
+        if lab.size == 0:
+            return None
+        
+        # (시작 꼭짓점, 방향) → 변 번호 (방향까지 같으면 오른쪽 타일이 같으므로 유일)
+        stride = w + 1
+        n_edges = lab.size
+        edge_at = np.full((h + 1) * stride * 4, -1, dtype=np.intp)
+        edge_at[(sy * stride + sx) * 4 + d] = np.arange(n_edges)
+        
+        # 다음 변: 우회전 > 직진 > 좌회전
+        end = (sy + cls.DIR_DY[d]) * stride + (sx + cls.DIR_DX[d])
+        nxt = np.full(n_edges, -1, dtype=np.intp)
+        for turn in (1, 0, 3):
+            cand = edge_at[end * 4 + (d + turn) % 4]
+            ok = (nxt < 0) & (cand >= 0)
+            ok[ok] = lab[cand[ok]] == lab[ok]
+            nxt[ok] = cand[ok]
+        
+        return sy, sx, d, lab, nxt
+    
+    @classmethod
+    def _trace_contours(cls, regions: np.ndarray) -> dict:
+        """
+        라벨 래스터의 모든 영역 외곽선/구멍을 한 번에 추적 (_crack_edges 변 그래프)
+        
+        방향이 바뀌는 꼭짓점만 남기므로 결과는 이미 단순화된 상태.
+        
+        Args:
+            regions: int 라벨 배열 (0 = 배경)
+        
+        Returns:
+            {라벨: [(외곽 링, [구멍 링, ...]), ...]} - 링은 꼭짓점 (y, x) int 배열,
+            외곽 링은 면적 큰 순, 각 링은 가장 왼쪽-위 꼭짓점에서 시작
+        """
+        edges = cls._crack_edges(regions)
+        if edges is None:
+            return {}
+        sy, sx, d, lab, nxt = edges
+        n_edges = lab.size
+        
+        # 꼭짓점 = 이전 변과 방향이 다른 변의 시작점
+        prev = np.empty(n_edges, dtype=np.intp)
+        prev[nxt] = np.arange(n_edges)
+        corner = (d[prev] != d).tolist()
+        nxt_list = nxt.tolist()
+        
+        # 링 추출 (변마다 한 번씩 방문)
+        visited = np.zeros(n_edges, dtype=bool)
+        rings = []
+        for e0 in np.flatnonzero(corner).tolist():
+            if visited[e0]:
+                continue
+            ring = []
+            e = e0
+            while not visited[e]:
+                visited[e] = True
+                if corner[e]:
+                    ring.append(e)
+                e = nxt_list[e]
+            rings.append(np.array(ring, dtype=np.intp))
+        
+        outers = {}
+        holes = {}
+        for ring in rings:
+            ys, xs = sy[ring], sx[ring]
+            # 가장 왼쪽-위 꼭짓점에서 시작
+            start = np.lexsort((ys, xs))[0]
+            ys, xs = np.roll(ys, -start), np.roll(xs, -start)
+            # 신발끈 면적: 외곽 > 0, 구멍 < 0 (영역이 항상 오른쪽)
+            area = np.dot(xs, np.roll(ys, -1)) - np.dot(np.roll(xs, -1), ys)
+            first = ring[start]
+            entry = (np.column_stack([ys, xs]), abs(int(area)) / 2, (sy[first], sx[first], d[first]))
+            (outers if area > 0 else holes).setdefault(int(lab[first]), []).append(entry)
+        
+        result = {}
+        for label, label_outers in outers.items():
+            label_outers.sort(key=lambda o: -o[1])
+            polygons = [(ring, []) for ring, _, _ in label_outers]
+            for hole, _, edge in holes.get(label, []):
+                owner = cls._hole_owner(label_outers, edge) if len(polygons) > 1 else 0
+                polygons[owner][1].append(hole)
+            result[label] = polygons
+        return result
+    
+    @classmethod
+    def _hole_owner(cls, outers: list, edge: tuple) -> int:
+        """구멍을 감싸는 외곽 링 중 가장 작은 것의 인덱스"""
+        # 구멍 첫 변의 오른쪽 타일 중심 (영역 안, 경계 위가 아님)
+        y, x, d = (int(v) for v in edge)
+        ty = y - (d >= 2)
+        tx = x - (d in (1, 2))
+        cx, cy = tx + 0.5, ty + 0.5
+        
+        owner = 0
+        for i, (ring, _, _) in enumerate(outers):
+            if point_in_polygon(cx, cy, [(px, py) for py, px in ring.tolist()]):
+                owner = i  # 면적 큰 순이므로 마지막으로 감싼 링이 가장 작음
+        return owner
     
     def _get_id(self):
         id = self.next_id
@@ -417,12 +488,94 @@ class TileMapConverter:
         return id
 
 
+
+# 변 방향(TileMapConverter.DIR_*)별 오른쪽 타일 = 시작 꼭짓점 + 오프셋
+WALL_CELL_DY = np.array([0, 0, -1, -1])
+WALL_CELL_DX = np.array([0, -1, -1, 0])
+
+
+def chain_wall_edges(floor_mask: np.ndarray, heights: np.ndarray = None, offset: float = 0.0) -> list:
+    """
+    floor/void 경계를 최대 길이 폴리라인(벽 체인)으로 이음
+    
+    경계 변은 TileMapConverter._crack_edges로 잇고 (floor가 오른쪽),
+    이어진 두 변의 floor 높이가 다른 꼭짓점에서만 체인을 끊음.
+    끊는 곳이 없는 경계 링은 닫힌 체인 하나가 됨.
+    
+    Args:
+        floor_mask: bool 마스크 (h x w)
+        heights: 타일별 floor 높이 (None = 모두 같은 높이)
+        offset: void 쪽으로 밀어낼 거리 (타일 단위) - 모서리는 양쪽 변을 모두 밀어낸 교점
+    
+    Returns:
+        [(꼭짓점 (x, y) float 배열 (타일 단위), 닫힘 여부, floor 높이), ...]
+        닫힌 체인은 마지막 꼭짓점이 첫 꼭짓점과 같음
+    """
+    edges = TileMapConverter._crack_edges(np.asarray(floor_mask, dtype=np.int32))
+    if edges is None:
+        return []
+    sy, sx, d, _, nxt = edges
+    n_edges = d.size
+    prev = np.empty(n_edges, dtype=np.intp)
+    prev[nxt] = np.arange(n_edges)
+    
+    # 변 오른쪽 floor 타일 → 높이 키
+    if heights is None:
+        keys = np.zeros(n_edges)
+    else:
+        keys = np.asarray(heights)[sy + WALL_CELL_DY[d], sx + WALL_CELL_DX[d]]
+    
+    # 변 시작 꼭짓점 위치: void 쪽(왼쪽) 법선을 들어오는/나가는 변 모두 적용 (직진이면 한 번)
+    turn = d[prev] != d
+    nx, ny = TileMapConverter.DIR_DY[d], -TileMapConverter.DIR_DX[d]
+    nx_in, ny_in = nx[prev], ny[prev]
+    px = sx + offset * (nx + np.where(turn, nx_in, 0))
+    py = sy + offset * (ny + np.where(turn, ny_in, 0))
+    
+    split = keys[prev] != keys
+    vertex = (turn | split).tolist()
+    split_list = split.tolist()
+    nxt_list = nxt.tolist()
+    
+    visited = np.zeros(n_edges, dtype=bool)
+    chains = []
+    
+    # 열린 체인: 높이가 바뀌는 변에서 시작해 다음으로 바뀌는 변의 시작점에서 끝남
+    for e0 in np.flatnonzero(split).tolist():
+        ids = [e0]
+        visited[e0] = True
+        e = nxt_list[e0]
+        while not split_list[e]:
+            visited[e] = True
+            if vertex[e]:
+                ids.append(e)
+            e = nxt_list[e]
+        ids.append(e)
+        chains.append((np.column_stack([px[ids], py[ids]]), False, keys[e0]))
+    
+    # 닫힌 체인: 높이가 한 번도 바뀌지 않는 경계 링
+    for e0 in np.flatnonzero(turn).tolist():
+        if visited[e0]:
+            continue
+        ids = []
+        e = e0
+        while not visited[e]:
+            visited[e] = True
+            if vertex[e]:
+                ids.append(e)
+            e = nxt_list[e]
+        ids.append(e0)
+        chains.append((np.column_stack([px[ids], py[ids]]), True, keys[e0]))
+    
+    return chains
+
 def generate_perimeter_walls_from_tilemap(tile_map, scale_factor: float, offset_x: float, offset_y: float, 
                                           wall_thickness: float = 32, wall_height: float = 128,
-                                          covered_mask=None) -> list:
+                                          covered_mask=None, geometry: 'GeometryCache' = None) -> list:
     """
     타일맵 기반으로 외곽 벽을 생성합니다.
     covered_mask가 제공되면 polyfloor가 실제로 덮는 영역을 기준으로 합니다.
+    geometry가 제공되면 그 coverage를 covered_mask로 사용합니다.
     """
     import numpy as np
     from scipy import ndimage
@@ -437,6 +590,9 @@ def generate_perimeter_walls_from_tilemap(tile_map, scale_factor: float, offset_
     map_center_x = w * tile_size / 2
     map_center_y = h * tile_size / 2
     
+    if covered_mask is None and geometry is not None:
+        covered_mask = geometry.coverage
+    
     # polyfloor가 덮는 영역 마스크 사용 (제공된 경우)
     if covered_mask is not None:
         floor_mask = covered_mask
@@ -449,111 +605,16 @@ def generate_perimeter_walls_from_tilemap(tile_map, scale_factor: float, offset_
     # 벽 오프셋 (void 쪽으로 이동해서 floor 침범 방지)
     wall_offset = wall_thickness / 2
     
-    # 수평 엣지 수집 (위아래 타일 비교)
-    h_edges = []
-    for y in range(h + 1):
-        for x in range(w):
-            above = floor_mask[y - 1, x] if y > 0 else False
-            below = floor_mask[y, x] if y < h else False
-            
-            # 하나는 바닥, 하나는 VOID -> 경계
-            if above != below:
-                px1 = x * tile_size - map_center_x + offset_x
-                py = y * tile_size - map_center_y + offset_y
-                px2 = (x + 1) * tile_size - map_center_x + offset_x
-                
-                # void 쪽으로 오프셋
-                if above and not below:  # 위가 floor, 아래가 void
-                    py += wall_offset
-                else:  # 위가 void, 아래가 floor
-                    py -= wall_offset
-                
-                h_edges.append((px1, py, px2, py))
+    floor_mask = np.asarray(floor_mask, dtype=bool)
     
-    # 수직 엣지 수집 (좌우 타일 비교)
-    v_edges = []
-    for y in range(h):
-        for x in range(w + 1):
-            left = floor_mask[y, x - 1] if x > 0 else False
-            right = floor_mask[y, x] if x < w else False
-            
-            if left != right:
-                px = x * tile_size - map_center_x + offset_x
-                py1 = y * tile_size - map_center_y + offset_y
-                py2 = (y + 1) * tile_size - map_center_y + offset_y
-                
-                # void 쪽으로 오프셋
-                if left and not right:  # 왼쪽이 floor, 오른쪽이 void
-                    px += wall_offset
-                else:  # 왼쪽이 void, 오른쪽이 floor
-                    px -= wall_offset
-                
-                v_edges.append((px, py1, px, py2))
-    
-    # 연속된 엣지 병합 (개선된 버전)
-    def merge_horizontal_edges(edges):
-        """수평 엣지 병합: 같은 y좌표에서 연속된 x를 합침"""
-        if not edges:
-            return []
-        
-        # y좌표 기준으로 그룹화
-        from collections import defaultdict
-        by_y = defaultdict(list)
-        for x1, y, x2, _ in edges:
-            by_y[y].append((x1, x2))
-        
-        merged = []
-        for y, segments in by_y.items():
-            # x1 기준 정렬
-            segments.sort()
-            
-            current_x1, current_x2 = segments[0]
-            for x1, x2 in segments[1:]:
-                # 연속되거나 겹침
-                if x1 <= current_x2 + 1:
-                    current_x2 = max(current_x2, x2)
-                else:
-                    merged.append((current_x1, y, current_x2, y))
-                    current_x1, current_x2 = x1, x2
-            merged.append((current_x1, y, current_x2, y))
-        
-        return merged
-    
-    def merge_vertical_edges(edges):
-        """수직 엣지 병합: 같은 x좌표에서 연속된 y를 합침"""
-        if not edges:
-            return []
-        
-        from collections import defaultdict
-        by_x = defaultdict(list)
-        for x, y1, _, y2 in edges:
-            by_x[x].append((y1, y2))
-        
-        merged = []
-        for x, segments in by_x.items():
-            # y1 기준 정렬
-            segments.sort()
-            
-            current_y1, current_y2 = segments[0]
-            for y1, y2 in segments[1:]:
-                # 연속되거나 겹침
-                if y1 <= current_y2 + 1:
-                    current_y2 = max(current_y2, y2)
-                else:
-                    merged.append((x, current_y1, x, current_y2))
-                    current_y1, current_y2 = y1, y2
-            merged.append((x, current_y1, x, current_y2))
-        
-        return merged
-    
-    h_merged = merge_horizontal_edges(h_edges)
-    v_merged = merge_vertical_edges(v_edges)
-    
-    all_edges = h_merged + v_merged
+    # 경계 링마다 닫힌 폴리라인 하나 (높이 구분 없음)
+    chains = chain_wall_edges(floor_mask, offset=wall_offset / tile_size)
     
     # 벽 오브젝트 생성
-    for x1, y1, x2, y2 in all_edges:
-        length = ((x2 - x1)**2 + (y2 - y1)**2) ** 0.5
+    for points, closed, _ in chains:
+        px = points[:, 0] * tile_size - map_center_x + offset_x
+        py = points[:, 1] * tile_size - map_center_y + offset_y
+        length = np.hypot(np.diff(px), np.diff(py)).sum()
         if length < 10:
             continue
         
@@ -563,15 +624,12 @@ def generate_perimeter_walls_from_tilemap(tile_map, scale_factor: float, offset_
             'category': 'walls',
             'floor': 0,
             'color': '#2a3540',  # 어두운 회색
-            'points': [
-                {'x': x1, 'y': y1},
-                {'x': x2, 'y': y2}
-            ],
-            'x': x1,
-            'y': y1,
+            'points': [{'x': x, 'y': y} for x, y in zip(px.tolist(), py.tolist())],
+            'x': float(px[0]),
+            'y': float(py[0]),
             'thickness': wall_thickness,
             'height': wall_height,
-            'closed': False,
+            'closed': closed,
             'label': ''
         })
         wall_id += 1
@@ -580,12 +638,59 @@ def generate_perimeter_walls_from_tilemap(tile_map, scale_factor: float, offset_
     return walls
 
 
+def gap_rectangles(gaps: np.ndarray) -> list:
+    """
+    그리디 메싱: 행 단위로 연속된 타일 병합 후, 수직으로도 병합
+    
+    Returns:
+        [(x_min, y_min, x_max, y_max), ...] - 타일 좌표, max는 미포함
+    """
+    h, w = gaps.shape
+    rectangles = []  # (x_min, y_min, x_max, y_max)
+    processed = np.zeros_like(gaps, dtype=bool)
+    
+    for y in range(h):
+        x = 0
+        while x < w:
+            if gaps[y, x] and not processed[y, x]:
+                # 수평으로 연속된 타일 찾기
+                x_start = x
+                while x < w and gaps[y, x] and not processed[y, x]:
+                    x += 1
+                x_end = x
+                
+                # 수직으로 확장 가능한지 확인
+                y_end = y + 1
+                can_expand = True
+                while can_expand and y_end < h:
+                    # 같은 x 범위가 모두 gap이고 미처리인지 확인
+                    for tx in range(x_start, x_end):
+                        if not gaps[y_end, tx] or processed[y_end, tx]:
+                            can_expand = False
+                            break
+                    if can_expand:
+                        y_end += 1
+                
+                # 사각형 영역 처리 완료 표시
+                for ty in range(y, y_end):
+                    for tx in range(x_start, x_end):
+                        processed[ty, tx] = True
+                
+                rectangles.append((x_start, y, x_end, y_end))
+            else:
+                x += 1
+    
+    return rectangles
+
+
 def fill_polyfloor_gaps(objects: list, tile_map, scale_factor: float, 
                         offset_x: float, offset_y: float,
-                        wall_thickness: float = 32, wall_height: float = 128) -> list:
+                        wall_thickness: float = 32, wall_height: float = 128,
+                        geometry: 'GeometryCache' = None) -> list:
     """
     polyfloor들 사이의 틈(타일맵에서 walkable인데 polyfloor로 덮이지 않은 영역)을 
     polywall로 채웁니다.
+    geometry가 제공되면 그 floor/coverage 래스터를 다시 계산하지 않고 사용합니다.
     """
     import numpy as np
     from scipy import ndimage
@@ -599,41 +704,14 @@ def fill_polyfloor_gaps(objects: list, tile_map, scale_factor: float,
     map_center_x = w * tile_size / 2
     map_center_y = h * tile_size / 2
     
+    if geometry is None:
+        geometry = GeometryCache(tile_map, objects, scale_factor, offset_x, offset_y)
+    
     # 타일맵에서 walkable 영역
-    walkable_mask = tile_map > 0
+    walkable_mask = geometry.floor
     
     # polyfloor들이 덮는 영역을 래스터화
-    covered = np.zeros((h, w), dtype=bool)
-    
-    for obj in objects:
-        if obj.get('type') != 'polyfloor':
-            continue
-        
-        points = obj.get('points', [])
-        if len(points) < 3:
-            continue
-        
-        # 폴리곤의 점들을 타일 좌표로 변환
-        tile_points = []
-        for p in points:
-            tx = (p['x'] - offset_x + map_center_x) / tile_size
-            ty = (p['y'] - offset_y + map_center_y) / tile_size
-            tile_points.append((tx, ty))
-        
-        # 바운딩 박스
-        xs = [p[0] for p in tile_points]
-        ys = [p[1] for p in tile_points]
-        min_x = max(0, int(min(xs)))
-        max_x = min(w, int(max(xs)) + 1)
-        min_y = max(0, int(min(ys)))
-        max_y = min(h, int(max(ys)) + 1)
-        
-        # 바운딩 박스 내 타일 체크 (점-다각형 테스트)
-        for ty in range(min_y, max_y):
-            for tx in range(min_x, max_x):
-                # 타일 중심이 폴리곤 내부에 있는지 체크
-                if point_in_polygon(tx + 0.5, ty + 0.5, tile_points):
-                    covered[ty, tx] = True
+    covered = geometry.coverage
     
     # 틈 = walkable인데 polyfloor로 덮이지 않은 영역
     gaps = walkable_mask & ~covered
@@ -659,39 +737,7 @@ def fill_polyfloor_gaps(objects: list, tile_map, scale_factor: float,
     print(f"[DEBUG] Found {gap_count} gap tiles between polyfloors", flush=True)
     
     # 그리디 메싱: 행 단위로 연속된 타일 병합 후, 수직으로도 병합
-    rectangles = []  # (x_min, y_min, x_max, y_max)
-    processed = np.zeros_like(gaps, dtype=bool)
-    
-    for y in range(h):
-        x = 0
-        while x < w:
-            if gaps[y, x] and not processed[y, x]:
-                # 수평으로 연속된 타일 찾기
-                x_start = x
-                while x < w and gaps[y, x] and not processed[y, x]:
-                    x += 1
-                x_end = x
-                
-                # 수직으로 확장 가능한지 확인
-                y_end = y + 1
-                can_expand = True
-                while can_expand and y_end < h:
-                    # 같은 x 범위가 모두 gap이고 미처리인지 확인
-                    for tx in range(x_start, x_end):
-                        if not gaps[y_end, tx] or processed[y_end, tx]:
-                            can_expand = False
-                            break
-                    if can_expand:
-                        y_end += 1
-                
-                # 사각형 영역 처리 완료 표시
-                for ty in range(y, y_end):
-                    for tx in range(x_start, x_end):
-                        processed[ty, tx] = True
-                
-                rectangles.append((x_start, y, x_end, y_end))
-            else:
-                x += 1
+    rectangles = gap_rectangles(gaps)
     
     # 병합된 사각형들로 벽 생성 (polyfloor 사용 - 정확한 사각형)
     for x_min, y_min, x_max, y_max in rectangles:
@@ -740,6 +786,342 @@ def point_in_polygon(x: float, y: float, polygon: list) -> bool:
     return inside
 
 
+
+def polygon_spans(rings: list, shape: tuple) -> tuple:
+    """
+    짝수-홀수 규칙 스캔라인 래스터화 (타일 중심 기준, point_in_polygon과 같은 판정)
+    
+    Args:
+        rings: 링 목록 [(N, 2) 배열 (x, y), ...] - 타일 좌표. 외곽과 구멍을 함께 넣으면 구멍이 빠짐
+        shape: (h, w) 래스터 크기
+    
+    Returns:
+        (rows, starts, ends) - 행 rows의 [starts, ends) 타일이 내부 (래스터 범위로 잘림)
+    """
+    h, w = shape
+    empty = np.zeros(0, dtype=np.intp)
+    
+    pi = np.concatenate([np.asarray(r, dtype=float) for r in rings]) if rings else np.zeros((0, 2))
+    pj = np.concatenate([np.roll(np.asarray(r, dtype=float), 1, axis=0) for r in rings]) if rings else pi
+    xi, yi = pi[:, 0], pi[:, 1]
+    xj, yj = pj[:, 0], pj[:, 1]
+    
+    # 변이 가로지르는 스캔라인: (yi > y) != (yj > y), y = ty + 0.5
+    y_lo, y_hi = np.minimum(yi, yj), np.maximum(yi, yj)
+    first = np.clip(np.ceil(y_lo - 0.5), 0, h).astype(np.intp)
+    last = np.clip(np.ceil(y_hi - 0.5), 0, h).astype(np.intp)
+    counts = np.maximum(last - first, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return empty, empty, empty
+    
+    edge = np.repeat(np.arange(counts.size), counts)
+    rows = first[edge] + (np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts))
+    y = rows + 0.5
+    cross = (xj[edge] - xi[edge]) * (y - yi[edge]) / (yj[edge] - yi[edge]) + xi[edge]
+    
+    # 행마다 교차점 정렬 → (0,1), (2,3), ... 쌍이 내부 구간 (행마다 교차 수는 짝수)
+    order = np.lexsort((cross, rows))
+    rows, cross = rows[order], cross[order]
+    rows = rows[0::2]
+    starts = np.clip(np.ceil(cross[0::2] - 0.5), 0, w).astype(np.intp)
+    ends = np.clip(np.ceil(cross[1::2] - 0.5), 0, w).astype(np.intp)
+    
+    keep = starts < ends
+    return rows[keep], starts[keep], ends[keep]
+
+
+def fill_polygon(raster: np.ndarray, rings: list, value=True, combine=None):
+    """
+    폴리곤 내부 타일에 value 기록 (구간 단위 쓰기)
+    
+    Args:
+        raster: 2D 배열 (bool 커버리지 또는 float 높이)
+        rings: polygon_spans와 같은 링 목록
+        combine: None이면 덮어쓰기, ufunc(np.fmax 등)이면 기존 값과 결합
+    """
+    fill_spans(raster, *polygon_spans(rings, raster.shape), value=value, combine=combine)
+
+
+def fill_spans(raster: np.ndarray, rows, starts, ends, value=True, combine=None):
+    """행 rows의 [starts, ends) 구간에 value 기록 (fill_polygon과 같은 규칙)"""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return
+    
+    # 구간 → 평탄 인덱스 (구간 시작 반복 + 구간 내 오프셋)
+    base = np.repeat(rows * raster.shape[1] + starts, lengths)
+    index = base + (np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths))
+    
+    flat = raster.reshape(-1)
+    flat[index] = value if combine is None else combine(flat[index], value)
+
+
+def polyfloor_rings(obj: dict, origin_x: float, origin_y: float, cell_size: float) -> list:
+    """polyfloor 오브젝트의 외곽 + 구멍('holes') → 그리드 좌표 링 목록"""
+    rings = []
+    for ring in [obj.get('points', [])] + obj.get('holes', []):
+        pts = np.array([(p['x'], p['y']) for p in ring], dtype=float)
+        if len(pts) >= 3:
+            rings.append((pts - (origin_x, origin_y)) / cell_size)
+    return rings
+
+# post-process 래스터에 들어가는 바닥 타입 (spawn/objective는 x, y, width, height 사각형)
+POST_PROCESS_FLOOR_TYPES = ['polyfloor', 'spawn-off', 'spawn-def', 'objective']
+
+# 셀 샘플 위치 (x 종류, y 종류) - 0 = 중심, 1 = 안쪽 1px 왼쪽/위, 2 = 안쪽 1px 오른쪽/아래
+# 중심, 좌상, 우상, 좌하, 우하 순서 (먼저 닿은 샘플이 셀 높이를 결정)
+CELL_SAMPLES = [(0, 0), (1, 1), (2, 1), (1, 2), (2, 2)]
+
+
+def sample_polygon_spans(rings: list, ys: np.ndarray, xs: np.ndarray) -> tuple:
+    """
+    정렬된 샘플 좌표 격자 위의 짝수-홀수 스캔라인 (point_in_polygon과 같은 부동소수 판정)
+    
+    샘플 좌표가 정렬되어 있으므로 searchsorted가 공간 인덱스 역할:
+    변마다 가로지르는 행만, 행마다 교차점 사이 열만 찾음 (폴리곤 bbox 밖 셀은 건드리지 않음).
+    
+    Args:
+        rings: 링 목록 [(N, 2) 배열 (x, y), ...] - 픽셀 좌표
+        ys, xs: 행/열 샘플 좌표 (오름차순)
+    
+    Returns:
+        (rows, starts, ends) - 행 rows의 [starts, ends) 샘플이 내부
+    """
+    empty = np.zeros(0, dtype=np.intp)
+    if not rings:
+        return empty, empty, empty
+    pi = np.concatenate(rings)
+    pj = np.concatenate([np.roll(r, 1, axis=0) for r in rings])
+    xi, yi = pi[:, 0], pi[:, 1]
+    xj, yj = pj[:, 0], pj[:, 1]
+    
+    # (yi > y) != (yj > y)  <=>  min(yi, yj) <= y < max(yi, yj)
+    first = np.searchsorted(ys, np.minimum(yi, yj), side='left')
+    last = np.searchsorted(ys, np.maximum(yi, yj), side='left')
+    counts = last - first
+    total = int(counts.sum())
+    if total == 0:
+        return empty, empty, empty
+    
+    edge = np.repeat(np.arange(counts.size), counts)
+    rows = first[edge] + (np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts))
+    y = ys[rows]
+    cross = (xj[edge] - xi[edge]) * (y - yi[edge]) / (yj[edge] - yi[edge]) + xi[edge]
+    
+    # 행마다 교차점 쌍 [c0, c1) 안의 샘플이 내부 (x < 교차점인 변의 수가 홀수)
+    order = np.lexsort((cross, rows))
+    rows, cross = rows[order], cross[order]
+    rows = rows[0::2]
+    starts = np.searchsorted(xs, cross[0::2], side='left')
+    ends = np.searchsorted(xs, cross[1::2], side='left')
+    
+    keep = starts < ends
+    return rows[keep], starts[keep], ends[keep]
+
+
+def floor_bounds(floors: list) -> tuple:
+    """post-process 바닥 목록의 (min_x, min_y, max_x, max_y) - 점이 있으면 점, 없으면 사각형"""
+    all_x = []
+    all_y = []
+    for obj in floors:
+        if obj.get('points'):
+            for p in obj.get('points', []):
+                all_x.append(p['x'])
+                all_y.append(p['y'])
+        else:
+            # spawn/objective는 x, y, width, height 형식 (x,y가 좌측상단)
+            x = obj.get('x', 0)
+            y = obj.get('y', 0)
+            w = obj.get('width', 64)
+            h = obj.get('height', 64)
+            all_x.extend([x, x + w])
+            all_y.extend([y, y + h])
+    return min(all_x), min(all_y), max(all_x), max(all_y)
+
+
+def rasterize_floor_heights(floors: list, grid_size: int = 32) -> tuple:
+    """
+    post-process용 바닥 높이 래스터 (셀 5개 샘플 중 하나라도 바닥에 닿으면 바닥)
+    
+    셀 높이 = CELL_SAMPLES 순서로 처음 닿은 샘플에서, 목록 순서상 처음 닿은 바닥의 floorHeight.
+    폴리곤(점 3개 이상, 구멍 포함)은 sample_polygon_spans, 나머지는 경계 포함 사각형 판정.
+    샘플마다 "처음 닿은 바닥 번호" 래스터를 만들고 (뒤 → 앞 순서로 덮어쓰기) 한 번에 합침.
+    
+    Args:
+        floors: POST_PROCESS_FLOOR_TYPES 오브젝트 목록 (비어 있지 않음)
+        grid_size: 셀 크기 (px)
+    
+    Returns:
+        (heights, min_x, min_y) - heights는 float 배열 (void = nan), 셀 (0, 0)의 좌상단이 (min_x, min_y)
+    """
+    min_x, min_y, grid_h, grid_w = floor_grid_frame(floors, grid_size)
+    heights = rasterize_floor_window(floors, min_x, min_y, (0, grid_h), (0, grid_w), grid_size)
+    return heights, min_x, min_y
+
+
+def floor_grid_frame(floors: list, grid_size: int = 32) -> tuple:
+    """바닥 목록의 래스터 격자 (min_x, min_y, grid_h, grid_w)"""
+    min_x, min_y, max_x, max_y = floor_bounds(floors)
+    grid_w = int((max_x - min_x) / grid_size) + 2
+    grid_h = int((max_y - min_y) / grid_size) + 2
+    return min_x, min_y, grid_h, grid_w
+
+
+def rasterize_floor_window(floors: list, min_x: float, min_y: float,
+                           rows: tuple, cols: tuple, grid_size: int = 32) -> np.ndarray:
+    """
+    rasterize_floor_heights의 부분 창 - 셀 행 [rows[0], rows[1]), 열 [cols[0], cols[1])
+    
+    격자 원점이 같으면 전체 래스터의 같은 창과 값이 동일 (샘플 좌표 식이 같음).
+    floors는 창과 겹치는 바닥만 넘겨도 됨 (목록 순서만 유지하면 됨).
+    """
+    # 축별 샘플 좌표 (중심, 안쪽 1px 낮은 쪽, 안쪽 1px 높은 쪽)
+    def axis_samples(origin, span):
+        g = np.arange(*span)
+        return [origin + (g + 0.5) * grid_size,
+                origin + g * grid_size + 1,
+                origin + (g + 1) * grid_size - 1]
+    
+    xs = [np.asarray(a, dtype=float) for a in axis_samples(min_x, cols)]
+    ys = [np.asarray(a, dtype=float) for a in axis_samples(min_y, rows)]
+    
+    n = len(floors)
+    first_hit = np.full((len(CELL_SAMPLES), rows[1] - rows[0], cols[1] - cols[0]), n, dtype=np.int32)
+    
+    for index in range(n - 1, -1, -1):
+        obj = floors[index]
+        points = obj.get('points', [])
+        if len(points) >= 3:
+            rings = [np.array([(p['x'], p['y']) for p in ring], dtype=float)
+                     for ring in [points] + obj.get('holes', []) if len(ring) >= 3]
+            for k, (kx, ky) in enumerate(CELL_SAMPLES):
+                fill_spans(first_hit[k], *sample_polygon_spans(rings, ys[ky], xs[kx]), value=index)
+        else:
+            ox = obj.get('x', 0)
+            oy = obj.get('y', 0)
+            ow = obj.get('width', 64)
+            oh = obj.get('height', 64)
+            for k, (kx, ky) in enumerate(CELL_SAMPLES):
+                # ox <= x <= ox + ow (양끝 포함)
+                c0 = np.searchsorted(xs[kx], ox, side='left')
+                c1 = np.searchsorted(xs[kx], ox + ow, side='right')
+                r0 = np.searchsorted(ys[ky], oy, side='left')
+                r1 = np.searchsorted(ys[ky], oy + oh, side='right')
+                first_hit[k, r0:r1, c0:c1] = index
+    
+    # 처음 닿은 샘플의 바닥 번호 (어느 샘플도 안 닿으면 n = void)
+    hit = first_hit < n
+    chosen = np.take_along_axis(first_hit, hit.argmax(axis=0)[None], axis=0)[0]
+    
+    floor_heights = np.array([obj.get('floorHeight', 0) or 0 for obj in floors] + [np.nan], dtype=float)
+    return floor_heights[chosen]
+
+
+def floor_raster_key(floors: list, grid_size: int = 32) -> str:
+    """
+    바닥 래스터 내용 키 - 래스터에 영향을 주는 필드만 (목록 순서 포함) 해시
+    
+    type, points/holes의 x/y, floorHeight, x/y/width/height (기본값 적용 후).
+    벽 높이 같은 옵션이나 id/color/label이 바뀌어도 키는 그대로.
+    """
+    canonical = [grid_size]
+    for obj in floors:
+        canonical.append([
+            obj.get('type'),
+            [[p['x'], p['y']] for p in obj.get('points', [])],
+            [[[p['x'], p['y']] for p in ring] for ring in obj.get('holes', [])],
+            obj.get('floorHeight', 0) or 0,
+            obj.get('x', 0), obj.get('y', 0), obj.get('width', 64), obj.get('height', 64),
+        ])
+    payload = json.dumps(canonical, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class RasterCache:
+    """
+    post-process 높이 래스터 LRU 캐시 (내용 키 → (heights, min_x, min_y))
+    
+    max_bytes: 저장된 래스터 nbytes 합의 상한 - 넘으면 오래 안 쓴 것부터 제거.
+    캐시된 래스터는 읽기 전용 (요청끼리 공유).
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    def put(self, key: str, entry: tuple):
+        heights = entry[0]
+        heights.flags.writeable = False
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[0].nbytes
+            if heights.nbytes > self.max_bytes:
+                return
+            self.entries[key] = entry
+            self.bytes += heights.nbytes
+            self._evict()
+    
+    def resize(self, max_bytes: int):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self._evict()
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+    
+    def _evict(self):
+        while self.bytes > self.max_bytes:
+            _, (heights, _, _) = self.entries.popitem(last=False)
+            self.bytes -= heights.nbytes
+            self.evictions += 1
+    
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+RASTER_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 기본 64MB (/post-process/cache로 변경 가능)
+raster_cache = RasterCache(RASTER_CACHE_MAX_BYTES)
+
+
+def cached_floor_heights(floors: list, grid_size: int = 32) -> tuple:
+    """rasterize_floor_heights + raster_cache (같은 바닥 내용이면 래스터를 다시 만들지 않음)"""
+    key = floor_raster_key(floors, grid_size)
+    entry = raster_cache.get(key)
+    if entry is None:
+        entry = rasterize_floor_heights(floors, grid_size)
+        raster_cache.put(key, entry)
+    return entry
+
+
 def compute_polyfloor_coverage(objects: list, tile_map, scale_factor: float, 
                                 offset_x: float, offset_y: float):
     """
@@ -760,41 +1142,61 @@ def compute_polyfloor_coverage(objects: list, tile_map, scale_factor: float,
         if obj.get('type') != 'polyfloor':
             continue
         
-        points = obj.get('points', [])
-        if len(points) < 3:
+        if len(obj.get('points', [])) < 3:
             continue
         
-        # 폴리곤의 점들을 타일 좌표로 변환
-        tile_points = []
-        for p in points:
-            tx = (p['x'] - offset_x + map_center_x) / tile_size
-            ty = (p['y'] - offset_y + map_center_y) / tile_size
-            tile_points.append((tx, ty))
-        
-        # 바운딩 박스
-        xs = [p[0] for p in tile_points]
-        ys = [p[1] for p in tile_points]
-        min_x = max(0, int(min(xs)))
-        max_x = min(w, int(max(xs)) + 1)
-        min_y = max(0, int(min(ys)))
-        max_y = min(h, int(max(ys)) + 1)
-        
-        # 바운딩 박스 내 타일 체크 (점-다각형 테스트)
-        for ty in range(min_y, max_y):
-            for tx in range(min_x, max_x):
-                if point_in_polygon(tx + 0.5, ty + 0.5, tile_points):
-                    covered[ty, tx] = True
+        # 타일 좌표 링 (구멍 포함) → 타일 중심 기준 래스터화
+        fill_polygon(covered, polyfloor_rings(obj, offset_x - map_center_x, offset_y - map_center_y, tile_size))
     
     return covered
 
 
-def generate_map(bounds: dict, options: dict) -> dict:
-    seed = options.get('seed', random.randint(0, 999999))
-    rules = options.get('rules', None)
-    algorithm = options.get('algorithm', 'v2')  # v2 (그리드), v3 (유기적 타일), v4 (벡터)
-    site_count = options.get('site_count', 2)  # 사이트 개수 (1, 2, 3)
-    layout = options.get('layout', None)  # 프리뷰에서 설정한 노드 위치
+
+class GeometryCache:
+    """
+    generate_map 요청 하나에서 벽/틈 단계가 공유하는 파생 래스터
+    
+    각 래스터는 처음 읽을 때 한 번만 계산:
+    - coverage: polyfloor들이 덮는 타일 (처음 읽은 시점의 objects 기준)
+    - floor: 타일맵의 비VOID 타일 (tile_map > 0)
+    - walkable, owner: TileMapConverter의 walkable 마스크와 영역 라벨 래스터
+    """
+    
+    def __init__(self, tile_map, objects: list, scale_factor: float,
+                 offset_x: float, offset_y: float, converter: 'TileMapConverter' = None):
+        self.tile_map = tile_map
+        self.objects = objects
+        self.scale_factor = scale_factor
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.converter = converter
+    
+    @cached_property
+    def coverage(self) -> np.ndarray:
+        return compute_polyfloor_coverage(self.objects, self.tile_map, self.scale_factor,
+                                          self.offset_x, self.offset_y)
+    
+    @cached_property
+    def floor(self) -> np.ndarray:
+        return np.asarray(self.tile_map) > 0
+    
+    @cached_property
+    def walkable(self) -> np.ndarray:
+        if self.converter is not None:
+            return self.converter.walkable
+        return WALKABLE_LUT[np.asarray(self.tile_map)]
+    
+    @property
+    def owner(self) -> np.ndarray:
+        return self.converter.regions if self.converter is not None else None
+
+def convert_connection_options(options: dict) -> tuple:
+    """
+    프론트엔드 연결 편집 옵션 → 백엔드 키
     
+    Returns:
+        (waypoints, custom_connections, removed_connections) - 없으면 None
+    """
     # 웨이포인트 및 연결 편집 옵션
     waypoints_raw = options.get('waypoints', None)  # 경유점 {"from-to": [{x, y}, ...]}
     custom_connections_raw = options.get('customConnections', None)  # 커스텀 연결
@@ -844,6 +1246,40 @@ def generate_map(bounds: dict, options: dict) -> dict:
     if removed_connections_raw:
         removed_connections = [convert_conn_key(c) for c in removed_connections_raw]
     
+    return waypoints, custom_connections, removed_connections
+
+
+def generate_tile_map(options: dict, seed: int) -> tuple:
+    """
+    타일 기반 알고리즘(v2/v3)으로 타일맵 생성
+    
+    Returns:
+        (template, tile_map, rooms)
+    """
+    rules = options.get('rules', None)
+    
+    if options.get('algorithm', 'v2') == 'v3':
+        tile_map, rooms = ProceduralV3Template.generate(seed=seed, rules=rules)
+        return ProceduralV3Template, tile_map, rooms
+    
+    waypoints, custom_connections, removed_connections = convert_connection_options(options)
+    tile_map, rooms = ProceduralV2Template.generate(
+        seed=seed, rules=rules, site_count=options.get('site_count', 2),
+        layout=options.get('layout', None), waypoints=waypoints,
+        custom_connections=custom_connections, removed_connections=removed_connections
+    )
+    return ProceduralV2Template, tile_map, rooms
+
+
+def generate_map(bounds: dict, options: dict) -> dict:
+    seed = options.get('seed', random.randint(0, 999999))
+    rules = options.get('rules', None)
+    algorithm = options.get('algorithm', 'v2')  # v2 (그리드), v3 (유기적 타일), v4 (벡터)
+    site_count = options.get('site_count', 2)  # 사이트 개수 (1, 2, 3)
+    layout = options.get('layout', None)  # 프리뷰에서 설정한 노드 위치
+    
+    waypoints, custom_connections, removed_connections = convert_connection_options(options)
+    
     # 벽 생성 옵션 (기본 비활성화 - UI에서 수동 생성)
     walls_options = options.get('walls', {})
     enable_perimeter_walls = walls_options.get('perimeter', False)
@@ -893,14 +1329,11 @@ def generate_map(bounds: dict, options: dict) -> dict:
         return {'objects': objects, 'bounds': bounds, 'seed': seed, 'algorithm': 'v4'}
     
     # 알고리즘 선택 (타일 기반)
-    if algorithm == 'v3':
-        tile_map, rooms = ProceduralV3Template.generate(seed=seed, rules=rules)
-    else:
-        tile_map, rooms = ProceduralV2Template.generate(
-            seed=seed, rules=rules, site_count=site_count, layout=layout,
-            waypoints=waypoints, custom_connections=custom_connections, 
-            removed_connections=removed_connections
-        )
+    template, tile_map, rooms = generate_tile_map(options, seed)
+    
+    # 타이밍 규칙 측정 (스폰→사이트, 사이트간 걷기 거리)
+    metrics = compute_timing_metrics(tile_map, rooms, template.resolve_rules(rules))
+    print(f"[DEBUG] Metrics: within_spec={metrics['within_spec']}, distances={metrics['distances']}", flush=True)
     
     converter = TileMapConverter(tile_map, rooms, scale_factor)
     objects = converter.convert()
@@ -911,15 +1344,17 @@ def generate_map(bounds: dict, options: dict) -> dict:
     for obj in objects:
         obj['x'] += offset_x
         obj['y'] += offset_y
-        if 'points' in obj:
-            for pt in obj['points']:
+        for ring in [obj.get('points', [])] + obj.get('holes', []):
+            for pt in ring:
                 pt['x'] += offset_x
                 pt['y'] += offset_y
     
+    # 요청 단위 파생 래스터 (커버리지 등은 한 번만 계산해서 벽/틈 단계가 공유)
+    geometry = GeometryCache(tile_map, objects, scale_factor, offset_x, offset_y, converter)
+    
     # polyfloor가 실제로 덮는 영역 계산
-    covered_mask = compute_polyfloor_coverage(objects, tile_map, scale_factor, offset_x, offset_y)
-    covered_count = np.sum(covered_mask)
-    floor_count = np.sum(tile_map > 0)
+    covered_count = np.sum(geometry.coverage)
+    floor_count = np.sum(geometry.floor)
     print(f"[DEBUG] Coverage: {covered_count}/{floor_count} tiles covered by polyfloors", flush=True)
     
     # 외곽 벽 생성 (covered 영역 기준)
@@ -927,7 +1362,7 @@ def generate_map(bounds: dict, options: dict) -> dict:
         walls = generate_perimeter_walls_from_tilemap(
             tile_map, scale_factor, offset_x, offset_y,
             wall_thickness=32 * scale_factor, wall_height=128 * scale_factor,
-            covered_mask=covered_mask
+            geometry=geometry
         )
         objects.extend(walls)
     
@@ -935,7 +1370,8 @@ def generate_map(bounds: dict, options: dict) -> dict:
     if enable_gap_walls:
         gap_walls = fill_polyfloor_gaps(
             objects, tile_map, scale_factor, offset_x, offset_y,
-            wall_thickness=32 * scale_factor, wall_height=128 * scale_factor
+            wall_thickness=32 * scale_factor, wall_height=128 * scale_factor,
+            geometry=geometry
         )
         objects.extend(gap_walls)
     
@@ -1018,8 +1454,243 @@ def generate_map(bounds: dict, options: dict) -> dict:
     for k, v in actual_layout.items():
         print(f"  - {k}: x={v['x']:.3f}, y={v['y']:.3f}, w={v['width']}, h={v['height']}", flush=True)
     
-    return {'objects': objects, 'bounds': bounds, 'seed': seed, 'connections': connections_data, 'actualLayout': actual_layout}
+    return {'objects': objects, 'bounds': bounds, 'seed': seed, 'connections': connections_data,
+            'actualLayout': actual_layout, 'metrics': metrics}
+
+
+# ============================================================
+# 배치 생성 (여러 시드를 워커 프로세스에서 병렬 생성)
+# ============================================================
+BATCH_MAX_SIZE = 64          # 한 번에 요청 가능한 최대 시드 수
+BATCH_JOB_TIMEOUT = 60.0     # 시드 하나당 최대 실행 시간 (초, 워커 시작부터)
+WORKER_SLOT_POLL = 0.05      # 슬롯을 기다리는 작업이 있을 때 빈 슬롯 확인 간격 (초)
+
+# 모든 요청이 함께 쓰는 동시 워커 수 제한 (CPU 코어 수)
+_worker_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+
+def _worker_job_main(conn, fn, args):
+    """작업 하나만 실행하는 워커 프로세스 본체 → (결과, 오류 메시지)를 파이프로 보냄"""
+    try:
+        conn.send((fn(*args), None))
+    except Exception as e:
+        conn.send((None, str(e) or type(e).__name__))
+    finally:
+        conn.close()
+
+
+def run_worker_jobs(fn, arg_list: list, timeout: float) -> list:
+    """
+    arg_list의 인자마다 fn을 작업 하나당 워커 프로세스 하나로 실행 → [(결과, 오류 메시지)] (순서 유지)
+    
+    - 동시에 도는 워커는 모든 요청을 합쳐 CPU 코어 수까지 (_worker_slots)
+    - deadline = 워커 시작 시각 + timeout - 슬롯을 기다리는 시간은 포함하지 않음
+    - deadline을 넘긴 작업은 그 워커만 종료 (다른 작업/요청에는 영향 없음)
+    """
+    outcomes = [None] * len(arg_list)
+    running = {}  # 파이프 → (작업 번호, 프로세스, deadline)
+    next_job = 0
+    
+    def finish(receiver, process):
+        receiver.close()
+        process.join()
+        _worker_slots.release()
+    
+    try:
+        while next_job < len(arg_list) or running:
+            # 빈 슬롯만큼 시작 (실행 중인 작업이 없으면 슬롯이 날 때까지 대기)
+            while next_job < len(arg_list) and _worker_slots.acquire(blocking=not running):
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=_worker_job_main, daemon=True,
+                                                  args=(sender, fn, arg_list[next_job]))
+                process.start()
+                sender.close()
+                running[receiver] = (next_job, process, time.monotonic() + timeout)
+                next_job += 1
+            
+            wait_for = min(deadline for _, _, deadline in running.values()) - time.monotonic()
+            if next_job < len(arg_list):
+                wait_for = min(wait_for, WORKER_SLOT_POLL)
+            for receiver in wait(list(running), timeout=max(wait_for, 0)):
+                index, process, _ = running.pop(receiver)
+                try:
+                    outcomes[index] = receiver.recv()
+                except EOFError:
+                    outcomes[index] = None
+                finish(receiver, process)
+                if outcomes[index] is None:
+                    outcomes[index] = (None, f'worker exited with code {process.exitcode}')
+            
+            now = time.monotonic()
+            for receiver, (index, process, deadline) in list(running.items()):
+                if deadline <= now:
+                    del running[receiver]
+                    process.terminate()
+                    finish(receiver, process)
+                    outcomes[index] = (None, f'timed out after {timeout}s')
+    finally:
+        for receiver, (_, process, _) in running.items():
+            process.terminate()
+            finish(receiver, process)
+    
+    return outcomes
+
+
+def parse_batch_timeout(value) -> float:
+    """요청의 timeout (초) → 0보다 크고 BATCH_JOB_TIMEOUT 이하인 값, 잘못된 값은 ValueError"""
+    if isinstance(value, bool):
+        raise ValueError("'timeout' must be a number")
+    try:
+        timeout = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("'timeout' must be a number")
+    if not math.isfinite(timeout) or timeout <= 0:
+        raise ValueError("'timeout' must be positive")
+    return min(timeout, BATCH_JOB_TIMEOUT)
+
+
+def _generate_map_job(bounds: dict, options: dict) -> dict:
+    """워커 프로세스에서 실행 (pickle 가능하도록 모듈 최상위 함수)"""
+    return generate_map(bounds, options)
+
+
+def resolve_batch_seeds(seeds=None, seed_range=None) -> list:
+    """
+    seeds 리스트 또는 seed_range로 시드 목록 생성
+    - seeds: [12, 57, 1003, ...]
+    - seed_range: [start, end] (range()처럼 end 미포함) 또는 {'start': int, 'count': int}
+    """
+    if seeds is not None:
+        return [int(seed) for seed in seeds]
+    if seed_range is None:
+        raise ValueError("either 'seeds' or 'seed_range' is required")
+    if isinstance(seed_range, dict):
+        start = int(seed_range.get('start', 0))
+        return list(range(start, start + int(seed_range.get('count', 0))))
+    start, end = seed_range
+    return list(range(int(start), int(end)))
+
+
+def generate_map_batch(bounds: dict, options: dict, seeds=None, seed_range=None,
+                       timeout: float = BATCH_JOB_TIMEOUT, max_batch: int = BATCH_MAX_SIZE) -> list:
+    """
+    여러 시드로 generate_map을 프로세스 풀에서 병렬 실행
+    
+    Returns:
+        시드 순서대로 generate_map 결과 리스트
+        실패/시간 초과한 시드는 {'seed': seed, 'error': ...}
+    
+    timeout은 시드 하나의 실행 시간 제한 (run_worker_jobs)
+    """
+    seed_list = resolve_batch_seeds(seeds, seed_range)
+    if not seed_list:
+        raise ValueError("no seeds to generate")
+    if len(seed_list) > max_batch:
+        raise ValueError(f"batch size {len(seed_list)} exceeds maximum {max_batch}")
+    
+    outcomes = run_worker_jobs(_generate_map_job,
+                               [(bounds, {**options, 'seed': seed}) for seed in seed_list], timeout)
+    results = [result if error is None else {'seed': seed, 'error': error}
+               for seed, (result, error) in zip(seed_list, outcomes)]
+    
+    failed = sum(1 for r in results if 'error' in r)
+    print(f"[DEBUG] Batch generated {len(results) - failed}/{len(results)} maps", flush=True)
+    return results
+
+
+
+# ============================================================
+# best_of_n: 후보 N개 생성 → 규칙 채점 → 상위 k개만 변환
+# ============================================================
 
+BEST_OF_N_DEFAULT = 16
+BEST_OF_N_TOP_K = 3
+
+
+def _score_candidate_job(options: dict, seed: int) -> dict:
+    """
+    워커 프로세스에서 후보 하나를 타일맵까지만 생성하고 채점
+    (폴리곤 변환은 선택된 상위 k개만 수행)
+    """
+    template, tile_map, rooms = generate_tile_map(options, seed)
+    rules = template.resolve_rules(options.get('rules', None))
+    result = score_candidate(tile_map, rooms, rules,
+                             strict_timing=options.get('strict_timing', False))
+    return {
+        'seed': seed,
+        'score': result['score'],
+        'rejected': result['rejected'],
+        'components': result['components'],
+    }
+
+
+def parse_int_option(value, name: str) -> int:
+    """요청 옵션 값 → 정수, 잘못된 값(None/리스트/문자열/무한대 등)은 ValueError"""
+    if isinstance(value, bool):
+        raise ValueError(f"'{name}' must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"'{name}' must be an integer")
+
+
+def generate_best_of_n(bounds: dict, options: dict, timeout: float = BATCH_JOB_TIMEOUT,
+                       max_batch: int = BATCH_MAX_SIZE) -> dict:
+    """
+    후보 N개를 병렬로 채점해서 상위 k개 맵 반환
+    
+    options:
+        n: 후보 수 (기본 16, 최대 max_batch)
+        top_k: 반환할 맵 수 (기본 3)
+        seed: 후보 시드는 seed, seed+1, ..., seed+n-1
+        strict_timing: True면 타이밍 규칙 위반도 하드 제약으로 거부
+    
+    Returns:
+        {'mode', 'results': [generate_map 결과 + 'score'], 'candidates': [...],
+         'evaluated', 'rejected'}
+    """
+    if options.get('algorithm', 'v2') not in ('v2', 'v3'):
+        raise ValueError("best_of_n supports only 'v2' and 'v3' algorithms")
+    
+    n = parse_int_option(options.get('n', BEST_OF_N_DEFAULT), 'n')
+    top_k = parse_int_option(options.get('top_k', BEST_OF_N_TOP_K), 'top_k')
+    if n < 1 or top_k < 1:
+        raise ValueError("'n' and 'top_k' must be positive")
+    if n > max_batch:
+        raise ValueError(f"n={n} exceeds maximum {max_batch}")
+    
+    base_seed = parse_int_option(options.get('seed', random.randint(0, 999999)), 'seed')
+    seed_list = [base_seed + i for i in range(n)]
+    
+    outcomes = run_worker_jobs(_score_candidate_job, [(options, seed) for seed in seed_list], timeout)
+    candidates = [result if error is None else {'seed': seed, 'score': None, 'rejected': error}
+                  for seed, (result, error) in zip(seed_list, outcomes)]
+    
+    # 점수 내림차순, 동점이면 시드 순
+    accepted = sorted((c for c in candidates if c['rejected'] is None),
+                      key=lambda c: (-c['score'], c['seed']))
+    selected = accepted[:top_k]
+    print(f"[DEBUG] best_of_n: {len(accepted)}/{n} accepted, "
+          f"top scores={[c['score'] for c in selected]}", flush=True)
+    
+    # 선택된 후보만 전체 변환 (같은 시드 → 같은 타일맵)
+    outcomes = run_worker_jobs(_generate_map_job,
+                               [(bounds, {**options, 'seed': c['seed']}) for c in selected], timeout)
+    results = []
+    for candidate, (result, error) in zip(selected, outcomes):
+        if error is not None:
+            result = {'seed': candidate['seed'], 'error': error}
+        result['score'] = candidate['score']
+        result['score_components'] = candidate['components']
+        results.append(result)
+    
+    return {
+        'mode': 'best_of_n',
+        'results': results,
+        'candidates': candidates,
+        'evaluated': n,
+        'rejected': n - len(accepted),
+    }
 
 def generate_cliff_edges(covered_mask, scale_factor: float, offset_x: float, offset_y: float,
                          cliff_depth: float = -8.0, cliff_width: int = 8) -> list:
@@ -1176,125 +1847,83 @@ def generate_cliff_edges(covered_mask, scale_factor: float, offset_x: float, off
     return cliffs
 
 
+def post_process_floors(objects: list) -> list:
+    """post-process 래스터에 들어가는 바닥 오브젝트 (polyfloor + spawn + objective)"""
+    return [obj for obj in objects if obj.get('type') in POST_PROCESS_FLOOR_TYPES]
+
+
 def generate_cliffs_from_polygon_edges(objects, options):
     """그리드 기반 절벽 생성 - 외곽 및 높이 차이 있는 내부 경계"""
-    default_depth = options.get('default_depth', 8.0)
-    min_height_diff = options.get('min_height_diff', 0.1)
-    
     grid_size = 32  # 1m = 32px
-    METER = 32
     
     # 1. 모든 floor 영역 수집 (polyfloor + spawn + objective)
-    floor_types = ['polyfloor', 'spawn-off', 'spawn-def', 'objective']
-    polyfloors = [obj for obj in objects if obj.get('type') in floor_types]
+    polyfloors = post_process_floors(objects)
     if not polyfloors:
         return jsonify({'cliffs': []})
     
-    # 2. 전체 bounds 계산
-    all_x = []
-    all_y = []
-    for obj in polyfloors:
-        if obj.get('points'):
-            for p in obj.get('points', []):
-                all_x.append(p['x'])
-                all_y.append(p['y'])
-        else:
-            # spawn/objective - x,y가 좌측상단
-            x = obj.get('x', 0)
-            y = obj.get('y', 0)
-            w = obj.get('width', 64)
-            h = obj.get('height', 64)
-            all_x.extend([x, x + w])
-            all_y.extend([y, y + h])
-    
-    min_x, max_x = min(all_x), max(all_x)
-    min_y, max_y = min(all_y), max(all_y)
-    
-    grid_w = int((max_x - min_x) / grid_size) + 2
-    grid_h = int((max_y - min_y) / grid_size) + 2
+    # 2~3. 높이 래스터 (nan = void, 숫자 = floor height)
+    height_grid, min_x, min_y = cached_floor_heights(polyfloors, grid_size)
+    return jsonify({'cliffs': cliffs_from_height_raster(height_grid, min_x, min_y, options, grid_size)})
+
+
+def polygon_edge_cliff(cliff_id: int, x1: float, y1: float, x2: float, y2: float,
+                       from_height: float, depth: float) -> dict:
+    """2점 polycliff 오브젝트 (높이/깊이는 m 단위 입력)"""
+    METER = 32
+    return {
+        'id': cliff_id,
+        'type': 'polycliff',
+        'category': 'cliffs',
+        'floor': 0,
+        'color': '#1a2530',
+        'points': [{'x': x1, 'y': y1}, {'x': x2, 'y': y2}],
+        'depth': depth * METER,
+        'fromHeight': from_height * METER,
+        'label': ''
+    }
+
+
+def cliffs_from_height_raster(height_grid: np.ndarray, min_x: float, min_y: float,
+                              options: dict, grid_size: int = 32) -> list:
+    """높이 래스터(rasterize_floor_heights) → polycliff 목록 (void 경계 + 높이 차 경계)"""
+    default_depth = options.get('default_depth', 8.0)
+    min_height_diff = options.get('min_height_diff', 0.1)
     
-    # 3. 그리드 생성 (floor 높이 저장)
-    # None = void, 숫자 = floor height
-    height_grid = [[None] * grid_w for _ in range(grid_h)]
-    
-    def point_in_polygon(px, py, points):
-        n = len(points)
-        inside = False
-        j = n - 1
-        for i in range(n):
-            xi, yi = points[i]['x'], points[i]['y']
-            xj, yj = points[j]['x'], points[j]['y']
-            if ((yi > py) != (yj > py)) and (px < (xj - xi) * (py - yi) / (yj - yi) + xi):
-                inside = not inside
-            j = i
-        return inside
-    
-    # 각 그리드 셀 래스터화 (5개 포인트 체크)
-    for gy in range(grid_h):
-        for gx in range(grid_w):
-            check_points = [
-                (min_x + (gx + 0.5) * grid_size, min_y + (gy + 0.5) * grid_size),
-                (min_x + gx * grid_size + 1, min_y + gy * grid_size + 1),
-                (min_x + (gx + 1) * grid_size - 1, min_y + gy * grid_size + 1),
-                (min_x + gx * grid_size + 1, min_y + (gy + 1) * grid_size - 1),
-                (min_x + (gx + 1) * grid_size - 1, min_y + (gy + 1) * grid_size - 1),
-            ]
-            
-            for cx, cy in check_points:
-                for obj in polyfloors:
-                    points = obj.get('points', [])
-                    hit = False
-                    if len(points) >= 3:
-                        hit = point_in_polygon(cx, cy, points)
-                    else:
-                        # spawn/objective - 사각형 체크 (x,y가 좌측상단)
-                        ox = obj.get('x', 0)
-                        oy = obj.get('y', 0)
-                        ow = obj.get('width', 64)
-                        oh = obj.get('height', 64)
-                        hit = (ox <= cx <= ox + ow) and (oy <= cy <= oy + oh)
-                    
-                    if hit:
-                        h = obj.get('floorHeight', 0) or 0
-                        if height_grid[gy][gx] is None or h < height_grid[gy][gx]:
-                            height_grid[gy][gx] = h
-                        break
-                if height_grid[gy][gx] is not None:
-                    break
+    grid_h, grid_w = height_grid.shape
     
     # 4. 외곽 edge 찾기 (floor vs void, floor vs floor with different height)
-    edges = []  # [(x1, y1, x2, y2, from_height, depth), ...]
-    
-    for gy in range(grid_h):
-        for gx in range(grid_w):
-            h = height_grid[gy][gx]
-            if h is None:
-                continue  # void 셀은 스킵
-            
-            cell_x = min_x + gx * grid_size
-            cell_y = min_y + gy * grid_size
-            
-            # 4방향 체크
-            neighbors = [
-                (gy - 1, gx, cell_x, cell_y, cell_x + grid_size, cell_y),  # 상
-                (gy + 1, gx, cell_x, cell_y + grid_size, cell_x + grid_size, cell_y + grid_size),  # 하
-                (gy, gx - 1, cell_x, cell_y, cell_x, cell_y + grid_size),  # 좌
-                (gy, gx + 1, cell_x + grid_size, cell_y, cell_x + grid_size, cell_y + grid_size),  # 우
-            ]
-            
-            for ny, nx, x1, y1, x2, y2 in neighbors:
-                if ny < 0 or ny >= grid_h or nx < 0 or nx >= grid_w:
-                    # 그리드 외곽 = void
-                    edges.append((x1, y1, x2, y2, h, default_depth))
-                else:
-                    nh = height_grid[ny][nx]
-                    if nh is None:
-                        # void와의 경계
-                        edges.append((x1, y1, x2, y2, h, default_depth))
-                    elif abs(h - nh) >= min_height_diff:
-                        # 높이가 다른 floor와의 경계 (높은 쪽에서만 생성)
-                        if h > nh:
-                            edges.append((x1, y1, x2, y2, h, h - nh))
+    # 4방향 이웃을 한 칸씩 민 래스터로 비교 (그리드 밖 = void)
+    padded = np.pad(height_grid, 1, constant_values=np.nan)
+    valid = ~np.isnan(height_grid)
+    # 격자선 좌표 (선 번호 기준 - 같은 선 위의 변은 좌표가 항상 같음)
+    gx = np.arange(grid_w + 1) * grid_size + min_x
+    gy = np.arange(grid_h + 1) * grid_size + min_y
+    
+    # (이웃 행 오프셋, 이웃 열 오프셋, 변 시작 셀 코너, 변 끝 셀 코너) - 상, 하, 좌, 우
+    directions = [(-1, 0, (0, 0), (1, 0)),
+                  (1, 0, (0, 1), (1, 1)),
+                  (0, -1, (0, 0), (0, 1)),
+                  (0, 1, (1, 0), (1, 1))]
+    
+    order, found = [], []
+    for k, (dy, dx, (sx0, sy0), (sx1, sy1)) in enumerate(directions):
+        neighbor = padded[1 + dy:1 + dy + grid_h, 1 + dx:1 + dx + grid_w]
+        void = valid & np.isnan(neighbor)
+        with np.errstate(invalid='ignore'):
+            # 높이가 다른 floor와의 경계 (높은 쪽에서만 생성)
+            drop = valid & ~void & (np.abs(height_grid - neighbor) >= min_height_diff) & (height_grid > neighbor)
+        for mask, is_void in ((void, True), (drop, False)):
+            ry, rx = np.nonzero(mask)
+            h = height_grid[ry, rx]
+            depth = np.full(h.size, default_depth) if is_void else h - neighbor[ry, rx]
+            order.append((ry * grid_w + rx) * 4 + k)
+            found.append(list(zip(gx[rx + sx0].tolist(), gy[ry + sy0].tolist(),
+                                  gx[rx + sx1].tolist(), gy[ry + sy1].tolist(),
+                                  h.tolist(), depth.tolist())))
+    
+    # 셀 행 우선, 셀 안에서는 상/하/좌/우 순서
+    found = [edge for group in found for edge in group]
+    edges = [found[i] for i in np.argsort(np.concatenate(order), kind='stable').tolist()]
     
     # 5. Edge 병합
     def merge_cliff_edges(edges):
@@ -1347,211 +1976,514 @@ def generate_cliffs_from_polygon_edges(objects, options):
     cliff_id = 95000
     
     for x1, y1, x2, y2, from_height, depth in merged_edges:
-        cliffs.append({
-            'id': cliff_id,
-            'type': 'polycliff',
-            'category': 'cliffs',
-            'floor': 0,
-            'color': '#1a2530',
-            'points': [{'x': x1, 'y': y1}, {'x': x2, 'y': y2}],
-            'depth': depth * METER,
-            'fromHeight': from_height * METER,
-            'label': ''
-        })
+        cliffs.append(polygon_edge_cliff(cliff_id, x1, y1, x2, y2, from_height, depth))
         cliff_id += 1
     
     print(f"[DEBUG] Grid-based cliffs: {len(cliffs)} cliffs (merged from {len(edges)} edges)", flush=True)
-    return jsonify({'cliffs': cliffs})
+    return cliffs
 
 
 def generate_walls_from_polygon_edges(objects, options):
     """그리드 기반 벽 생성 - 모든 floor를 래스터화하고 외곽에만 벽 생성"""
-    wall_height = options.get('wall_height', 4.0)
-    wall_thickness = options.get('wall_thickness', 1.0)
-    
     grid_size = 32  # 1m = 32px
     
     # 1. 모든 floor 영역 수집 (polyfloor + spawn + objective)
-    floor_types = ['polyfloor', 'spawn-off', 'spawn-def', 'objective']
-    polyfloors = [obj for obj in objects if obj.get('type') in floor_types]
+    polyfloors = post_process_floors(objects)
     if not polyfloors:
         return jsonify({'walls': []})
     
-    # 2. 전체 bounds 계산
-    all_x = []
-    all_y = []
-    for obj in polyfloors:
-        if obj.get('points'):
-            for p in obj.get('points', []):
-                all_x.append(p['x'])
-                all_y.append(p['y'])
-        else:
-            # spawn/objective는 x, y, width, height 형식 (x,y가 좌측상단)
-            x = obj.get('x', 0)
-            y = obj.get('y', 0)
-            w = obj.get('width', 64)
-            h = obj.get('height', 64)
-            all_x.extend([x, x + w])
-            all_y.extend([y, y + h])
-    
-    min_x, max_x = min(all_x), max(all_x)
-    min_y, max_y = min(all_y), max(all_y)
-    
-    # 그리드 크기
-    grid_w = int((max_x - min_x) / grid_size) + 2
-    grid_h = int((max_y - min_y) / grid_size) + 2
-    
-    # 3. 그리드 생성 (floor가 있는 셀 마킹)
-    floor_grid = [[False] * grid_w for _ in range(grid_h)]
-    height_grid = [[0] * grid_w for _ in range(grid_h)]
-    
-    def point_in_polygon(px, py, points):
-        n = len(points)
-        inside = False
-        j = n - 1
-        for i in range(n):
-            xi, yi = points[i]['x'], points[i]['y']
-            xj, yj = points[j]['x'], points[j]['y']
-            if ((yi > py) != (yj > py)) and (px < (xj - xi) * (py - yi) / (yj - yi) + xi):
-                inside = not inside
-            j = i
-        return inside
-    
-    # 각 그리드 셀의 4 코너 + 중심 체크 (하나라도 floor면 True)
-    for gy in range(grid_h):
-        for gx in range(grid_w):
-            if floor_grid[gy][gx]:
-                continue
-            
-            # 셀의 5개 포인트 체크
-            check_points = [
-                (min_x + (gx + 0.5) * grid_size, min_y + (gy + 0.5) * grid_size),  # 중심
-                (min_x + gx * grid_size + 1, min_y + gy * grid_size + 1),  # 좌상
-                (min_x + (gx + 1) * grid_size - 1, min_y + gy * grid_size + 1),  # 우상
-                (min_x + gx * grid_size + 1, min_y + (gy + 1) * grid_size - 1),  # 좌하
-                (min_x + (gx + 1) * grid_size - 1, min_y + (gy + 1) * grid_size - 1),  # 우하
-            ]
-            
-            for cx, cy in check_points:
-                found = False
-                for obj in polyfloors:
-                    points = obj.get('points', [])
-                    if len(points) >= 3:
-                        # polyfloor - 폴리곤 체크
-                        if point_in_polygon(cx, cy, points):
-                            floor_grid[gy][gx] = True
-                            found = True
-                            break
-                    else:
-                        # spawn/objective - 사각형 체크 (x,y가 좌측상단)
-                        ox = obj.get('x', 0)
-                        oy = obj.get('y', 0)
-                        ow = obj.get('width', 64)
-                        oh = obj.get('height', 64)
-                        if (ox <= cx <= ox + ow) and (oy <= cy <= oy + oh):
-                            floor_grid[gy][gx] = True
-                            found = True
-                            break
-                if found:
-                    break
-    
-    # 4. 외곽 edge 찾기 (floor 셀과 void 셀 경계)
-    edges = []  # [(x1, y1, x2, y2, from_height), ...]
+    # 2~3. floor 래스터 (셀 5개 샘플 중 하나라도 floor면 floor)
+    height_grid, min_x, min_y = cached_floor_heights(polyfloors, grid_size)
+    return jsonify({'walls': walls_from_height_raster(height_grid, min_x, min_y, options, grid_size)})
+
+
+def polygon_edge_wall(wall_id: int, points: np.ndarray, closed: bool, min_x: float, min_y: float,
+                      options: dict, grid_size: int = 32) -> dict:
+    """chain_wall_edges 체인 하나(격자 좌표) → polywall 오브젝트"""
+    wall_height = options.get('wall_height', 4.0)
+    wall_thickness = options.get('wall_thickness', 1.0)
     
-    for gy in range(grid_h):
-        for gx in range(grid_w):
-            if not floor_grid[gy][gx]:
-                continue
-            
-            from_height = height_grid[gy][gx]
-            cell_x = min_x + gx * grid_size
-            cell_y = min_y + gy * grid_size
-            
-            # 상 (y-)
-            if gy == 0 or not floor_grid[gy-1][gx]:
-                edges.append((cell_x, cell_y, cell_x + grid_size, cell_y, from_height))
-            # 하 (y+)
-            if gy == grid_h-1 or not floor_grid[gy+1][gx]:
-                edges.append((cell_x, cell_y + grid_size, cell_x + grid_size, cell_y + grid_size, from_height))
-            # 좌 (x-)
-            if gx == 0 or not floor_grid[gy][gx-1]:
-                edges.append((cell_x, cell_y, cell_x, cell_y + grid_size, from_height))
-            # 우 (x+)
-            if gx == grid_w-1 or not floor_grid[gy][gx+1]:
-                edges.append((cell_x + grid_size, cell_y, cell_x + grid_size, cell_y + grid_size, from_height))
-    
-    # 5. Edge 병합 (같은 선 위에 있는 연속된 edge)
-    def merge_edges(edges):
-        if not edges:
-            return []
-        
-        # 수평/수직 분리
-        h_edges = {}  # y -> [(x1, x2, height), ...]
-        v_edges = {}  # x -> [(y1, y2, height), ...]
-        
-        for x1, y1, x2, y2, h in edges:
-            if y1 == y2:  # 수평
-                if y1 not in h_edges:
-                    h_edges[y1] = []
-                h_edges[y1].append((min(x1, x2), max(x1, x2), h))
-            elif x1 == x2:  # 수직
-                if x1 not in v_edges:
-                    v_edges[x1] = []
-                v_edges[x1].append((min(y1, y2), max(y1, y2), h))
-        
-        merged = []
-        
-        # 수평 병합
-        for y, segs in h_edges.items():
-            segs.sort()
-            i = 0
-            while i < len(segs):
-                x1, x2, h = segs[i]
-                while i + 1 < len(segs) and segs[i+1][0] <= x2 and segs[i+1][2] == h:
-                    x2 = max(x2, segs[i+1][1])
-                    i += 1
-                merged.append((x1, y, x2, y, h))
-                i += 1
-        
-        # 수직 병합
-        for x, segs in v_edges.items():
-            segs.sort()
-            i = 0
-            while i < len(segs):
-                y1, y2, h = segs[i]
-                while i + 1 < len(segs) and segs[i+1][0] <= y2 and segs[i+1][2] == h:
-                    y2 = max(y2, segs[i+1][1])
-                    i += 1
-                merged.append((x, y1, x, y2, h))
-                i += 1
-        
-        return merged
+    METER = 32  # 1m = 32px (고정)
+    px = points[:, 0] * grid_size + min_x
+    py = points[:, 1] * grid_size + min_y
+    # 벽은 항상 바닥(0)에서 시작 - 공중 벽 방지
+    return {
+        'id': wall_id,
+        'type': 'polywall',
+        'category': 'walls',
+        'floor': 0,
+        'color': '#2a3540',
+        'points': [{'x': x, 'y': y} for x, y in zip(px.tolist(), py.tolist())],
+        'thickness': wall_thickness * METER,  # 1m 기준
+        'height': wall_height * METER,  # 1m 기준
+        'fromHeight': 0,  # 항상 0에서 시작
+        'closed': closed,
+        'label': ''
+    }
+
+
+def walls_from_height_raster(height_grid: np.ndarray, min_x: float, min_y: float,
+                             options: dict, grid_size: int = 32) -> list:
+    """높이 래스터(rasterize_floor_heights) → 외곽 polywall 목록 (체인 하나당 하나)"""
+    floor_grid = ~np.isnan(height_grid)
     
-    merged_edges = merge_edges(edges)
+    # 4. 외곽 edge(이웃 셀과 floor 여부가 다른 경계)를 폴리라인으로 이음
+    # 벽은 항상 바닥(0)에서 시작하므로 높이로는 끊지 않음
+    chains = chain_wall_edges(floor_grid)
     
-    # 6. 벽 생성
+    # 5. 벽 생성 - 체인 하나당 polywall 하나
     walls = []
     wall_id = 90000
     
-    METER = 32  # 1m = 32px (고정)
-    for x1, y1, x2, y2, from_height in merged_edges:
-        # 벽은 항상 바닥(0)에서 시작 - 공중 벽 방지
-        walls.append({
-            'id': wall_id,
-            'type': 'polywall',
-            'category': 'walls',
+    for points, closed, _ in chains:
+        walls.append(polygon_edge_wall(wall_id, points, closed, min_x, min_y, options, grid_size))
+        wall_id += 1
+    
+    segments = sum(len(wall['points']) - 1 for wall in walls)
+    print(f"[DEBUG] Grid-based walls: {len(walls)} walls ({segments} segments)", flush=True)
+    return walls
+
+
+def gap_fills_from_height_raster(height_grid: np.ndarray, min_x: float, min_y: float,
+                                 options: dict, grid_size: int = 32) -> list:
+    """
+    높이 래스터의 막힌 틈(바깥과 4방향으로 이어지지 않는 void)을 polyfloor 블록으로 채움
+    
+    gap_max_tiles보다 큰 틈은 의도된 구덩이/안뜰로 보고 남김.
+    블록 높이는 fill_polyfloor_gaps와 같이 벽 높이 (m).
+    """
+    wall_height = options.get('wall_height', 4.0)
+    max_tiles = options.get('gap_max_tiles', 16)
+    
+    # 패딩한 void에서 (0, 0)과 이어진 영역 = 바깥
+    void = np.pad(np.isnan(height_grid), 1, constant_values=True)
+    labeled, _ = ndimage.label(void)
+    enclosed = void & (labeled != labeled[0, 0])
+    
+    gaps, _ = ndimage.label(enclosed[1:-1, 1:-1])
+    sizes = np.bincount(gaps.ravel())
+    sizes[0] = 0
+    gaps = (sizes > 0)[gaps] & (sizes <= max_tiles)[gaps]
+    
+    fills = []
+    fill_id = 98000
+    for x_min, y_min, x_max, y_max in gap_rectangles(gaps):
+        px1 = x_min * grid_size + min_x
+        py1 = y_min * grid_size + min_y
+        px2 = x_max * grid_size + min_x
+        py2 = y_max * grid_size + min_y
+        
+        fills.append({
+            'id': fill_id,
+            'type': 'polyfloor',
+            'category': 'floors',
             'floor': 0,
             'color': '#2a3540',
-            'points': [{'x': x1, 'y': y1}, {'x': x2, 'y': y2}],
-            'thickness': wall_thickness * METER,  # 1m 기준
-            'height': wall_height * METER,  # 1m 기준
-            'fromHeight': 0,  # 항상 0에서 시작
+            'points': [
+                {'x': px1, 'y': py1},
+                {'x': px2, 'y': py1},
+                {'x': px2, 'y': py2},
+                {'x': px1, 'y': py2}
+            ],
+            'x': px1,
+            'y': py1,
+            'floorHeight': wall_height,
             'label': ''
         })
-        wall_id += 1
+        fill_id += 1
     
-    print(f"[DEBUG] Grid-based walls: {len(walls)} walls (merged from {len(edges)} edges)", flush=True)
-    return jsonify({'walls': walls})
+    print(f"[DEBUG] Post-process gap fills: {len(fills)} blocks ({int(gaps.sum())} tiles)", flush=True)
+    return fills
+
+
+# ============================================================
+# 증분 post-process (세션 + 오브젝트 delta)
+# ============================================================
+
+POST_PROCESS_MAX_SESSIONS = 32   # 유지할 최대 세션 수 (walls/cliffs 각각, 오래 안 쓴 것부터 제거)
+
+_post_process_sessions = OrderedDict()
+_post_process_sessions_lock = threading.Lock()
+
+
+def is_session_floor_id(floor_id) -> bool:
+    """delta에서 바닥을 가리킬 수 있는 id (문자열/정수)"""
+    return isinstance(floor_id, (str, int)) and not isinstance(floor_id, bool)
+
+
+def floor_session_id(obj: dict):
+    """세션 키에 쓰는 바닥 id - 가리킬 수 없는 id(없음/실수/리스트 등)는 None으로 묶음"""
+    floor_id = obj.get('id')
+    return floor_id if is_session_floor_id(floor_id) else None
+
+
+def floor_bbox(obj: dict) -> tuple:
+    """바닥 오브젝트가 래스터에 영향을 주는 범위 (x0, y0, x1, y1) - rasterize_floor_window와 같은 분기"""
+    points = obj.get('points', [])
+    if len(points) >= 3:
+        xs = [p['x'] for ring in [points] + obj.get('holes', []) for p in ring]
+        ys = [p['y'] for ring in [points] + obj.get('holes', []) for p in ring]
+        return min(xs), min(ys), max(xs), max(ys)
+    x = obj.get('x', 0)
+    y = obj.get('y', 0)
+    return x, y, x + obj.get('width', 64), y + obj.get('height', 64)
+
+
+def segments_touch_rect(points: np.ndarray, y0: float, y1: float, x0: float, x1: float) -> bool:
+    """축 정렬 폴리라인 (x, y)의 어떤 변이라도 닫힌 사각형 [x0, x1] x [y0, y1]에 닿는지"""
+    p, q = points[:-1], points[1:]
+    return bool(np.any((np.minimum(p[:, 0], q[:, 0]) <= x1) & (np.maximum(p[:, 0], q[:, 0]) >= x0) &
+                       (np.minimum(p[:, 1], q[:, 1]) <= y1) & (np.maximum(p[:, 1], q[:, 1]) >= y0)))
+
+
+def cliff_line_runs(height_grid: np.ndarray, options: dict, axis: int, lo: int, hi: int) -> list:
+    """
+    격자선 lo..hi (양끝 포함) 위의 병합된 절벽 구간 - cliffs_from_height_raster와 같은 판정/병합
+    
+    axis 0: 수평선 y (위 셀 y-1 | 아래 셀 y), axis 1: 수직선 x (왼쪽 셀 x-1 | 오른쪽 셀 x).
+    한 위치에는 많아야 한쪽 셀만 절벽을 만들므로 (void 반대쪽 또는 더 높은 쪽)
+    같은 (from_height, depth)가 이어지는 구간이 곧 병합 결과.
+    
+    Returns:
+        [(선 번호, 시작, 끝(미포함), from_height, depth), ...] - 격자 단위
+    """
+    default_depth = options.get('default_depth', 8.0)
+    min_height_diff = options.get('min_height_diff', 0.1)
+    
+    grid = height_grid if axis == 0 else height_grid.T
+    padded = np.pad(grid, ((1, 1), (0, 0)), constant_values=np.nan)
+    first, second = padded[lo:hi + 1], padded[lo + 1:hi + 2]
+    
+    with np.errstate(invalid='ignore'):
+        steep = np.abs(first - second) >= min_height_diff
+        first_emits = ~np.isnan(first) & (np.isnan(second) | (steep & (first > second)))
+        second_emits = ~np.isnan(second) & (np.isnan(first) | (steep & (second > first)))
+    emit = first_emits | second_emits
+    from_height = np.where(first_emits, first, second)
+    other = np.where(first_emits, second, first)
+    depth = np.where(np.isnan(other), default_depth, from_height - other)
+    
+    # 앞 위치와 이어지는 구간인지 (둘 다 절벽이고 속성이 같음)
+    joined = np.zeros_like(emit)
+    joined[:, 1:] = (emit[:, 1:] & emit[:, :-1] &
+                     (from_height[:, 1:] == from_height[:, :-1]) & (depth[:, 1:] == depth[:, :-1]))
+    ends_here = np.ones_like(emit)
+    ends_here[:, :-1] = ~joined[:, 1:]
+    
+    rows, starts = np.nonzero(emit & ~joined)
+    _, ends = np.nonzero(emit & ends_here)
+    return list(zip((rows + lo).tolist(), starts.tolist(), (ends + 1).tolist(),
+                    from_height[rows, starts].tolist(), depth[rows, starts].tolist()))
+
+
+class PostProcessSession:
+    """
+    증분 post-process 세션 - 바닥 목록, 높이 래스터, 생성된 오브젝트를 요청 사이에 유지
+    
+    delta(added/removed/changed)를 받으면 바뀐 바닥의 bbox 창만 다시 래스터화하고,
+    값이 실제로 바뀐 셀의 bbox(zone)에 닿는 결과만 다시 뽑아 추가/삭제 id로 돌려줌.
+    바닥 bbox가 격자 범위를 바꾸거나 옵션이 바뀌면 전체 재생성 (전체 요청과 같은 결과).
+    """
+    
+    KIND = None
+    FIRST_ID = 0
+    
+    def __init__(self, objects: list, options: dict, grid_size: int = 32):
+        self.lock = threading.Lock()
+        self.grid_size = grid_size
+        self.options = options
+        # 키 (id, 같은 id 안의 순번) → 바닥 오브젝트, 순서 = 래스터 우선순위 (목록 순서)
+        # 레벨에 id가 겹치는 바닥이 있어도 하나도 빠지지 않도록 순번으로 구분
+        self.floors = OrderedDict()
+        self.bboxes = {}
+        self.next_index = {}  # id → 다음 순번
+        for obj in post_process_floors(objects):
+            self._insert(floor_session_id(obj), obj)
+        self.items = {}
+        self.rebuild()
+    
+    def rebuild(self) -> list:
+        """래스터와 결과를 처음부터 다시 생성 → 새 오브젝트 목록"""
+        self.items = {}
+        self.next_id = self.FIRST_ID
+        floors = list(self.floors.values())
+        if not floors:
+            self.heights, self.frame = None, None
+            return []
+        heights, min_x, min_y = cached_floor_heights(floors, self.grid_size)
+        self.heights = heights.copy()  # 캐시 래스터는 읽기 전용
+        self.frame = (min_x, min_y) + heights.shape
+        return self.build_items()
+    
+    def item_list(self) -> list:
+        return [record['item'] for record in self.items.values()]
+    
+    def _insert(self, floor_id, obj: dict):
+        index = self.next_index.get(floor_id, 0)
+        self.next_index[floor_id] = index + 1
+        key = (floor_id, index)
+        self.floors[key] = obj
+        self.bboxes[key] = floor_bbox(obj)
+        return key
+    
+    def apply_delta(self, delta: dict, options: dict) -> tuple:
+        """
+        delta: {'added': [오브젝트], 'removed': [id], 'changed': [오브젝트]}
+        
+        - added/changed 오브젝트와 removed 항목은 모두 문자열/정수 id가 필요 (없으면 ValueError)
+        - changed: id별로 그 id의 바뀐 상태를 모두 보냄 - 같은 id의 기존 바닥을 목록 순서대로
+          하나씩 제자리 교체, 남는 새 오브젝트는 끝에 추가, 남는 기존 바닥은 삭제
+          (바닥이 아닌 타입으로 바뀐 오브젝트도 삭제)
+        - removed: 그 id를 가진 바닥을 모두 삭제 (같은 delta의 changed보다 우선)
+        - id 없는 바닥은 세션 생성 때만 들어가고 delta로는 가리킬 수 없음
+        
+        Returns:
+            (추가된 오브젝트 목록, 삭제된 id 목록, 전체 재생성 여부)
+        """
+        if not isinstance(delta, dict):
+            raise ValueError("delta must be an object")
+        changed_objs, added_objs = delta.get('changed', []), delta.get('added', [])
+        removed_ids = delta.get('removed', [])
+        if not all(isinstance(part, list) for part in (changed_objs, added_objs, removed_ids)):
+            raise ValueError("delta 'added', 'removed' and 'changed' must be lists")
+        if not all(isinstance(obj, dict) for obj in changed_objs + added_objs):
+            raise ValueError("delta objects must be objects")
+        if not all(is_session_floor_id(floor_id)
+                   for floor_id in [obj.get('id') for obj in changed_objs + added_objs] + removed_ids):
+            raise ValueError("delta objects and removed entries need a string or integer id")
+        
+        # 현재 키를 id별로 묶어 둠 (changed가 목록 순서대로 하나씩 가져감)
+        groups = {}
+        for key in self.floors:
+            groups.setdefault(key[0], []).append(key)
+        
+        boxes = []
+        for obj in changed_objs:
+            keys = groups.get(obj['id'])
+            key = keys.pop(0) if keys else None
+            if key is not None:
+                boxes.append(self.bboxes[key])
+            if obj.get('type') not in POST_PROCESS_FLOOR_TYPES:
+                if key is not None:
+                    del self.floors[key]
+                    del self.bboxes[key]
+                continue
+            if key is None:
+                key = self._insert(obj['id'], obj)
+            else:
+                self.floors[key] = obj  # 있던 키는 제자리 교체
+                self.bboxes[key] = floor_bbox(obj)
+            boxes.append(self.bboxes[key])
+        # changed로 보낸 id의 남은 기존 바닥 = 새 상태에 없음
+        for floor_id in {obj['id'] for obj in changed_objs}:
+            for key in groups.get(floor_id, []):
+                del self.floors[key]
+                boxes.append(self.bboxes.pop(key))
+        for obj in added_objs:
+            if obj.get('type') in POST_PROCESS_FLOOR_TYPES:
+                boxes.append(self.bboxes[self._insert(obj['id'], obj)])
+        # 같은 delta에서 바뀌고 삭제된 오브젝트는 삭제가 우선
+        removed_ids = set(removed_ids)
+        for key in [key for key in self.floors if key[0] in removed_ids]:
+            del self.floors[key]
+            boxes.append(self.bboxes.pop(key))
+        
+        floors = list(self.floors.values())
+        if (options != self.options or not floors or self.frame is None
+                or floor_grid_frame(floors, self.grid_size) != self.frame):
+            removed = list(self.items)
+            self.options = options
+            return self.rebuild(), removed, True
+        
+        added, removed = {}, []
+        for box in boxes:
+            zone = self._rasterize_box(box)
+            if zone is None:
+                continue
+            gone, new_items = self.update_zone(*zone)
+            for item_id in gone:
+                # 이번 delta 안에서 생겼다 사라진 오브젝트는 응답에서 뺌
+                if added.pop(item_id, None) is None:
+                    removed.append(item_id)
+            for item in new_items:
+                added[item['id']] = item
+        return list(added.values()), removed, False
+    
+    def _rasterize_box(self, box: tuple):
+        """bbox에 샘플이 걸칠 수 있는 셀 창을 다시 래스터화 → 값이 바뀐 셀 bbox (r0, r1, c0, c1) 또는 None"""
+        min_x, min_y, grid_h, grid_w = self.frame
+        gs = self.grid_size
+        x0, y0, x1, y1 = box
+        c0, c1 = max(int((x0 - min_x) // gs) - 1, 0), min(int((x1 - min_x) // gs) + 2, grid_w)
+        r0, r1 = max(int((y0 - min_y) // gs) - 1, 0), min(int((y1 - min_y) // gs) + 2, grid_h)
+        if r0 >= r1 or c0 >= c1:
+            return None
+        
+        # 창과 겹치는 바닥만 (목록 순서 유지)
+        wx0, wx1 = min_x + c0 * gs, min_x + c1 * gs
+        wy0, wy1 = min_y + r0 * gs, min_y + r1 * gs
+        subset = [obj for key, obj in self.floors.items()
+                  if self.bboxes[key][0] <= wx1 and self.bboxes[key][2] >= wx0
+                  and self.bboxes[key][1] <= wy1 and self.bboxes[key][3] >= wy0]
+        window = rasterize_floor_window(subset, min_x, min_y, (r0, r1), (c0, c1), gs)
+        
+        old = self.heights[r0:r1, c0:c1]
+        changed = ~((old == window) | (np.isnan(old) & np.isnan(window)))
+        if not changed.any():
+            return None
+        old[...] = window
+        ry, rx = np.nonzero(changed)
+        return r0 + ry.min(), r0 + ry.max() + 1, c0 + rx.min(), c0 + rx.max() + 1
+    
+    def _add_item(self, item: dict, **record) -> dict:
+        record['item'] = item
+        self.items[item['id']] = record
+        self.next_id = max(self.next_id, item['id'] + 1)
+        return item
+    
+    def build_items(self) -> list:
+        raise NotImplementedError
+    
+    def update_zone(self, r0: int, r1: int, c0: int, c1: int) -> tuple:
+        """셀 [r0, r1) x [c0, c1) 값이 바뀐 뒤 → (삭제된 id 목록, 새 오브젝트 목록)"""
+        raise NotImplementedError
+
+
+class WallSession(PostProcessSession):
+    """polygon edge 벽 세션 - 체인 단위로 교체"""
+    
+    KIND = 'walls'
+    FIRST_ID = 90000
+    
+    def build_items(self) -> list:
+        min_x, min_y = self.frame[:2]
+        walls = walls_from_height_raster(self.heights, min_x, min_y, self.options, self.grid_size)
+        # 벽 좌표 → 격자 꼭짓점 좌표 (오프셋 없는 체인이므로 정수)
+        for wall in walls:
+            points = np.array([((p['x'] - min_x) / self.grid_size, (p['y'] - min_y) / self.grid_size)
+                               for p in wall['points']]).round()
+            self._add_item(wall, points=points)
+        return walls
+    
+    def update_zone(self, r0: int, r1: int, c0: int, c1: int) -> tuple:
+        """
+        바뀐 셀에 닿는 꼭짓점 사각형 [r0, r1] x [c0, c1]에 걸친 체인만 다시 추적
+        
+        사각형 밖의 변/연결/끊김은 이전과 같으므로, 새로 생길 체인은 모두
+        (사각형 + 걸친 기존 체인)의 bbox R 안에 있음. R보다 한 칸 넓게 잘라 추적하고
+        (잘린 가장자리의 가짜 경계는 R 밖) R 안에 있으면서 사각형에 걸친 체인만 채택.
+        """
+        gone = [item_id for item_id, record in self.items.items()
+                if segments_touch_rect(record['points'], r0, r1, c0, c1)]
+        
+        vy0, vy1, vx0, vx1 = r0, r1, c0, c1
+        for item_id in gone:
+            points = self.items[item_id]['points']
+            vx0, vy0 = min(vx0, points[:, 0].min()), min(vy0, points[:, 1].min())
+            vx1, vy1 = max(vx1, points[:, 0].max()), max(vy1, points[:, 1].max())
+        
+        grid_h, grid_w = self.heights.shape
+        cy0, cy1 = max(int(vy0) - 1, 0), min(int(vy1) + 1, grid_h)
+        cx0, cx1 = max(int(vx0) - 1, 0), min(int(vx1) + 1, grid_w)
+        chains = chain_wall_edges(~np.isnan(self.heights[cy0:cy1, cx0:cx1]))
+        
+        min_x, min_y = self.frame[:2]
+        for item_id in gone:
+            del self.items[item_id]
+        new_items = []
+        for points, closed, _ in chains:
+            points = points + (cx0, cy0)
+            inside = (points[:, 0].min() >= vx0 and points[:, 0].max() <= vx1 and
+                      points[:, 1].min() >= vy0 and points[:, 1].max() <= vy1)
+            if inside and segments_touch_rect(points, r0, r1, c0, c1):
+                wall = polygon_edge_wall(self.next_id, points, closed, min_x, min_y, self.options, self.grid_size)
+                new_items.append(self._add_item(wall, points=points))
+        return gone, new_items
+
+
+class CliffSession(PostProcessSession):
+    """polygon edge 절벽 세션 - 격자선 단위로 교체"""
+    
+    KIND = 'cliffs'
+    FIRST_ID = 95000
+    
+    def build_items(self) -> list:
+        min_x, min_y = self.frame[:2]
+        self.lines = {}  # (axis, 선 번호) → 그 선 위의 절벽 id 집합
+        cliffs = cliffs_from_height_raster(self.heights, min_x, min_y, self.options, self.grid_size)
+        for cliff in cliffs:
+            p, q = cliff['points']
+            if p['y'] == q['y']:
+                line = (0, round((p['y'] - min_y) / self.grid_size))
+            else:
+                line = (1, round((p['x'] - min_x) / self.grid_size))
+            self._add_line_item(cliff, line)
+        return cliffs
+    
+    def _add_line_item(self, cliff: dict, line: tuple) -> dict:
+        self.lines.setdefault(line, set()).add(cliff['id'])
+        return self._add_item(cliff, line=line)
+    
+    def update_zone(self, r0: int, r1: int, c0: int, c1: int) -> tuple:
+        """바뀐 셀에 닿는 격자선 (수평선 r0..r1, 수직선 c0..c1) 전체를 다시 추출/병합"""
+        min_x, min_y = self.frame[:2]
+        gs = self.grid_size
+        gone, new_items = [], []
+        for axis, lo, hi in ((0, r0, r1), (1, c0, c1)):
+            for line in range(lo, hi + 1):
+                for item_id in self.lines.pop((axis, line), ()):
+                    del self.items[item_id]
+                    gone.append(item_id)
+            
+            for line, start, end, from_height, depth in cliff_line_runs(self.heights, self.options, axis, lo, hi):
+                # cliffs_from_height_raster와 같은 격자선 좌표식
+                along0, along1 = (min_x, min_y) if axis == 0 else (min_y, min_x)
+                a1 = start * gs + along0
+                a2 = end * gs + along0
+                b = line * gs + along1
+                x1, y1, x2, y2 = (a1, b, a2, b) if axis == 0 else (b, a1, b, a2)
+                cliff = polygon_edge_cliff(self.next_id, x1, y1, x2, y2, from_height, depth)
+                new_items.append(self._add_line_item(cliff, (axis, line)))
+        return gone, new_items
+
+
+def post_process_session_response(session_class, data: dict, options: dict):
+    """
+    세션 요청 처리 (/post-process/walls, /post-process/cliff 공용)
+    
+    - objects만: 세션 생성/교체 → 일반 응답 + 'session'
+    - delta: 기존 세션에 적용 → {'session', 'added', 'removed', 'rebuilt'}
+      (delta 형식은 PostProcessSession.apply_delta, 잘못된 delta는 400)
+    """
+    session_id = data['session']
+    if not isinstance(session_id, (str, int)) or isinstance(session_id, bool):
+        return jsonify({'error': 'session must be a string or integer'}), 400
+    key = (session_class.KIND, session_id)
+    
+    if 'delta' not in data:
+        session = session_class(data.get('objects', []), options)
+        with _post_process_sessions_lock:
+            _post_process_sessions[key] = session
+            _post_process_sessions.move_to_end(key)
+            while len(_post_process_sessions) > POST_PROCESS_MAX_SESSIONS * 2:
+                _post_process_sessions.popitem(last=False)
+        return jsonify({session_class.KIND: session.item_list(), 'session': session_id})
+    
+    with _post_process_sessions_lock:
+        session = _post_process_sessions.get(key)
+        if session is not None:
+            _post_process_sessions.move_to_end(key)
+    if session is None:
+        return jsonify({'error': f"unknown session '{session_id}' - send full objects first"}), 409
+    
+    try:
+        with session.lock:
+            added, removed, rebuilt = session.apply_delta(data['delta'], options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    print(f"[DEBUG] Post-process {session_class.KIND} delta: +{len(added)} -{len(removed)}"
+          f"{' (rebuilt)' if rebuilt else ''}", flush=True)
+    return jsonify({'session': session_id, 'added': added, 'removed': removed, 'rebuilt': rebuilt})
 
 
 @app.route('/post-process/walls', methods=['POST'])
@@ -1562,6 +2494,11 @@ def post_process_walls():
     options = data.get('options', {})
     use_polygon_edges = options.get('use_polygon_edges', True)  # 기본: polygon edge 기반
     
+    if use_polygon_edges and 'session' in data:
+        return post_process_session_response(WallSession, data, options)
+    if 'delta' in data:
+        return jsonify({'error': 'delta requires session and use_polygon_edges'}), 400
+    
     if use_polygon_edges:
         return generate_walls_from_polygon_edges(objects, options)
     
@@ -1597,107 +2534,37 @@ def post_process_walls():
     for obj in objects:
         if obj.get('type') != 'polyfloor':
             continue
-        points = obj.get('points', [])
-        if len(points) < 3:
+        if len(obj.get('points', [])) < 3:
             continue
         
         floor_height = obj.get('floorHeight', 0) or 0
         
-        # 타일 좌표로 변환
-        tile_points = []
-        for p in points:
-            tx = (p['x'] - min_x) / grid_size
-            ty = (p['y'] - min_y) / grid_size
-            tile_points.append((tx, ty))
-        
-        # 바운딩 박스 내 체크
-        pxs = [p[0] for p in tile_points]
-        pys = [p[1] for p in tile_points]
-        px_min = max(0, int(min(pxs)))
-        px_max = min(grid_w, int(max(pxs)) + 1)
-        py_min = max(0, int(min(pys)))
-        py_max = min(grid_h, int(max(pys)) + 1)
-        
-        for ty in range(py_min, py_max):
-            for tx in range(px_min, px_max):
-                if point_in_polygon(tx + 0.5, ty + 0.5, tile_points):
-                    # 더 높은 floor가 우선
-                    if np.isnan(height_map[ty, tx]) or floor_height > height_map[ty, tx]:
-                        height_map[ty, tx] = floor_height
-    
-    # 벽 생성
+        # 더 높은 floor가 우선 (fmax: nan = 비어있음은 무시)
+        fill_polygon(height_map, polyfloor_rings(obj, min_x, min_y, grid_size), floor_height, combine=np.fmax)
+    
+    # 벽 생성 - floor 높이가 같은 경계 구간마다 폴리라인 하나
     walls = []
-    wall_id = 90000
     
     half_t = wall_thickness * grid_size / 2
     
-    # 수평 엣지
-    for y in range(grid_h + 1):
-        for x in range(grid_w):
-            h_above = height_map[y - 1, x] if y > 0 else np.nan
-            h_below = height_map[y, x] if y < grid_h else np.nan
-            
-            above_valid = not np.isnan(h_above)
-            below_valid = not np.isnan(h_below)
-            
-            if above_valid != below_valid:
-                px1 = x * grid_size + min_x
-                py = y * grid_size + min_y
-                px2 = (x + 1) * grid_size + min_x
-                
-                # floor 높이 결정
-                from_height = h_above if above_valid else h_below
-                
-                # void 쪽으로 오프셋
-                if above_valid and not below_valid:
-                    py += half_t
-                else:
-                    py -= half_t
-                
-                walls.append({
-                    'type': 'polywall',
-                    'category': 'walls',
-                    'floor': 0,
-                    'color': '#2a3540',
-                    'points': [{'x': px1, 'y': py}, {'x': px2, 'y': py}],
-                    'thickness': wall_thickness * grid_size,
-                    'height': wall_height * grid_size,
-                    'fromHeight': from_height * grid_size,  # floor 높이에서 시작
-                    'label': ''
-                })
+    # void 쪽으로 오프셋
+    chains = chain_wall_edges(~np.isnan(height_map), height_map, offset=half_t / grid_size)
     
-    # 수직 엣지
-    for y in range(grid_h):
-        for x in range(grid_w + 1):
-            h_left = height_map[y, x - 1] if x > 0 else np.nan
-            h_right = height_map[y, x] if x < grid_w else np.nan
-            
-            left_valid = not np.isnan(h_left)
-            right_valid = not np.isnan(h_right)
-            
-            if left_valid != right_valid:
-                px = x * grid_size + min_x
-                py1 = y * grid_size + min_y
-                py2 = (y + 1) * grid_size + min_y
-                
-                from_height = h_left if left_valid else h_right
-                
-                if left_valid and not right_valid:
-                    px += half_t
-                else:
-                    px -= half_t
-                
-                walls.append({
-                    'type': 'polywall',
-                    'category': 'walls',
-                    'floor': 0,
-                    'color': '#2a3540',
-                    'points': [{'x': px, 'y': py1}, {'x': px, 'y': py2}],
-                    'thickness': wall_thickness * grid_size,
-                    'height': wall_height * grid_size,
-                    'fromHeight': from_height * grid_size,
-                    'label': ''
-                })
+    for points, closed, from_height in chains:
+        px = points[:, 0] * grid_size + min_x
+        py = points[:, 1] * grid_size + min_y
+        walls.append({
+            'type': 'polywall',
+            'category': 'walls',
+            'floor': 0,
+            'color': '#2a3540',
+            'points': [{'x': x, 'y': y} for x, y in zip(px.tolist(), py.tolist())],
+            'thickness': wall_thickness * grid_size,
+            'height': wall_height * grid_size,
+            'fromHeight': float(from_height) * grid_size,  # floor 높이에서 시작
+            'closed': closed,
+            'label': ''
+        })
     
     print(f"[DEBUG] Post-process walls: generated {len(walls)} walls", flush=True)
     return jsonify({'walls': walls})
@@ -1711,6 +2578,11 @@ def post_process_cliff():
     options = data.get('options', {})
     use_polygon_edges = options.get('use_polygon_edges', True)
     
+    if use_polygon_edges and 'session' in data:
+        return post_process_session_response(CliffSession, data, options)
+    if 'delta' in data:
+        return jsonify({'error': 'delta requires session and use_polygon_edges'}), 400
+    
     if use_polygon_edges:
         return generate_cliffs_from_polygon_edges(objects, options)
     
@@ -1754,25 +2626,8 @@ def post_process_cliff():
             floor_height = 0
         print(f"[DEBUG] polyfloor id={obj.get('id')}, floorHeight={floor_height}", flush=True)
         
-        tile_points = []
-        for p in points:
-            tx = (p['x'] - min_x) / grid_size
-            ty = (p['y'] - min_y) / grid_size
-            tile_points.append((tx, ty))
-        
-        pxs = [p[0] for p in tile_points]
-        pys = [p[1] for p in tile_points]
-        px_min = max(0, int(min(pxs)))
-        px_max = min(grid_w, int(max(pxs)) + 1)
-        py_min = max(0, int(min(pys)))
-        py_max = min(grid_h, int(max(pys)) + 1)
-        
-        for ty in range(py_min, py_max):
-            for tx in range(px_min, px_max):
-                if point_in_polygon(tx + 0.5, ty + 0.5, tile_points):
-                    # 더 높은 floor가 우선
-                    if np.isnan(height_map[ty, tx]) or floor_height > height_map[ty, tx]:
-                        height_map[ty, tx] = floor_height
+        # 더 높은 floor가 우선 (fmax: nan = 비어있음은 무시)
+        fill_polygon(height_map, polyfloor_rings(obj, min_x, min_y, grid_size), floor_height, combine=np.fmax)
     
     # 절벽 엣지 수집 (병합을 위해)
     h_edges = {}  # key: (y, from_height, depth), value: list of (x_start, x_end)
@@ -1891,6 +2746,57 @@ def post_process_cliff():
     return jsonify({'cliffs': cliffs})
 
 
+@app.route('/post-process/all', methods=['POST'])
+def post_process_all():
+    """
+    기존 레벨에 벽 + 절벽 (+ 틈 채우기)을 한 번에 생성
+    
+    높이 래스터(polygon edge 방식)를 한 번만 만들고 모든 결과를 거기서 뽑음.
+    options: /post-process/walls, /post-process/cliff와 같은 키 +
+      walls / cliffs (기본 True), fill_gaps (기본 False), gap_max_tiles
+    응답: {'walls': [...], 'cliffs': [...], 'gap_fills': [...] (fill_gaps일 때)}
+    """
+    data = request.json
+    objects = data.get('objects', [])
+    options = data.get('options', {})
+    grid_size = 32  # 1m = 32px
+    
+    polyfloors = post_process_floors(objects)
+    if not polyfloors:
+        return jsonify({'walls': [], 'cliffs': []})
+    
+    height_grid, min_x, min_y = cached_floor_heights(polyfloors, grid_size)
+    print(f"[DEBUG] Post-process all: {len(polyfloors)} floors -> {height_grid.shape} raster", flush=True)
+    
+    result = {}
+    if options.get('walls', True):
+        result['walls'] = walls_from_height_raster(height_grid, min_x, min_y, options, grid_size)
+    if options.get('cliffs', True):
+        result['cliffs'] = cliffs_from_height_raster(height_grid, min_x, min_y, options, grid_size)
+    if options.get('fill_gaps', False):
+        result['gap_fills'] = gap_fills_from_height_raster(height_grid, min_x, min_y, options, grid_size)
+    return jsonify(result)
+
+
+@app.route('/post-process/cache', methods=['GET', 'POST'])
+def post_process_cache():
+    """
+    post-process 래스터 캐시 상태 (hit/miss 카운터)
+    
+    POST options: max_bytes (바이트 상한 변경), clear (true면 비움)
+    """
+    if request.method == 'POST':
+        data = request.json or {}
+        if 'max_bytes' in data:
+            max_bytes = data['max_bytes']
+            if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes < 0:
+                return jsonify({'error': 'max_bytes must be a non-negative integer'}), 400
+            raster_cache.resize(max_bytes)
+        if data.get('clear'):
+            raster_cache.clear()
+    return jsonify(raster_cache.stats())
+
+
 @app.route('/health')
 def health():
     return jsonify({'status': 'ok', 'version': 'rooms_and_corridors'})
@@ -1945,6 +2851,16 @@ def generate():
         }
         options = {'seed': int(request.args.get('seed', random.randint(0, 999999)))}
     
+    if options.get('mode') == 'best_of_n':
+        try:
+            return jsonify(generate_best_of_n(bounds, options))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return jsonify({'error': str(e)}), 500
+    
     try:
         result = generate_map(bounds, options)
         return jsonify(result)
@@ -1954,6 +2870,30 @@ def generate():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/generate/batch', methods=['POST'])
+def generate_batch():
+    """
+    여러 시드 일괄 생성
+    body: {bounds, options, seeds: [..] | seed_range: [start, end], timeout?}
+    """
+    data = request.get_json() or {}
+    bounds = data.get('bounds', {'x': 0, 'y': 0, 'width': 4800, 'height': 4800})
+    options = data.get('options', {})
+    
+    try:
+        timeout = parse_batch_timeout(data.get('timeout', BATCH_JOB_TIMEOUT))
+        results = generate_map_batch(bounds, options,
+                                     seeds=data.get('seeds'), seed_range=data.get('seed_range'),
+                                     timeout=timeout)
+        return jsonify({'results': results, 'count': len(results)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/connect', methods=['POST', 'OPTIONS'])
 def connect_points():
     """두 점 사이에 프로시저럴 경로 생성"""
@@ -26,7 +26,8 @@ import os
 import importlib
 import inspect
 from typing import List, Type, Dict
-from .base import MapTemplate, Tile, TILE_COLORS
+from .base import (MapTemplate, Tile, TILE_COLORS, TileGrid, PackedMask, GenerationContext,
+                   WALKABLE_LUT, OPEN_FLOOR_LUT, BLOCKS_SIGHT_LUT, COVER_LUT, MARKER_LUT)
 
 
 def get_all_templates() -> List[Type[MapTemplate]]:
@@ -95,6 +96,14 @@ __all__ = [
     'MapTemplate',
     'Tile', 
     'TILE_COLORS',
+    'TileGrid',
+    'PackedMask',
+    'GenerationContext',
+    'WALKABLE_LUT',
+    'OPEN_FLOOR_LUT',
+    'BLOCKS_SIGHT_LUT',
+    'COVER_LUT',
+    'MARKER_LUT',
     'get_all_templates',
     'get_template_by_name',
     'list_templates',
@@ -6,7 +6,7 @@
 
 import numpy as np
 from typing import Tuple, Dict
-from .base import MapTemplate, Tile
+from .base import MapTemplate, Tile, TileGrid
 
 
 class AncientTemplate(MapTemplate):
@@ -20,7 +20,7 @@ class AncientTemplate(MapTemplate):
             np.random.seed(seed)
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
         # === T Spawn (하단) ===
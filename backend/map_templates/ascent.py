@@ -6,7 +6,7 @@ A/B 사이트 모두 접근성 좋음
 
 import numpy as np
 from typing import Tuple, Dict
-from .base import MapTemplate, Tile
+from .base import MapTemplate, Tile, TileGrid
 
 
 class AscentTemplate(MapTemplate):
@@ -20,7 +20,7 @@ class AscentTemplate(MapTemplate):
             np.random.seed(seed)
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
         # === Attack Spawn (우측) ===
@@ -4,8 +4,10 @@
 """
 
 import numpy as np
-from typing import Tuple, Dict
+from scipy import ndimage
+from typing import Tuple, Dict, Optional
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 
 
 # ============================================================
@@ -43,6 +45,149 @@ TILE_COLORS = {
 }
 
 
+# ============================================================
+# 타일 속성 테이블 (타일 ID로 인덱싱하는 bool 룩업 배열)
+# 사용 예: walkable = WALKABLE_LUT[map_array]  (전체 맵 마스크를 한 번에 생성)
+# ============================================================
+TILE_TYPE_COUNT = Tile.PILLAR + 1
+
+
+def _tile_lut(*tiles) -> np.ndarray:
+    lut = np.zeros(TILE_TYPE_COUNT, dtype=bool)
+    lut[list(tiles)] = True
+    lut.flags.writeable = False
+    return lut
+
+
+# 이동 가능 (바닥, 커버, 사이트/스폰 마커, 램프, 기둥)
+WALKABLE_LUT = _tile_lut(
+    Tile.FLOOR, Tile.COVER_HALF, Tile.COVER_FULL, Tile.BOX,
+    Tile.SITE_A, Tile.SITE_B, Tile.SPAWN_ATK, Tile.SPAWN_DEF,
+    Tile.RAMP, Tile.PILLAR,
+)
+
+# 필수 연결 검사용 통로 (바닥 + 사이트/스폰 마커) - 커버/박스/램프/기둥은 막힌 칸으로 봄
+OPEN_FLOOR_LUT = _tile_lut(
+    Tile.FLOOR, Tile.SITE_A, Tile.SITE_B, Tile.SPAWN_ATK, Tile.SPAWN_DEF,
+)
+
+# 시야 차단
+BLOCKS_SIGHT_LUT = _tile_lut(
+    Tile.VOID, Tile.WALL, Tile.COVER_FULL, Tile.BOX, Tile.PILLAR,
+)
+
+# 엄폐물
+COVER_LUT = _tile_lut(Tile.COVER_HALF, Tile.COVER_FULL, Tile.BOX)
+
+# 사이트/스폰 마커
+MARKER_LUT = _tile_lut(Tile.SITE_A, Tile.SITE_B, Tile.SPAWN_ATK, Tile.SPAWN_DEF)
+
+
+# ============================================================
+# 타일 그리드 (uint8, 타일당 1바이트)
+# ============================================================
+class PackedMask:
+    """
+    np.packbits로 압축한 bool 레이어 (셀당 1비트)
+    많은 마스크를 메모리에 캐시할 때 사용
+    """
+    
+    __slots__ = ('bits', 'shape')
+    
+    def __init__(self, mask: np.ndarray):
+        mask = np.asarray(mask, dtype=bool)
+        self.shape = mask.shape
+        self.bits = np.packbits(mask, axis=-1)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+    
+    def unpack(self) -> np.ndarray:
+        """bool 배열로 복원"""
+        return np.unpackbits(self.bits, axis=-1, count=self.shape[-1]).astype(bool)
+    
+    def count(self) -> int:
+        """True 셀 개수"""
+        return int(np.unpackbits(self.bits).sum())
+
+
+class TileGrid(np.ndarray):
+    """
+    uint8 타일 배열 (np.ndarray 서브클래스)
+    - 12종 타일이면 1바이트로 충분 (int32 대비 1/4 메모리)
+    - 기존 코드의 m[y, x], 슬라이스, 비교 연산 그대로 사용 가능
+    - 비교/산술 결과(bool, float 등)는 일반 ndarray로 반환
+    
+    사용 예:
+        m = TileGrid(150)                       # 150x150 VOID
+        walkable = m.mask(WALKABLE_LUT)         # bool 마스크
+        packed = m.packed_mask(WALKABLE_LUT)    # 비트 압축 마스크
+    """
+    
+    def __new__(cls, height: int, width: int = None, fill=Tile.VOID):
+        width = height if width is None else width
+        grid = np.full((height, width), fill, dtype=np.uint8)
+        return grid.view(cls)
+    
+    @classmethod
+    def from_array(cls, array) -> 'TileGrid':
+        """기존 타일 배열(int32 등)을 TileGrid로 변환 (이미 TileGrid면 그대로)"""
+        if isinstance(array, cls):
+            return array
+        array = np.asarray(array)
+        if array.size and (array.min() < 0 or array.max() >= TILE_TYPE_COUNT):
+            raise ValueError(f"tile ids must be in [0, {TILE_TYPE_COUNT}), got {array.min()}..{array.max()}")
+        return np.ascontiguousarray(array, dtype=np.uint8).view(cls)
+    
+    def __array_wrap__(self, obj, context=None, return_scalar=False):
+        # 타일 ID가 아닌 결과(bool 마스크 등)는 일반 ndarray로
+        if obj.dtype != np.uint8:
+            obj = obj.view(np.ndarray)
+            return obj[()] if return_scalar else obj
+        if return_scalar:
+            return super().__array_wrap__(obj, context, return_scalar)
+        return super().__array_wrap__(obj, context)
+    
+    def mask(self, lut: np.ndarray) -> np.ndarray:
+        """타일 속성 테이블로 bool 마스크 생성 (예: WALKABLE_LUT)"""
+        return lut[self.view(np.ndarray)]
+    
+    def packed_mask(self, lut: np.ndarray) -> PackedMask:
+        """mask()의 비트 압축 버전"""
+        return PackedMask(self.mask(lut))
+
+
+# ============================================================
+# 요청별 생성 컨텍스트
+# ============================================================
+@dataclass
+class GenerationContext:
+    """
+    한 번의 generate 호출에 필요한 상태 (규칙, 입력, 전용 RNG)
+    
+    클래스 속성이나 전역 np.random 상태를 쓰지 않으므로
+    여러 스레드에서 동시에 생성해도 서로 간섭하지 않음.
+    
+    rng는 np.random.RandomState: np.random 모듈과 같은 API
+    (randint, random, choice, uniform, shuffle)라서 기존 코드를
+    rng.xxx로 그대로 옮길 수 있고, 같은 시드는 이전과 같은 맵을 만듦.
+    """
+    rules: dict
+    rng: np.random.RandomState
+    seed: Optional[int] = None
+    site_count: int = 2
+    user_layout: Optional[dict] = None
+    waypoints: dict = field(default_factory=dict)
+    custom_connections: list = field(default_factory=list)
+    removed_connections: set = field(default_factory=set)
+    
+    @classmethod
+    def create(cls, rules: dict, seed=None, **inputs) -> 'GenerationContext':
+        """시드로 전용 RNG를 만들어 컨텍스트 생성"""
+        return cls(rules=rules, rng=np.random.RandomState(seed), seed=seed, **inputs)
+
+
 # ============================================================
 # 맵 템플릿 베이스 클래스
 # ============================================================
@@ -86,7 +231,7 @@ class MapTemplate(ABC):
             seed: 랜덤 시드 (재현성을 위해)
         
         Returns:
-            map_array: np.ndarray (size x size) - 타일 배열
+            map_array: TileGrid (size x size, uint8) - 타일 배열
             rooms: Dict - 방 정보 {이름: {x, y, w, h}}
         """
         raise NotImplementedError
@@ -132,15 +277,17 @@ class MapTemplate(ABC):
     @staticmethod
     def connect_rooms(map_array: np.ndarray, rooms: Dict, 
                       name1: str, name2: str, width: int = 4,
-                      max_straight: int = 15, waypoints: list = None):
+                      max_straight: int = 15, waypoints: list = None, rng=None):
         """
         두 방을 복도로 연결 (꺾임 포함)
         - 긴 직선은 중간에 꺾임 추가
         - max_straight: 최대 직선 길이 (기본 15타일 = 15m = 3초)
         - waypoints: 경유점 리스트 [{'x': float, 'y': float}, ...] (타일 좌표)
+        - rng: 꺾임 위치용 난수 생성기 (None이면 전역 np.random)
         """
         if name1 not in rooms or name2 not in rooms:
             return
+        rng = np.random if rng is None else rng
         
         # 연결 정보 저장소 초기화
         if '_connections' not in rooms:
@@ -173,9 +320,9 @@ class MapTemplate(ABC):
         
         if dist_x > MAX_STRAIGHT and dist_y > MAX_STRAIGHT:
             # S자 연결 (2번 꺾임)
-            mid_x = (cx1 + cx2) // 2 + np.random.randint(-5, 6)
-            mid_y1 = cy1 + (cy2 - cy1) // 3 + np.random.randint(-3, 4)
-            mid_y2 = cy1 + (cy2 - cy1) * 2 // 3 + np.random.randint(-3, 4)
+            mid_x = (cx1 + cx2) // 2 + rng.randint(-5, 6)
+            mid_y1 = cy1 + (cy2 - cy1) // 3 + rng.randint(-3, 4)
+            mid_y2 = cy1 + (cy2 - cy1) * 2 // 3 + rng.randint(-3, 4)
             
             # 꺾임점 기록 (S자: 4개 꺾임점)
             bend_points = [
@@ -185,45 +332,17 @@ class MapTemplate(ABC):
                 {'x': cx2, 'y': mid_y2}
             ]
             
-            # 1단계: cy1 → mid_y1 (수직)
-            for y in range(min(cy1, mid_y1), max(cy1, mid_y1) + 1):
-                for dx in range(-half, half + 1):
-                    nx = cx1 + dx
-                    if 0 <= y < s and 0 <= nx < s and map_array[y, nx] == Tile.VOID:
-                        map_array[y, nx] = Tile.FLOOR
-            
-            # 2단계: cx1 → mid_x (수평, mid_y1 높이)
-            for x in range(min(cx1, mid_x), max(cx1, mid_x) + 1):
-                for dy in range(-half, half + 1):
-                    ny = mid_y1 + dy
-                    if 0 <= ny < s and 0 <= x < s and map_array[ny, x] == Tile.VOID:
-                        map_array[ny, x] = Tile.FLOOR
-            
-            # 3단계: mid_y1 → mid_y2 (수직, mid_x 위치)
-            for y in range(min(mid_y1, mid_y2), max(mid_y1, mid_y2) + 1):
-                for dx in range(-half, half + 1):
-                    nx = mid_x + dx
-                    if 0 <= y < s and 0 <= nx < s and map_array[y, nx] == Tile.VOID:
-                        map_array[y, nx] = Tile.FLOOR
-            
-            # 4단계: mid_x → cx2 (수평, mid_y2 높이)
-            for x in range(min(mid_x, cx2), max(mid_x, cx2) + 1):
-                for dy in range(-half, half + 1):
-                    ny = mid_y2 + dy
-                    if 0 <= ny < s and 0 <= x < s and map_array[ny, x] == Tile.VOID:
-                        map_array[ny, x] = Tile.FLOOR
-            
-            # 5단계: mid_y2 → cy2 (수직)
-            for y in range(min(mid_y2, cy2), max(mid_y2, cy2) + 1):
-                for dx in range(-half, half + 1):
-                    nx = cx2 + dx
-                    if 0 <= y < s and 0 <= nx < s and map_array[y, nx] == Tile.VOID:
-                        map_array[y, nx] = Tile.FLOOR
+            # cy1 → mid_y1 (수직) → mid_x (수평) → mid_y2 (수직) → cx2 (수평) → cy2 (수직)
+            MapTemplate.carve_vertical(map_array, cx1, cy1, mid_y1, half)
+            MapTemplate.carve_horizontal(map_array, mid_y1, cx1, mid_x, half)
+            MapTemplate.carve_vertical(map_array, mid_x, mid_y1, mid_y2, half)
+            MapTemplate.carve_horizontal(map_array, mid_y2, mid_x, cx2, half)
+            MapTemplate.carve_vertical(map_array, cx2, mid_y2, cy2, half)
         
         elif dist_x > MAX_STRAIGHT:
             # 긴 수평 → Z자 (중간에 수직 이동)
-            mid_x = (cx1 + cx2) // 2 + np.random.randint(-8, 9)
-            offset_y = np.random.randint(5, 12) * (1 if np.random.random() < 0.5 else -1)
+            mid_x = (cx1 + cx2) // 2 + rng.randint(-8, 9)
+            offset_y = rng.randint(5, 12) * (1 if rng.random() < 0.5 else -1)
             mid_y = cy1 + offset_y
             mid_y = np.clip(mid_y, half + 1, s - half - 2)
             
@@ -234,38 +353,15 @@ class MapTemplate(ABC):
                 {'x': cx2, 'y': mid_y}
             ]
             
-            # cx1 → mid_x
-            for x in range(min(cx1, mid_x), max(cx1, mid_x) + 1):
-                for dy in range(-half, half + 1):
-                    ny = cy1 + dy
-                    if 0 <= ny < s and 0 <= x < s and map_array[ny, x] == Tile.VOID:
-                        map_array[ny, x] = Tile.FLOOR
-            
-            # cy1 → mid_y
-            for y in range(min(cy1, mid_y), max(cy1, mid_y) + 1):
-                for dx in range(-half, half + 1):
-                    nx = mid_x + dx
-                    if 0 <= y < s and 0 <= nx < s and map_array[y, nx] == Tile.VOID:
-                        map_array[y, nx] = Tile.FLOOR
-            
-            # mid_x → cx2
-            for x in range(min(mid_x, cx2), max(mid_x, cx2) + 1):
-                for dy in range(-half, half + 1):
-                    ny = mid_y + dy
-                    if 0 <= ny < s and 0 <= x < s and map_array[ny, x] == Tile.VOID:
-                        map_array[ny, x] = Tile.FLOOR
-            
-            # mid_y → cy2
-            for y in range(min(mid_y, cy2), max(mid_y, cy2) + 1):
-                for dx in range(-half, half + 1):
-                    nx = cx2 + dx
-                    if 0 <= y < s and 0 <= nx < s and map_array[y, nx] == Tile.VOID:
-                        map_array[y, nx] = Tile.FLOOR
+            MapTemplate.carve_horizontal(map_array, cy1, cx1, mid_x, half)
+            MapTemplate.carve_vertical(map_array, mid_x, cy1, mid_y, half)
+            MapTemplate.carve_horizontal(map_array, mid_y, mid_x, cx2, half)
+            MapTemplate.carve_vertical(map_array, cx2, mid_y, cy2, half)
         
         elif dist_y > MAX_STRAIGHT:
             # 긴 수직 → Z자 (중간에 수평 이동)
-            mid_y = (cy1 + cy2) // 2 + np.random.randint(-8, 9)
-            offset_x = np.random.randint(5, 12) * (1 if np.random.random() < 0.5 else -1)
+            mid_y = (cy1 + cy2) // 2 + rng.randint(-8, 9)
+            offset_x = rng.randint(5, 12) * (1 if rng.random() < 0.5 else -1)
             mid_x = cx1 + offset_x
             mid_x = np.clip(mid_x, half + 1, s - half - 2)
             
@@ -276,52 +372,18 @@ class MapTemplate(ABC):
                 {'x': mid_x, 'y': cy2}
             ]
             
-            # cy1 → mid_y
-            for y in range(min(cy1, mid_y), max(cy1, mid_y) + 1):
-                for dx in range(-half, half + 1):
-                    nx = cx1 + dx
-                    if 0 <= y < s and 0 <= nx < s and map_array[y, nx] == Tile.VOID:
-                        map_array[y, nx] = Tile.FLOOR
-            
-            # cx1 → mid_x
-            for x in range(min(cx1, mid_x), max(cx1, mid_x) + 1):
-                for dy in range(-half, half + 1):
-                    ny = mid_y + dy
-                    if 0 <= ny < s and 0 <= x < s and map_array[ny, x] == Tile.VOID:
-                        map_array[ny, x] = Tile.FLOOR
-            
-            # mid_y → cy2
-            for y in range(min(mid_y, cy2), max(mid_y, cy2) + 1):
-                for dx in range(-half, half + 1):
-                    nx = mid_x + dx
-                    if 0 <= y < s and 0 <= nx < s and map_array[y, nx] == Tile.VOID:
-                        map_array[y, nx] = Tile.FLOOR
-            
-            # mid_x → cx2
-            for x in range(min(mid_x, cx2), max(mid_x, cx2) + 1):
-                for dy in range(-half, half + 1):
-                    ny = cy2 + dy
-                    if 0 <= ny < s and 0 <= x < s and map_array[ny, x] == Tile.VOID:
-                        map_array[ny, x] = Tile.FLOOR
+            MapTemplate.carve_vertical(map_array, cx1, cy1, mid_y, half)
+            MapTemplate.carve_horizontal(map_array, mid_y, cx1, mid_x, half)
+            MapTemplate.carve_vertical(map_array, mid_x, mid_y, cy2, half)
+            MapTemplate.carve_horizontal(map_array, cy2, mid_x, cx2, half)
         
         else:
             # 짧은 거리: 기존 L자 연결
             # 꺾임점 기록 (L자: 1개 꺾임점)
             bend_points = [{'x': cx2, 'y': cy1}]
             
-            # 수평 연결
-            for x in range(min(cx1, cx2), max(cx1, cx2) + 1):
-                for dy in range(-half, half + 1):
-                    ny = cy1 + dy
-                    if 0 <= ny < s and 0 <= x < s and map_array[ny, x] == Tile.VOID:
-                        map_array[ny, x] = Tile.FLOOR
-            
-            # 수직 연결
-            for y in range(min(cy1, cy2), max(cy1, cy2) + 1):
-                for dx in range(-half, half + 1):
-                    nx = cx2 + dx
-                    if 0 <= y < s and 0 <= nx < s and map_array[y, nx] == Tile.VOID:
-                        map_array[y, nx] = Tile.FLOOR
+            MapTemplate.carve_horizontal(map_array, cy1, cx1, cx2, half)
+            MapTemplate.carve_vertical(map_array, cx2, cy1, cy2, half)
         
         # 꺾임점 저장 (있으면)
         if bend_points:
@@ -332,7 +394,6 @@ class MapTemplate(ABC):
                                name1: str, name2: str, width: int, waypoints: list):
         """웨이포인트를 경유하여 두 방 연결"""
         r1, r2 = rooms[name1], rooms[name2]
-        s = map_array.shape[0]
         half = width // 2
         
         # 시작점, 웨이포인트들, 끝점을 순서대로 연결
@@ -348,25 +409,42 @@ class MapTemplate(ABC):
             points.append((wx, wy))
         points.append((cx2, cy2))
         
-        # 순차적으로 L자 연결
+        # 순차적으로 L자 연결 (먼저 수평, 그 다음 수직)
         for i in range(len(points) - 1):
             px1, py1 = points[i]
             px2, py2 = points[i + 1]
-            
-            # L자 연결: 먼저 수평, 그 다음 수직
-            # 수평 연결
-            for x in range(min(px1, px2), max(px1, px2) + 1):
-                for dy in range(-half, half + 1):
-                    ny = py1 + dy
-                    if 0 <= ny < s and 0 <= x < s and map_array[ny, x] == Tile.VOID:
-                        map_array[ny, x] = Tile.FLOOR
-            
-            # 수직 연결
-            for y in range(min(py1, py2), max(py1, py2) + 1):
-                for dx in range(-half, half + 1):
-                    nx = px2 + dx
-                    if 0 <= y < s and 0 <= nx < s and map_array[y, nx] == Tile.VOID:
-                        map_array[y, nx] = Tile.FLOOR
+            MapTemplate.carve_horizontal(map_array, py1, px1, px2, half)
+            MapTemplate.carve_vertical(map_array, px2, py1, py2, half)
+    
+    @staticmethod
+    def carve_rect(map_array: np.ndarray, y1: int, y2: int, x1: int, x2: int,
+                   tile=Tile.FLOOR, only_void: bool = True):
+        """
+        사각형 영역 [y1, y2] x [x1, x2] (양끝 포함)를 한 번의 슬라이스로 채움
+        - 맵 범위 밖은 잘라냄
+        - only_void: True면 VOID 타일만 덮어씀 (기존 방/마커 보존)
+        """
+        h, w = map_array.shape
+        y_lo, y_hi = max(0, int(min(y1, y2))), min(h, int(max(y1, y2)) + 1)
+        x_lo, x_hi = max(0, int(min(x1, x2))), min(w, int(max(x1, x2)) + 1)
+        if y_lo >= y_hi or x_lo >= x_hi:
+            return
+        
+        view = map_array[y_lo:y_hi, x_lo:x_hi]
+        if only_void:
+            view[view == Tile.VOID] = tile
+        else:
+            view[:] = tile
+    
+    @staticmethod
+    def carve_horizontal(map_array: np.ndarray, y: int, x1: int, x2: int, half: int):
+        """y 행을 중심으로 x1 → x2 수평 복도 (너비 2*half+1)"""
+        MapTemplate.carve_rect(map_array, y - half, y + half, x1, x2)
+    
+    @staticmethod
+    def carve_vertical(map_array: np.ndarray, x: int, y1: int, y2: int, half: int):
+        """x 열을 중심으로 y1 → y2 수직 복도 (너비 2*half+1)"""
+        MapTemplate.carve_rect(map_array, y1, y2, x - half, x + half)
     
     @staticmethod
     def add_random_covers(map_array: np.ndarray, rooms: Dict):
@@ -397,40 +475,30 @@ class MapTemplate(ABC):
     def generate_walls(map_array: np.ndarray):
         """
         바닥 타일 주변에 벽 생성
+        - walkable 마스크를 3x3으로 팽창(dilation)시킨 뒤
+          팽창 영역에 걸친 VOID 타일을 한 번에 WALL로 변경
         """
-        s = map_array.shape[0]
-        new_map = map_array.copy()
-        walkable = {Tile.FLOOR, Tile.COVER_HALF, Tile.COVER_FULL, Tile.BOX,
-                   Tile.SITE_A, Tile.SITE_B, Tile.SPAWN_ATK, Tile.SPAWN_DEF, 
-                   Tile.RAMP, Tile.PILLAR}
-        
-        for y in range(s):
-            for x in range(s):
-                if map_array[y, x] == Tile.VOID:
-                    for dy in range(-1, 2):
-                        for dx in range(-1, 2):
-                            ny, nx = y + dy, x + dx
-                            if 0 <= ny < s and 0 <= nx < s:
-                                if map_array[ny, nx] in walkable:
-                                    new_map[y, x] = Tile.WALL
-                                    break
-                        if new_map[y, x] == Tile.WALL:
-                            break
-        
-        map_array[:] = new_map
+        walkable_mask = WALKABLE_LUT[map_array]
+        near_floor = ndimage.binary_dilation(walkable_mask, structure=np.ones((3, 3), dtype=bool))
+        map_array[near_floor & (map_array == Tile.VOID)] = Tile.WALL
     
     @staticmethod
-    def remove_isolated_areas(map_array: np.ndarray, rooms: Dict):
+    def remove_isolated_areas(map_array: np.ndarray, rooms: Dict) -> Dict:
         """
         고립된 영역(스폰에서 도달 불가능한 영역)을 제거합니다.
-        ATK_SPAWN과 DEF_SPAWN에서 flood fill로 도달 가능한 영역만 유지.
-        """
-        from collections import deque
+        walkable 마스크를 4방향 연결 컴포넌트로 라벨링하고,
+        ATK_SPAWN/DEF_SPAWN 중심이 속한 컴포넌트만 유지.
         
+        Returns:
+            컴포넌트 통계 {'count', 'sizes', 'kept', 'removed'}
+            - sizes: 라벨 1..count 각 컴포넌트의 타일 수
+            - kept: 유지된 라벨 목록
+        """
         s = map_array.shape[0]
-        walkable = {Tile.FLOOR, Tile.COVER_HALF, Tile.COVER_FULL, Tile.BOX,
-                   Tile.SITE_A, Tile.SITE_B, Tile.SPAWN_ATK, Tile.SPAWN_DEF, 
-                   Tile.RAMP, Tile.PILLAR}
+        walkable_mask = WALKABLE_LUT[map_array]
+        labels, count = ndimage.label(walkable_mask)
+        sizes = np.bincount(labels.ravel(), minlength=count + 1)[1:]
+        stats = {'count': int(count), 'sizes': sizes.tolist(), 'kept': [], 'removed': 0}
         
         # 시작점 찾기 (ATK_SPAWN 또는 DEF_SPAWN)
         start_points = []
@@ -443,46 +511,22 @@ class MapTemplate(ABC):
                     start_points.append((cy, cx))
         
         if not start_points:
-            # 스폰이 없으면 walkable 타일 중 아무거나
-            for y in range(s):
-                for x in range(s):
-                    if map_array[y, x] in walkable:
-                        start_points.append((y, x))
-                        break
-                if start_points:
-                    break
-        
-        if not start_points:
-            return  # 도달 가능한 영역 없음
+            # 스폰이 없으면 walkable 타일 중 아무거나 (행 우선 첫 타일)
+            if count == 0:
+                return stats  # 도달 가능한 영역 없음
+            start_points.append(tuple(np.argwhere(walkable_mask)[0]))
         
-        # BFS로 도달 가능한 영역 찾기
-        reachable = set()
-        queue = deque(start_points)
+        kept = sorted({int(labels[y, x]) for y, x in start_points if labels[y, x] > 0})
+        stats['kept'] = kept
         
-        while queue:
-            y, x = queue.popleft()
-            if (y, x) in reachable:
-                continue
-            if not (0 <= y < s and 0 <= x < s):
-                continue
-            if map_array[y, x] not in walkable:
-                continue
-            
-            reachable.add((y, x))
-            
-            # 4방향 탐색
-            for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                ny, nx = y + dy, x + dx
-                if (ny, nx) not in reachable:
-                    queue.append((ny, nx))
-        
-        # 도달 불가능한 walkable 영역을 VOID로 변환
-        removed_count = 0
-        for y in range(s):
-            for x in range(s):
-                if map_array[y, x] in walkable and (y, x) not in reachable:
-                    map_array[y, x] = Tile.VOID
-                    removed_count += 1
+        # 유지할 컴포넌트 외의 walkable 타일을 VOID로 변환
+        isolated = walkable_mask & ~np.isin(labels, kept)
+        removed_count = int(np.count_nonzero(isolated))
+        map_array[isolated] = Tile.VOID
+        stats['removed'] = removed_count
         
         if removed_count > 0:
-            print(f"[DEBUG] Removed {removed_count} isolated tiles", flush=True)
+            print(f"[DEBUG] Removed {removed_count} isolated tiles "
+                  f"({count - len(kept)} of {count} components)", flush=True)
+        
+        return stats
@@ -6,7 +6,7 @@ Mid가 핵심
 
 import numpy as np
 from typing import Tuple, Dict
-from .base import MapTemplate, Tile
+from .base import MapTemplate, Tile, TileGrid
 
 
 class CacheTemplate(MapTemplate):
@@ -20,7 +20,7 @@ class CacheTemplate(MapTemplate):
             np.random.seed(seed)
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
         # === T Spawn (하단) ===
@@ -6,7 +6,7 @@ H자 구조, 공격팀이 양쪽에서 시작
 
 import numpy as np
 from typing import Tuple, Dict
-from .base import MapTemplate, Tile
+from .base import MapTemplate, Tile, TileGrid
 
 
 class FractureTemplate(MapTemplate):
@@ -20,7 +20,7 @@ class FractureTemplate(MapTemplate):
             np.random.seed(seed)
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
         # === Attack Spawn (양쪽! - Fracture 특징) ===
@@ -6,7 +6,7 @@ B사이트 Yellow/Green 구조
 
 import numpy as np
 from typing import Tuple, Dict
-from .base import MapTemplate, Tile
+from .base import MapTemplate, Tile, TileGrid
 
 
 class IceboxTemplate(MapTemplate):
@@ -20,7 +20,7 @@ class IceboxTemplate(MapTemplate):
             np.random.seed(seed)
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
         # === Attack Spawn (하단) ===
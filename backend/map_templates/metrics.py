@@ -0,0 +1,263 @@
+"""
+거리장(distance field) 기반 맵 측정
+
+- 걷기 가능 마스크 위에서 다중 출발점 BFS (NumPy 벡터화, 4방향, 1타일 = 1m)
+- 스폰→사이트, 사이트↔사이트 이동 거리를 측정하고
+  DESIGN_RULES의 타이밍 규칙(atk_to_site_time 등)과 비교
+"""
+
+import numpy as np
+from itertools import combinations
+from typing import Dict, Iterable, Optional, Tuple
+from .base import WALKABLE_LUT
+
+
+SPAWN_NAMES = ['ATK_SPAWN', 'DEF_SPAWN']
+SITE_NAMES = ['A_SITE', 'B_SITE', 'C_SITE']
+
+# 규칙 이름 → (출발점 목록, 도착점 목록)
+TIMING_RULES = {
+    'atk_to_site_time': (['ATK_SPAWN'], SITE_NAMES),
+    'def_to_site_time': (['DEF_SPAWN'], SITE_NAMES),
+}
+
+
+def distance_field(walkable: np.ndarray, sources: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """
+    다중 출발점 BFS 거리장
+
+    Args:
+        walkable: bool 마스크 (h x w)
+        sources: 출발 타일 [(y, x), ...] - 걷기 불가 타일은 무시
+
+    Returns:
+        int32 배열 (h x w), 출발점에서의 최단 걷기 거리 (도달 불가 = -1)
+    """
+    h, w = walkable.shape
+    stride = w + 2
+
+    # 1칸 패딩: 이웃 인덱스가 항상 배열 안에 있고 패딩은 막힌 칸
+    open_cells = np.zeros((h + 2, w + 2), dtype=bool)
+    open_cells[1:-1, 1:-1] = walkable
+    open_flat = open_cells.ravel()
+
+    dist = np.full(open_flat.size, -1, dtype=np.int32)
+    frontier = np.unique(np.array(
+        [(y + 1) * stride + (x + 1) for y, x in sources if 0 <= y < h and 0 <= x < w],
+        dtype=np.intp))
+    frontier = frontier[open_flat[frontier]]
+    dist[frontier] = 0
+
+    offsets = np.array([-stride, stride, -1, 1], dtype=np.intp)
+    d = 0
+    while frontier.size:
+        d += 1
+        neighbors = (frontier[:, None] + offsets).ravel()
+        neighbors = np.unique(neighbors[open_flat[neighbors] & (dist[neighbors] < 0)])
+        dist[neighbors] = d
+        frontier = neighbors
+
+    return dist.reshape(h + 2, w + 2)[1:-1, 1:-1]
+
+
+def room_center(room: dict) -> Tuple[int, int]:
+    """방 중심 타일 (y, x) - v3는 'center' 사용"""
+    if 'center' in room:
+        return tuple(room['center'])
+    return room['y'] + room['h'] // 2, room['x'] + room['w'] // 2
+
+
+def marker_distances(tile_map: np.ndarray, rooms: dict,
+                     names: Optional[list] = None) -> Dict[str, Dict[str, Optional[int]]]:
+    """
+    마커(스폰/사이트) 간 걷기 거리 - 출발점마다 BFS 한 번
+
+    Returns:
+        {출발 이름: {도착 이름: 거리 또는 None(도달 불가)}}
+    """
+    walkable = WALKABLE_LUT[np.asarray(tile_map)]
+    names = [n for n in (names or SPAWN_NAMES + SITE_NAMES) if n in rooms]
+    centers = {n: room_center(rooms[n]) for n in names}
+
+    result = {}
+    for src in names:
+        field = distance_field(walkable, [centers[src]])
+        row = {}
+        for dst in names:
+            if dst == src:
+                continue
+            y, x = centers[dst]
+            d = int(field[y, x]) if 0 <= y < field.shape[0] and 0 <= x < field.shape[1] else -1
+            row[dst] = d if d >= 0 else None
+        result[src] = row
+    return result
+
+
+def compute_timing_metrics(tile_map: np.ndarray, rooms: dict, rules: dict) -> dict:
+    """
+    타이밍 규칙 검증용 metrics 블록
+
+    규칙 범위는 (min, max) 양끝 포함으로 비교.
+    도달 불가한 쌍은 항상 규칙 위반.
+
+    Returns:
+        {
+            'distances': {'ATK_SPAWN->A_SITE': 72, ...},
+            'checks': [{'rule', 'pair', 'value', 'range', 'ok'}, ...],
+            'within_spec': bool
+        }
+    """
+    dist = marker_distances(tile_map, rooms)
+
+    distances = {}
+    for src, row in dist.items():
+        for dst, d in row.items():
+            distances[f"{src}->{dst}"] = d
+
+    pairs = {rule: [(s, t) for s in srcs for t in dsts if s in dist and t in dist]
+             for rule, (srcs, dsts) in TIMING_RULES.items()}
+    sites = [n for n in SITE_NAMES if n in dist]
+    pairs['rotation_time'] = list(combinations(sites, 2))
+
+    checks = []
+    for rule, rule_pairs in pairs.items():
+        if rule not in rules:
+            continue
+        low, high = rules[rule]
+        for src, dst in rule_pairs:
+            d = dist[src][dst]
+            checks.append({
+                'rule': rule,
+                'pair': f"{src}->{dst}",
+                'value': d,
+                'range': [low, high],
+                'ok': d is not None and low <= d <= high,
+            })
+
+    return {
+        'distances': distances,
+        'checks': checks,
+        'within_spec': all(c['ok'] for c in checks),
+    }
+
+
+# ============================================================
+# 후보 맵 점수 (best_of_n 모드)
+# ============================================================
+
+# 점수 가중치 (합 1.0)
+SCORE_WEIGHTS = {
+    'timing': 0.5,
+    'corridor_width': 0.25,
+    'straight_run': 0.25,
+}
+
+
+def run_lengths(mask: np.ndarray, axis: int = 1) -> np.ndarray:
+    """
+    각 True 칸이 속한 직선 구간(run)의 길이
+
+    axis=1: 가로 구간, axis=0: 세로 구간. False 칸은 0.
+    """
+    m = mask if axis == 1 else mask.T
+    h, w = m.shape
+
+    # 행마다 양끝 패딩 → 행 경계를 넘는 구간이 생기지 않음
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = m
+    edges = np.diff(padded, axis=1).ravel()
+    lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+    # 구간과 True 칸 모두 행 우선 순서 → 구간 길이를 칸 수만큼 반복해서 채움
+    out = np.zeros((h, w), dtype=np.int32)
+    out[m] = np.repeat(lengths, lengths)
+    return out if axis == 1 else out.T
+
+
+def corridor_mask(tile_map: np.ndarray, rooms: dict) -> np.ndarray:
+    """방 영역 밖의 걷기 가능 타일 = 통로 (v3는 방 마스크, v2는 방 사각형 기준)"""
+    mask = WALKABLE_LUT[np.asarray(tile_map)].copy()
+    for room in rooms.values():
+        if 'mask' in room:
+            mask &= ~room['mask']
+        elif 'w' in room:  # '_connections' 같은 메타 항목 제외
+            mask[max(room['y'], 0):room['y'] + room['h'],
+                 max(room['x'], 0):room['x'] + room['w']] = False
+    return mask
+
+
+def measure_corridors(tile_map: np.ndarray, rooms: dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    통로 타일별 (폭, 직선 길이)
+
+    축 정렬 통로 기준: 가로/세로 구간 중 짧은 쪽이 폭, 긴 쪽이 직선 길이.
+    반환 배열은 통로 타일 수만큼의 1차원 int32.
+    """
+    mask = corridor_mask(tile_map, rooms)
+    horizontal = run_lengths(mask, axis=1)[mask]
+    vertical = run_lengths(mask, axis=0)[mask]
+    return np.minimum(horizontal, vertical), np.maximum(horizontal, vertical)
+
+
+def _timing_score(checks: list) -> float:
+    """범위 안 = 1, 범위를 벗어난 만큼 범위 폭에 비례해 감점 (최소 0)"""
+    if not checks:
+        return 1.0
+    total = 0.0
+    for c in checks:
+        low, high = c['range']
+        d = c['value']
+        overshoot = max(low - d, d - high, 0)
+        total += max(0.0, 1.0 - overshoot / max(high - low, 1))
+    return total / len(checks)
+
+
+def score_candidate(tile_map: np.ndarray, rooms: dict, rules: dict,
+                    strict_timing: bool = False) -> dict:
+    """
+    후보 맵을 규칙에 대해 채점
+
+    하드 제약 (실패 즉시 거부, 이후 측정 생략):
+    - 모든 스폰→사이트 경로가 연결되어 있어야 함
+    - strict_timing이면 타이밍 규칙도 모두 범위 안이어야 함
+
+    Returns:
+        {'score': 0~1 또는 None(거부), 'rejected': 사유 또는 None,
+         'components': {...}, 'metrics': compute_timing_metrics 결과}
+    """
+    metrics = compute_timing_metrics(tile_map, rooms, rules)
+
+    def rejected(reason):
+        return {'score': None, 'rejected': reason, 'components': {}, 'metrics': metrics}
+
+    for src in SPAWN_NAMES:
+        for dst in SITE_NAMES:
+            pair = f"{src}->{dst}"
+            if pair in metrics['distances'] and metrics['distances'][pair] is None:
+                return rejected(f"unreachable: {pair}")
+
+    unreachable = [c['pair'] for c in metrics['checks'] if c['value'] is None]
+    if unreachable:
+        return rejected(f"unreachable: {unreachable[0]}")
+    if strict_timing and not metrics['within_spec']:
+        failed = next(c for c in metrics['checks'] if not c['ok'])
+        return rejected(f"{failed['rule']} out of range: {failed['pair']}={failed['value']}")
+
+    widths, straights = measure_corridors(tile_map, rooms)
+    min_w = rules.get('corridor_min_width', 0)
+    max_w = rules.get('corridor_max_width', np.inf)
+    max_straight = rules.get('max_straight_corridor', np.inf)
+
+    components = {
+        'timing': _timing_score(metrics['checks']),
+        'corridor_width': float(np.mean((widths >= min_w) & (widths <= max_w))) if widths.size else 1.0,
+        'straight_run': float(np.mean(straights <= max_straight)) if straights.size else 1.0,
+    }
+    score = sum(SCORE_WEIGHTS[k] * v for k, v in components.items())
+
+    return {
+        'score': round(score, 4),
+        'rejected': None,
+        'components': {k: round(v, 4) for k, v in components.items()},
+        'metrics': metrics,
+    }
@@ -5,7 +5,7 @@ Palace, Window/Connector, Underpass가 특징
 
 import numpy as np
 from typing import Tuple, Dict
-from .base import MapTemplate, Tile
+from .base import MapTemplate, Tile, TileGrid
 
 
 class MirageTemplate(MapTemplate):
@@ -19,7 +19,7 @@ class MirageTemplate(MapTemplate):
             np.random.seed(seed)
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
         # T Spawn
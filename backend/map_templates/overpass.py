@@ -6,7 +6,7 @@ A Long이 매우 김
 
 import numpy as np
 from typing import Tuple, Dict
-from .base import MapTemplate, Tile
+from .base import MapTemplate, Tile, TileGrid
 
 
 class OverpassTemplate(MapTemplate):
@@ -20,7 +20,7 @@ class OverpassTemplate(MapTemplate):
             np.random.seed(seed)
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
         # === T Spawn (좌측 하단) ===
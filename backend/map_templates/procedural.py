@@ -12,7 +12,7 @@
 
 import numpy as np
 from typing import Tuple, Dict, List
-from .base import MapTemplate, Tile
+from .base import MapTemplate, Tile, TileGrid, OPEN_FLOOR_LUT
 
 
 class ProceduralTemplate(MapTemplate):
@@ -47,7 +47,7 @@ class ProceduralTemplate(MapTemplate):
             np.random.seed(seed)
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
         # 1. 맵 레이아웃 타입 선택
@@ -327,8 +327,6 @@ class ProceduralTemplate(MapTemplate):
         """모든 주요 지점이 연결되어 있는지 확인"""
         from collections import deque
         
-        walkable = {Tile.FLOOR, Tile.SITE_A, Tile.SITE_B, Tile.SPAWN_ATK, Tile.SPAWN_DEF}
-        
         required_pairs = [
             ("ATK_SPAWN", "A_SITE"),
             ("ATK_SPAWN", "B_SITE"),
@@ -346,7 +344,8 @@ class ProceduralTemplate(MapTemplate):
             start = (start_room['y'] + start_room['h']//2, start_room['x'] + start_room['w']//2)
             end = (end_room['y'] + end_room['h']//2, end_room['x'] + end_room['w']//2)
             
-            # BFS로 연결 확인
+            # BFS로 연결 확인 (이전 쌍의 강제 연결이 반영되도록 매번 마스크 생성)
+            walkable = OPEN_FLOOR_LUT[m]
             visited = {start}
             queue = deque([start])
             found = False
@@ -360,7 +359,7 @@ class ProceduralTemplate(MapTemplate):
                 for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
                     ny, nx = cy + dy, cx + dx
                     if (ny, nx) not in visited and 0 <= ny < s and 0 <= nx < s:
-                        if m[ny, nx] in walkable:
+                        if walkable[ny, nx]:
                             visited.add((ny, nx))
                             queue.append((ny, nx))
             
@@ -13,7 +13,7 @@ Procedural Map Generator v2 - 정교한 규칙
 
 import numpy as np
 from typing import Tuple, Dict, List, Set
-from .base import MapTemplate, Tile
+from .base import MapTemplate, Tile, TileGrid, GenerationContext, OPEN_FLOOR_LUT
 from collections import deque
 
 
@@ -65,8 +65,13 @@ class ProceduralV2Template(MapTemplate):
         'corridor_max_width': 8,            # 최대 8m (너무 넓으면 엄폐 불가)
     }
     
-    # 활성 규칙 (generate 시 설정됨)
-    _active_rules = None
+    @classmethod
+    def resolve_rules(cls, rules: dict = None) -> dict:
+        """기본 규칙에 사용자 규칙을 병합한 활성 규칙 반환"""
+        active_rules = cls.DESIGN_RULES.copy()
+        if rules:
+            cls._merge_rules(active_rules, rules)
+        return active_rules
     
     @classmethod
     def _merge_rules(cls, base: dict, override: dict):
@@ -175,52 +180,49 @@ class ProceduralV2Template(MapTemplate):
             custom_connections: 사용자 추가 연결 [{"from", "to"}, ...]
             removed_connections: 사용자 제거 연결 ["from-to", ...]
         """
-        if seed is not None:
-            np.random.seed(seed)
-        
         # 규칙 병합
-        active_rules = cls.DESIGN_RULES.copy()
-        if rules:
-            cls._merge_rules(active_rules, rules)
+        active_rules = cls.resolve_rules(rules)
+        
+        # 요청별 컨텍스트 (규칙, 입력, 전용 RNG) - 클래스 상태 공유 없음
+        ctx = GenerationContext.create(
+            active_rules, seed,
+            site_count=site_count,
+            user_layout=layout,  # 사용자 지정 레이아웃
+            waypoints=waypoints or {},
+            custom_connections=custom_connections or [],
+            removed_connections=set(removed_connections) if removed_connections else set(),
+        )
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
-        # 활성 규칙 저장 (다른 메서드에서 사용)
-        cls._active_rules = active_rules
-        cls._site_count = site_count
-        cls._user_layout = layout  # 사용자 지정 레이아웃 저장
-        cls._waypoints = waypoints or {}  # 웨이포인트 저장
-        cls._custom_connections = custom_connections or []
-        cls._removed_connections = set(removed_connections) if removed_connections else set()
-        
         # 1. 레이아웃 스켈레톤 결정 (사용자 레이아웃 우선)
         if layout:
             map_layout = cls._layout_from_user(s, layout, site_count)
         else:
-            map_layout = cls._decide_layout(s)
+            map_layout = cls._decide_layout(ctx, s)
         
         # 2. 핵심 지점 배치 (시간 밸런스 고려)
-        cls._place_key_points(m, rooms, s, map_layout)
+        cls._place_key_points(ctx, m, rooms, s, map_layout)
         
         # 3. 초크포인트 설계
-        cls._design_chokepoints(m, rooms, s, map_layout)
+        cls._design_chokepoints(ctx, m, rooms, s, map_layout)
         
         # 4. 시야선 기반 방 배치
-        cls._place_sightline_rooms(m, rooms, s, map_layout)
+        cls._place_sightline_rooms(ctx, m, rooms, s, map_layout)
         
         # 5. 연결 구조 (커버 투 커버)
-        cls._connect_with_cover(m, rooms, s)
+        cls._connect_with_cover(ctx, m, rooms, s)
         
         # 6. 앵글 포지션 추가
-        cls._add_angle_positions(m, rooms, s)
+        cls._add_angle_positions(ctx, m, rooms, s)
         
         # 7. 수직 구조 (Heaven)
-        cls._add_vertical_positions(m, rooms, s)
+        cls._add_vertical_positions(ctx, m, rooms, s)
         
         # 8. 검증 및 수정
-        cls._validate_and_fix(m, rooms, s)
+        cls._validate_and_fix(ctx, m, rooms, s)
         
         # 9. 고립된 영역 제거 (벽 생성 전에!)
         cls.remove_isolated_areas(m, rooms)
@@ -231,20 +233,20 @@ class ProceduralV2Template(MapTemplate):
         return m, rooms
     
     @classmethod
-    def _decide_layout(cls, s) -> Dict:
+    def _decide_layout(cls, ctx, s) -> Dict:
         """레이아웃 기본 구조 결정"""
         # A 사이트 위치: 좌상단 or 우상단
-        a_side = np.random.choice(['left', 'right'])
+        a_side = ctx.rng.choice(['left', 'right'])
         
         # Mid 타입
-        mid_type = np.random.choice([
+        mid_type = ctx.rng.choice([
             'wide',      # 넓은 Mid (Ascent 스타일)
             'narrow',    # 좁은 Mid (Split 스타일)
             'split',     # 분할된 Mid (여러 경로)
         ])
         
         # 비대칭 정도 (0 = 완전 대칭, 1 = 강한 비대칭)
-        asymmetry = np.random.uniform(0.1, 0.4)
+        asymmetry = ctx.rng.uniform(0.1, 0.4)
         
         return {
             'a_side': a_side,
@@ -367,10 +369,10 @@ class ProceduralV2Template(MapTemplate):
         }
     
     @classmethod
-    def _place_key_points(cls, m, rooms, s, layout):
+    def _place_key_points(cls, ctx, m, rooms, s, layout):
         """핵심 지점 배치 (시간 밸런스 기반)"""
-        r = cls._active_rules  # 오버라이드된 규칙 사용
-        site_count = getattr(cls, '_site_count', 2)
+        r = ctx.rules  # 오버라이드된 규칙 사용
+        site_count = ctx.site_count
         user_pos = layout.get('user_positions', None)
         user_sizes = layout.get('user_sizes', {})  # 사용자 지정 크기
         
@@ -379,8 +381,8 @@ class ProceduralV2Template(MapTemplate):
             if key in user_sizes:
                 return user_sizes[key]
             if default_range2:
-                return np.random.randint(*default_range), np.random.randint(*default_range2)
-            return np.random.randint(*default_range), np.random.randint(*default_range)
+                return ctx.rng.randint(*default_range), ctx.rng.randint(*default_range2)
+            return ctx.rng.randint(*default_range), ctx.rng.randint(*default_range)
         
         # 크기 결정 (사용자 지정 크기 우선)
         atk_w, atk_h = get_size('atk', r['spawn_size'], (18, 24))
@@ -508,70 +510,70 @@ class ProceduralV2Template(MapTemplate):
         
         # === 기존 자동 배치 로직 ===
         # 공격 스폰: 하단 중앙
-        atk_x = s//2 - atk_w//2 + np.random.randint(-10, 11)
-        atk_y = s - atk_h - np.random.randint(8, 15)
+        atk_x = s//2 - atk_w//2 + ctx.rng.randint(-10, 11)
+        atk_y = s - atk_h - ctx.rng.randint(8, 15)
         cls.create_room(m, rooms, "ATK_SPAWN", atk_x, atk_y, atk_w, atk_h, Tile.SPAWN_ATK)
         
         # 수비 스폰: 상단 중앙 (사이트 사이)
-        def_x = s//2 - def_w//2 + np.random.randint(-8, 9)
-        def_y = np.random.randint(6, 15)
+        def_x = s//2 - def_w//2 + ctx.rng.randint(-8, 9)
+        def_y = ctx.rng.randint(6, 15)
         cls.create_room(m, rooms, "DEF_SPAWN", def_x, def_y, def_w, def_h, Tile.SPAWN_DEF)
         
         # === 사이트 개수에 따른 배치 ===
         if site_count == 1:
             # 1개 사이트: 중앙 상단
-            a_w, a_h = np.random.randint(*r['site_size']), np.random.randint(*r['site_size'])
-            a_x = s//2 - a_w//2 + np.random.randint(-15, 16)
-            a_y = np.random.randint(20, 40)
+            a_w, a_h = ctx.rng.randint(*r['site_size']), ctx.rng.randint(*r['site_size'])
+            a_x = s//2 - a_w//2 + ctx.rng.randint(-15, 16)
+            a_y = ctx.rng.randint(20, 40)
             cls.create_room(m, rooms, "A_SITE", a_x, a_y, a_w, a_h, Tile.SITE_A)
             
         elif site_count == 3:
             # 3개 사이트: A(좌), B(우), C(중앙)
             # A 사이트
-            a_w, a_h = np.random.randint(*r['site_size']), np.random.randint(*r['site_size'])
-            a_x = np.random.randint(10, 25)
-            a_y = np.random.randint(18, 35)
+            a_w, a_h = ctx.rng.randint(*r['site_size']), ctx.rng.randint(*r['site_size'])
+            a_x = ctx.rng.randint(10, 25)
+            a_y = ctx.rng.randint(18, 35)
             cls.create_room(m, rooms, "A_SITE", a_x, a_y, a_w, a_h, Tile.SITE_A)
             
             # B 사이트
-            b_w, b_h = np.random.randint(*r['site_size']), np.random.randint(*r['site_size'])
-            b_x = s - b_w - np.random.randint(10, 25)
-            b_y = np.random.randint(18, 35)
+            b_w, b_h = ctx.rng.randint(*r['site_size']), ctx.rng.randint(*r['site_size'])
+            b_x = s - b_w - ctx.rng.randint(10, 25)
+            b_y = ctx.rng.randint(18, 35)
             cls.create_room(m, rooms, "B_SITE", b_x, b_y, b_w, b_h, Tile.SITE_B)
             
             # C 사이트 (중앙)
-            c_w, c_h = np.random.randint(*r['site_size']), np.random.randint(*r['site_size'])
-            c_x = s//2 - c_w//2 + np.random.randint(-10, 11)
-            c_y = np.random.randint(30, 50)
+            c_w, c_h = ctx.rng.randint(*r['site_size']), ctx.rng.randint(*r['site_size'])
+            c_x = s//2 - c_w//2 + ctx.rng.randint(-10, 11)
+            c_y = ctx.rng.randint(30, 50)
             cls.create_room(m, rooms, "C_SITE", c_x, c_y, c_w, c_h, Tile.SITE_A)  # SITE_C 타일이 없으면 A 사용
             
         else:
             # 2개 사이트 (기본)
             # A 사이트
-            a_w, a_h = np.random.randint(*r['site_size']), np.random.randint(*r['site_size'])
+            a_w, a_h = ctx.rng.randint(*r['site_size']), ctx.rng.randint(*r['site_size'])
             if layout['a_side'] == 'left':
-                a_x = np.random.randint(10, 30)
+                a_x = ctx.rng.randint(10, 30)
             else:
-                a_x = s - a_w - np.random.randint(10, 30)
-            a_y = np.random.randint(18, 35)
+                a_x = s - a_w - ctx.rng.randint(10, 30)
+            a_y = ctx.rng.randint(18, 35)
             cls.create_room(m, rooms, "A_SITE", a_x, a_y, a_w, a_h, Tile.SITE_A)
             
             # B 사이트
-            b_w, b_h = np.random.randint(*r['site_size']), np.random.randint(*r['site_size'])
+            b_w, b_h = ctx.rng.randint(*r['site_size']), ctx.rng.randint(*r['site_size'])
             if layout['a_side'] == 'left':
-                b_x = s - b_w - np.random.randint(10, 30)
+                b_x = s - b_w - ctx.rng.randint(10, 30)
             else:
-                b_x = np.random.randint(10, 30)
+                b_x = ctx.rng.randint(10, 30)
             asymmetry_offset = int(layout['asymmetry'] * 15)
-            b_y = np.random.randint(20, 40) + np.random.randint(-asymmetry_offset, asymmetry_offset + 1)
+            b_y = ctx.rng.randint(20, 40) + ctx.rng.randint(-asymmetry_offset, asymmetry_offset + 1)
             b_y = np.clip(b_y, 15, 50)
             cls.create_room(m, rooms, "B_SITE", b_x, b_y, b_w, b_h, Tile.SITE_B)
     
     @classmethod
-    def _design_chokepoints(cls, m, rooms, s, layout):
+    def _design_chokepoints(cls, ctx, m, rooms, s, layout):
         """초크포인트 설계 (진입로) - 이미 user_layout에서 생성된 방은 건너뜀"""
-        r = cls._active_rules  # 오버라이드된 규칙 사용
-        site_count = getattr(cls, '_site_count', 2)
+        r = ctx.rules  # 오버라이드된 규칙 사용
+        site_count = ctx.site_count
         
         a_site = rooms.get('A_SITE')
         b_site = rooms.get('B_SITE')
@@ -582,118 +584,118 @@ class ProceduralV2Template(MapTemplate):
         if a_site:
             # A 사이트 초크포인트
             if 'A_CHOKE' not in rooms:
-                a_choke_w = np.random.randint(*r['choke_width'])
-                a_choke_h = np.random.randint(10, 18)
+                a_choke_w = ctx.rng.randint(*r['choke_width'])
+                a_choke_h = ctx.rng.randint(10, 18)
                 a_choke_x = a_site['x'] + a_site['w']//2 - a_choke_w//2
-                a_choke_y = a_site['y'] + a_site['h'] + np.random.randint(8, 18)
+                a_choke_y = a_site['y'] + a_site['h'] + ctx.rng.randint(8, 18)
                 cls.create_room(m, rooms, "A_CHOKE", a_choke_x, a_choke_y, a_choke_w + 8, a_choke_h, None)
             
             # A Main (room_size 사용)
             if 'A_MAIN' not in rooms:
-                a_main_w = np.random.randint(*r['room_size'])
-                a_main_h = np.random.randint(*r['room_size'])
-                a_main_x = a_site['x'] + np.random.randint(-5, 10)
-                a_main_y = s//2 + np.random.randint(-5, 15)
+                a_main_w = ctx.rng.randint(*r['room_size'])
+                a_main_h = ctx.rng.randint(*r['room_size'])
+                a_main_x = a_site['x'] + ctx.rng.randint(-5, 10)
+                a_main_y = s//2 + ctx.rng.randint(-5, 15)
                 cls.create_room(m, rooms, "A_MAIN", a_main_x, a_main_y, a_main_w, a_main_h, None)
             
             # A Lobby (room_size 사용)
             if 'A_LOBBY' not in rooms:
-                a_lobby_w = np.random.randint(*r['room_size'])
-                a_lobby_h = np.random.randint(*r['room_size'])
-                a_lobby_x = (a_site['x'] + atk['x'])//2 - a_lobby_w//2 + np.random.randint(-8, 9)
-                a_lobby_y = s - 52 + np.random.randint(-5, 10)
+                a_lobby_w = ctx.rng.randint(*r['room_size'])
+                a_lobby_h = ctx.rng.randint(*r['room_size'])
+                a_lobby_x = (a_site['x'] + atk['x'])//2 - a_lobby_w//2 + ctx.rng.randint(-8, 9)
+                a_lobby_y = s - 52 + ctx.rng.randint(-5, 10)
                 a_lobby_x = np.clip(a_lobby_x, 5, s - a_lobby_w - 5)
                 cls.create_room(m, rooms, "A_LOBBY", a_lobby_x, a_lobby_y, a_lobby_w, a_lobby_h, None)
         
         # B 사이트 관련 방들 (2개 이상일 때)
         if b_site and site_count >= 2:
             if 'B_CHOKE' not in rooms:
-                b_choke_w = np.random.randint(*r['choke_width'])
-                b_choke_h = np.random.randint(10, 18)
+                b_choke_w = ctx.rng.randint(*r['choke_width'])
+                b_choke_h = ctx.rng.randint(10, 18)
                 b_choke_x = b_site['x'] + b_site['w']//2 - b_choke_w//2
-                b_choke_y = b_site['y'] + b_site['h'] + np.random.randint(8, 18)
+                b_choke_y = b_site['y'] + b_site['h'] + ctx.rng.randint(8, 18)
                 cls.create_room(m, rooms, "B_CHOKE", b_choke_x, b_choke_y, b_choke_w + 8, b_choke_h, None)
             
             # B Main (room_size 사용)
             if 'B_MAIN' not in rooms:
-                b_main_w = np.random.randint(*r['room_size'])
-                b_main_h = np.random.randint(*r['room_size'])
-                b_main_x = b_site['x'] + np.random.randint(-5, 10)
-                b_main_y = s//2 + np.random.randint(-5, 15)
+                b_main_w = ctx.rng.randint(*r['room_size'])
+                b_main_h = ctx.rng.randint(*r['room_size'])
+                b_main_x = b_site['x'] + ctx.rng.randint(-5, 10)
+                b_main_y = s//2 + ctx.rng.randint(-5, 15)
                 cls.create_room(m, rooms, "B_MAIN", b_main_x, b_main_y, b_main_w, b_main_h, None)
             
             # B Lobby (room_size 사용)
             if 'B_LOBBY' not in rooms:
-                b_lobby_w = np.random.randint(*r['room_size'])
-                b_lobby_h = np.random.randint(*r['room_size'])
-                b_lobby_x = (b_site['x'] + atk['x'])//2 - b_lobby_w//2 + np.random.randint(-8, 9)
-                b_lobby_y = s - 52 + np.random.randint(-5, 10)
+                b_lobby_w = ctx.rng.randint(*r['room_size'])
+                b_lobby_h = ctx.rng.randint(*r['room_size'])
+                b_lobby_x = (b_site['x'] + atk['x'])//2 - b_lobby_w//2 + ctx.rng.randint(-8, 9)
+                b_lobby_y = s - 52 + ctx.rng.randint(-5, 10)
                 b_lobby_x = np.clip(b_lobby_x, 5, s - b_lobby_w - 5)
                 cls.create_room(m, rooms, "B_LOBBY", b_lobby_x, b_lobby_y, b_lobby_w, b_lobby_h, None)
         
         # C 사이트 관련 방들 (3개일 때)
         if c_site and site_count >= 3:
             if 'C_CHOKE' not in rooms:
-                c_choke_w = np.random.randint(*r['choke_width'])
-                c_choke_h = np.random.randint(10, 18)
+                c_choke_w = ctx.rng.randint(*r['choke_width'])
+                c_choke_h = ctx.rng.randint(10, 18)
                 c_choke_x = c_site['x'] + c_site['w']//2 - c_choke_w//2
-                c_choke_y = c_site['y'] + c_site['h'] + np.random.randint(8, 18)
+                c_choke_y = c_site['y'] + c_site['h'] + ctx.rng.randint(8, 18)
                 cls.create_room(m, rooms, "C_CHOKE", c_choke_x, c_choke_y, c_choke_w + 8, c_choke_h, None)
             
             # C Main (room_size 사용)
             if 'C_MAIN' not in rooms:
-                c_main_w = np.random.randint(*r['room_size'])
-                c_main_h = np.random.randint(*r['room_size'])
-                c_main_x = c_site['x'] + np.random.randint(-5, 10)
-                c_main_y = s//2 + np.random.randint(10, 25)
+                c_main_w = ctx.rng.randint(*r['room_size'])
+                c_main_h = ctx.rng.randint(*r['room_size'])
+                c_main_x = c_site['x'] + ctx.rng.randint(-5, 10)
+                c_main_y = s//2 + ctx.rng.randint(10, 25)
                 cls.create_room(m, rooms, "C_MAIN", c_main_x, c_main_y, c_main_w, c_main_h, None)
         
         # Mid 설계
-        cls._design_mid(m, rooms, s, layout)
+        cls._design_mid(ctx, m, rooms, s, layout)
     
     @classmethod
-    def _design_mid(cls, m, rooms, s, layout):
+    def _design_mid(cls, ctx, m, rooms, s, layout):
         """Mid 영역 설계 - 이미 user_layout에서 생성된 방은 건너뜀"""
         mid_type = layout['mid_type']
-        r = cls._active_rules
+        r = ctx.rules
         room_min, room_max = r['room_size']
         
         # MID가 이미 있으면 건너뜀 (user_layout에서 생성됨)
         if 'MID' not in rooms:
-            mid_w = np.random.randint(room_min, room_max)
-            mid_h = np.random.randint(room_min, room_max)
-            mid_x = s//2 - mid_w//2 + np.random.randint(-8, 9)
-            mid_y = s//2 - mid_h//2 + np.random.randint(-8, 5)
+            mid_w = ctx.rng.randint(room_min, room_max)
+            mid_h = ctx.rng.randint(room_min, room_max)
+            mid_x = s//2 - mid_w//2 + ctx.rng.randint(-8, 9)
+            mid_y = s//2 - mid_h//2 + ctx.rng.randint(-8, 5)
             cls.create_room(m, rooms, "MID", mid_x, mid_y, mid_w, mid_h, None)
         
         # Mid Top (수비 연결) - 이미 있으면 건너뜀
         if 'MID_TOP' not in rooms:
-            top_w = np.random.randint(room_min, room_max)
-            top_h = np.random.randint(max(8, room_min - 4), max(12, room_max - 6))
-            top_x = s//2 - top_w//2 + np.random.randint(-5, 6)
-            top_y = np.random.randint(28, 40)
+            top_w = ctx.rng.randint(room_min, room_max)
+            top_h = ctx.rng.randint(max(8, room_min - 4), max(12, room_max - 6))
+            top_x = s//2 - top_w//2 + ctx.rng.randint(-5, 6)
+            top_y = ctx.rng.randint(28, 40)
             cls.create_room(m, rooms, "MID_TOP", top_x, top_y, top_w, top_h, None)
         
         # Mid Entrance (공격 진입) - 이미 있으면 건너뜀
         if 'MID_ENTRANCE' not in rooms:
-            ent_w = np.random.randint(room_min, room_max)
-            ent_h = np.random.randint(max(8, room_min - 4), max(12, room_max - 6))
-            ent_x = s//2 - ent_w//2 + np.random.randint(-8, 9)
-            ent_y = s - 55 + np.random.randint(-5, 10)
+            ent_w = ctx.rng.randint(room_min, room_max)
+            ent_h = ctx.rng.randint(max(8, room_min - 4), max(12, room_max - 6))
+            ent_x = s//2 - ent_w//2 + ctx.rng.randint(-8, 9)
+            ent_y = s - 55 + ctx.rng.randint(-5, 10)
             cls.create_room(m, rooms, "MID_ENTRANCE", ent_x, ent_y, ent_w, ent_h, None)
         
         # Split Mid인 경우 추가 경로
         if mid_type == 'split':
-            conn_w = np.random.randint(max(8, room_min - 4), max(12, room_max - 6))
-            conn_h = np.random.randint(max(8, room_min - 4), max(12, room_max - 6))
-            conn_x = s//2 - conn_w//2 + np.random.randint(-15, 16)
-            conn_y = s//2 + np.random.randint(5, 15)
+            conn_w = ctx.rng.randint(max(8, room_min - 4), max(12, room_max - 6))
+            conn_h = ctx.rng.randint(max(8, room_min - 4), max(12, room_max - 6))
+            conn_x = s//2 - conn_w//2 + ctx.rng.randint(-15, 16)
+            conn_y = s//2 + ctx.rng.randint(5, 15)
             cls.create_room(m, rooms, "MID_CONNECTOR", conn_x, conn_y, conn_w, conn_h, None)
     
     @classmethod
-    def _place_sightline_rooms(cls, m, rooms, s, layout):
+    def _place_sightline_rooms(cls, ctx, m, rooms, s, layout):
         """시야선 기반 방 배치 - SIDE를 플랭크 경로로 (이미 존재하면 건너뜀)"""
-        r = cls._active_rules  # 오버라이드된 규칙 사용
+        r = ctx.rules  # 오버라이드된 규칙 사용
         
         # 각 사이트 주변에 SIDE 배치 (MAIN과 SITE 사이, 플랭크용)
         for site_name in ['A_SITE', 'B_SITE', 'C_SITE']:
@@ -716,8 +718,8 @@ class ProceduralV2Template(MapTemplate):
             if not ref_room:
                 continue
             
-            side_w = np.random.randint(12, 18)
-            side_h = np.random.randint(14, 20)
+            side_w = ctx.rng.randint(12, 18)
+            side_h = ctx.rng.randint(14, 20)
             
             # SITE와 MAIN/CHOKE 사이, 옆쪽에 배치
             mid_y = (site['y'] + ref_room['y']) // 2
@@ -725,12 +727,12 @@ class ProceduralV2Template(MapTemplate):
             # 좌우 방향 결정 (맵 중앙 기준 반대편)
             if site['x'] < s // 2:
                 # 사이트가 좌측이면 SIDE는 우측에
-                side_x = site['x'] + site['w'] + np.random.randint(5, 15)
+                side_x = site['x'] + site['w'] + ctx.rng.randint(5, 15)
             else:
                 # 사이트가 우측이면 SIDE는 좌측에
-                side_x = site['x'] - side_w - np.random.randint(5, 15)
+                side_x = site['x'] - side_w - ctx.rng.randint(5, 15)
             
-            side_y = mid_y + np.random.randint(-10, 10)
+            side_y = mid_y + ctx.rng.randint(-10, 10)
             side_x = np.clip(side_x, 10, s - side_w - 10)
             side_y = np.clip(side_y, 10, s - side_h - 10)
             
@@ -739,12 +741,12 @@ class ProceduralV2Template(MapTemplate):
                 cls.create_room(m, rooms, f"{prefix}_SIDE", side_x, side_y, side_w, side_h, None)
     
     @classmethod
-    def _connect_with_cover(cls, m, rooms, s):
+    def _connect_with_cover(cls, ctx, m, rooms, s):
         """커버 투 커버 연결 (통로 너비 4~8m 제한)"""
-        r = cls._active_rules  # 오버라이드된 규칙 사용
+        r = ctx.rules  # 오버라이드된 규칙 사용
         min_w = r['corridor_min_width']  # 4m
         max_w = r['corridor_max_width']  # 8m
-        site_count = getattr(cls, '_site_count', 2)
+        site_count = ctx.site_count
         
         if site_count == 1:
             # 1개 사이트: 3방향 진입로 (좌, 중앙, 우)
@@ -833,10 +835,10 @@ class ProceduralV2Template(MapTemplate):
         max_straight = r.get('max_straight_corridor', 20)
         
         # 제거된 연결 확인
-        removed = getattr(cls, '_removed_connections', set())
+        removed = ctx.removed_connections
         
         # 웨이포인트 가져오기
-        waypoints_dict = getattr(cls, '_waypoints', {})
+        waypoints_dict = ctx.waypoints
         if waypoints_dict:
             print(f"[DEBUG] Waypoints received: {list(waypoints_dict.keys())}", flush=True)
             for k, v in waypoints_dict.items():
@@ -864,7 +866,7 @@ class ProceduralV2Template(MapTemplate):
                 if tile_wps:
                     print(f"[DEBUG] Connecting {r1}-{r2} with {len(tile_wps)} waypoints", flush=True)
                 cls.connect_rooms(m, rooms, r1, r2, clamped_w, max_straight=max_straight, 
-                                 waypoints=tile_wps if tile_wps else None)
+                                 waypoints=tile_wps if tile_wps else None, rng=ctx.rng)
         
         # Side 방 연결 (플랭크 경로로 활용)
         def connect_if_not_removed(r1, r2, w):
@@ -876,7 +878,7 @@ class ProceduralV2Template(MapTemplate):
                 wps = waypoints_dict.get(conn_key) or waypoints_dict.get(conn_key_rev) or []
                 tile_wps = [{'x': int(wp.get('x', 0.5) * s), 'y': int(wp.get('y', 0.5) * s)} for wp in wps]
                 cls.connect_rooms(m, rooms, r1, r2, w, max_straight=max_straight,
-                                 waypoints=tile_wps if tile_wps else None)
+                                 waypoints=tile_wps if tile_wps else None, rng=ctx.rng)
         
         for name in rooms:
             if "_SIDE" in name:
@@ -898,7 +900,7 @@ class ProceduralV2Template(MapTemplate):
                 connect_if_not_removed("MID", name, 4)
         
         # 커스텀 연결 처리
-        custom_conns = getattr(cls, '_custom_connections', [])
+        custom_conns = ctx.custom_connections
         for conn in custom_conns:
             r1 = conn.get('from', '')
             r2 = conn.get('to', '')
@@ -911,10 +913,10 @@ class ProceduralV2Template(MapTemplate):
             
             if r1 in rooms and r2 in rooms:
                 cls.connect_rooms(m, rooms, r1, r2, 4, max_straight=max_straight,
-                                 waypoints=tile_wps if tile_wps else None)
+                                 waypoints=tile_wps if tile_wps else None, rng=ctx.rng)
     
     @classmethod
-    def _add_angle_positions(cls, m, rooms, s):
+    def _add_angle_positions(cls, ctx, m, rooms, s):
         """앵글 포지션 추가 (교전 위치)"""
         # 각 사이트 주변에 앵글 포지션 추가
         for site_name in ['A_SITE', 'B_SITE']:
@@ -925,15 +927,15 @@ class ProceduralV2Template(MapTemplate):
             prefix = site_name[0]
             
             # 2-3개 앵글 포지션
-            num_angles = np.random.randint(2, 4)
+            num_angles = ctx.rng.randint(2, 4)
             
             for i in range(num_angles):
-                ang_w = np.random.randint(8, 14)
-                ang_h = np.random.randint(8, 14)
+                ang_w = ctx.rng.randint(8, 14)
+                ang_h = ctx.rng.randint(8, 14)
                 
                 # 사이트 주변 랜덤 위치
-                angle = np.random.uniform(0, 2 * np.pi)
-                dist = np.random.randint(15, 30)
+                angle = ctx.rng.uniform(0, 2 * np.pi)
+                dist = ctx.rng.randint(15, 30)
                 
                 ang_x = int(site['x'] + site['w']//2 + dist * np.cos(angle) - ang_w//2)
                 ang_y = int(site['y'] + site['h']//2 + dist * np.sin(angle) - ang_h//2)
@@ -944,10 +946,10 @@ class ProceduralV2Template(MapTemplate):
                 if not cls._overlaps_existing(rooms, ang_x, ang_y, ang_w, ang_h):
                     cls.create_room(m, rooms, f"{prefix}_ANGLE_{i}", ang_x, ang_y, ang_w, ang_h, None)
                     # 사이트와 연결
-                    cls.connect_rooms(m, rooms, f"{prefix}_ANGLE_{i}", site_name, 3)
+                    cls.connect_rooms(m, rooms, f"{prefix}_ANGLE_{i}", site_name, 3, rng=ctx.rng)
     
     @classmethod
-    def _add_vertical_positions(cls, m, rooms, s):
+    def _add_vertical_positions(cls, ctx, m, rooms, s):
         """수직 구조 (Heaven) 추가"""
         for site_name in ['A_SITE', 'B_SITE']:
             if site_name not in rooms:
@@ -960,24 +962,24 @@ class ProceduralV2Template(MapTemplate):
             # 이미 존재하면 건너뜀 (user_layout에서 생성된 경우)
             if heaven_name in rooms:
                 # 기존 연결만 추가
-                cls.connect_rooms(m, rooms, heaven_name, site_name, 4)
-                cls.connect_rooms(m, rooms, heaven_name, "DEF_SPAWN", 3)
+                cls.connect_rooms(m, rooms, heaven_name, site_name, 4, rng=ctx.rng)
+                cls.connect_rooms(m, rooms, heaven_name, "DEF_SPAWN", 3, rng=ctx.rng)
                 continue
             
             # Heaven: 사이트 위쪽 (수비 유리)
-            h_w = np.random.randint(14, 20)
-            h_h = np.random.randint(10, 16)
-            h_x = site['x'] + np.random.randint(0, max(1, site['w'] - h_w))
-            h_y = site['y'] - h_h - np.random.randint(3, 10)
+            h_w = ctx.rng.randint(14, 20)
+            h_h = ctx.rng.randint(10, 16)
+            h_x = site['x'] + ctx.rng.randint(0, max(1, site['w'] - h_w))
+            h_y = site['y'] - h_h - ctx.rng.randint(3, 10)
             
             if h_y > 5:
                 if not cls._overlaps_existing(rooms, h_x, h_y, h_w, h_h):
                     cls.create_room(m, rooms, heaven_name, h_x, h_y, h_w, h_h, None)
-                    cls.connect_rooms(m, rooms, heaven_name, site_name, 4)
-                    cls.connect_rooms(m, rooms, heaven_name, "DEF_SPAWN", 3)
+                    cls.connect_rooms(m, rooms, heaven_name, site_name, 4, rng=ctx.rng)
+                    cls.connect_rooms(m, rooms, heaven_name, "DEF_SPAWN", 3, rng=ctx.rng)
     
     @classmethod
-    def _validate_and_fix(cls, m, rooms, s):
+    def _validate_and_fix(cls, ctx, m, rooms, s):
         """검증 및 수정"""
         # 모든 주요 지점 연결 확인
         required_connections = [
@@ -987,13 +989,13 @@ class ProceduralV2Template(MapTemplate):
             ("DEF_SPAWN", "B_SITE"),
         ]
         
-        walkable = {Tile.FLOOR, Tile.SITE_A, Tile.SITE_B, Tile.SPAWN_ATK, Tile.SPAWN_DEF}
-        
         for start_name, end_name in required_connections:
             if start_name not in rooms or end_name not in rooms:
                 continue
             
-            # BFS로 연결 확인
+            # BFS로 연결 확인 (이전 쌍의 강제 연결이 반영되도록 매번 마스크 생성)
+            walkable = OPEN_FLOOR_LUT[m]
+            
             start_room = rooms[start_name]
             end_room = rooms[end_name]
             
@@ -1013,13 +1015,13 @@ class ProceduralV2Template(MapTemplate):
                 for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
                     ny, nx = cy + dy, cx + dx
                     if (ny, nx) not in visited and 0 <= ny < s and 0 <= nx < s:
-                        if m[ny, nx] in walkable:
+                        if walkable[ny, nx]:
                             visited.add((ny, nx))
                             queue.append((ny, nx))
             
             # 연결 안 되면 강제 연결
             if not found:
-                cls.connect_rooms(m, rooms, start_name, end_name, 5)
+                cls.connect_rooms(m, rooms, start_name, end_name, 5, rng=ctx.rng)
     
     @classmethod
     def _overlaps_existing(cls, rooms, x, y, w, h, margin=3) -> bool:
@@ -10,9 +10,9 @@ Procedural Map Generator v3 - 유기적 형태
 """
 
 import numpy as np
-from typing import Tuple, Dict, List, Set, Optional
-from .base import MapTemplate, Tile
-from collections import deque
+from typing import Tuple, Dict, List, Optional
+from .base import MapTemplate, Tile, TileGrid, GenerationContext
+from scipy import ndimage
 import math
 
 
@@ -51,46 +51,46 @@ class ProceduralV3Template(MapTemplate):
         'corridor_max_width': 8,
     }
     
-    _active_rules = None
-    
     @classmethod
     def generate(cls, seed=None, rules=None) -> Tuple[np.ndarray, Dict]:
-        if seed is not None:
-            np.random.seed(seed)
-        
-        # 규칙 병합
-        active_rules = cls.DESIGN_RULES.copy()
-        if rules:
-            cls._merge_rules(active_rules, rules)
-        cls._active_rules = active_rules
+        # 요청별 컨텍스트 (규칙 + 전용 RNG)
+        ctx = GenerationContext.create(cls.resolve_rules(rules), seed)
         
         s = cls.size
-        m = np.full((s, s), Tile.VOID, dtype=np.int32)
+        m = TileGrid(s)
         rooms = {}
         
         # 1. 핵심 지점 (Voronoi 시드) 배치
-        key_points = cls._place_key_points_voronoi(s)
+        key_points = cls._place_key_points_voronoi(ctx, s)
         
         # 2. Voronoi 기반 영역 분할
-        regions = cls._voronoi_regions(s, key_points)
+        regions = cls._voronoi_regions(ctx, s, key_points)
         
         # 3. 각 영역을 유기적 방으로 변환
-        cls._create_organic_rooms(m, rooms, regions, key_points, s)
+        cls._create_organic_rooms(ctx, m, rooms, regions, key_points, s)
         
         # 4. 대각선 포함 유기적 통로 연결
-        cls._connect_organic(m, rooms, s)
+        cls._connect_organic(ctx, m, rooms, s)
         
         # 5. 순환 경로 및 플랭크 추가
-        cls._add_loops_and_flanks(m, rooms, s)
+        cls._add_loops_and_flanks(ctx, m, rooms, s)
         
         # 6. 경계 노이즈 적용
-        cls._apply_boundary_noise(m, s)
+        cls._apply_boundary_noise(ctx, m, s)
         
         # 7. 검증
-        cls._validate_connectivity(m, rooms, s)
+        cls._validate_connectivity(ctx, m, rooms, s)
         
         return m, rooms
     
+    @classmethod
+    def resolve_rules(cls, rules: dict = None) -> dict:
+        """기본 규칙에 사용자 규칙을 병합한 활성 규칙 반환"""
+        active_rules = cls.DESIGN_RULES.copy()
+        if rules:
+            cls._merge_rules(active_rules, rules)
+        return active_rules
+    
     @classmethod
     def _merge_rules(cls, base: dict, override: dict):
         """규칙 병합"""
@@ -112,7 +112,7 @@ class ProceduralV3Template(MapTemplate):
                 base[target] = override[cat][key]
     
     @classmethod
-    def _place_key_points_voronoi(cls, s: int) -> Dict[str, Tuple[int, int]]:
+    def _place_key_points_voronoi(cls, ctx: GenerationContext, s: int) -> Dict[str, Tuple[int, int]]:
         """핵심 지점들을 Voronoi 시드로 배치"""
         margin = 15
         points = {}
@@ -143,8 +143,8 @@ class ProceduralV3Template(MapTemplate):
         for name in extra_rooms:
             # 기존 점들과 겹치지 않게 배치
             for _ in range(50):
-                y = np.random.randint(margin + 10, s - margin - 10)
-                x = np.random.randint(margin + 10, s - margin - 10)
+                y = ctx.rng.randint(margin + 10, s - margin - 10)
+                x = ctx.rng.randint(margin + 10, s - margin - 10)
                 
                 # 최소 거리 체크
                 min_dist = min(
@@ -159,124 +159,152 @@ class ProceduralV3Template(MapTemplate):
         return points
     
     @classmethod
-    def _voronoi_regions(cls, s: int, points: Dict[str, Tuple[int, int]]) -> Dict[str, Set[Tuple[int, int]]]:
-        """Voronoi 다이어그램으로 영역 분할"""
-        regions = {name: set() for name in points}
-        point_list = list(points.items())
-        
-        for y in range(s):
-            for x in range(s):
-                # 가장 가까운 시드 찾기
-                min_dist = float('inf')
-                closest = None
-                
-                for name, (py, px) in point_list:
-                    # 맨해튼 거리 + 약간의 유클리드 혼합 (더 유기적)
-                    dist = abs(y - py) + abs(x - px) + 0.3 * math.sqrt((y - py)**2 + (x - px)**2)
-                    
-                    # 노이즈 추가
-                    noise = np.random.random() * 5 * cls._active_rules.get('organic_level', 0.5)
-                    dist += noise
-                    
-                    if dist < min_dist:
-                        min_dist = dist
-                        closest = name
-                
-                if closest:
-                    regions[closest].add((y, x))
-        
-        return regions
+    def _voronoi_regions(cls, ctx: GenerationContext, s: int,
+                         points: Dict[str, Tuple[int, int]]) -> np.ndarray:
+        """
+        Voronoi 다이어그램으로 영역 분할
+        
+        Returns:
+            int 라벨 배열 (s x s), 값 i = list(points)[i] 영역
+        """
+        centers = np.array(list(points.values()), dtype=np.int64)  # (k, 2)
+        yy, xx = np.indices((s, s))
+        dy = yy[None] - centers[:, 0, None, None]  # (k, s, s)
+        dx = xx[None] - centers[:, 1, None, None]
+        
+        # 맨해튼 거리 + 약간의 유클리드 혼합 (더 유기적)
+        dist = np.abs(dy) + np.abs(dx) + 0.3 * np.sqrt(dy ** 2 + dx ** 2)
+        
+        # 노이즈 추가 - 타일(y, x)마다 시드 순서로 한 번에 생성
+        noise = ctx.rng.random_sample((s, s, len(centers))) * 5 * ctx.rules.get('organic_level', 0.5)
+        dist += noise.transpose(2, 0, 1)
+        
+        # 가장 가까운 시드 (동점이면 먼저 배치된 시드)
+        return np.argmin(dist, axis=0)
     
     @classmethod
-    def _create_organic_rooms(cls, m: np.ndarray, rooms: dict, 
-                              regions: Dict[str, Set], 
+    def _create_organic_rooms(cls, ctx: GenerationContext, m: np.ndarray, rooms: dict, 
+                              regions: np.ndarray, 
                               key_points: Dict[str, Tuple[int, int]], s: int):
-        """Voronoi 영역을 유기적 방으로 변환"""
+        """Voronoi 라벨 영역을 유기적 방으로 변환"""
         
-        for name, tiles in regions.items():
-            if not tiles:
+        for label, name in enumerate(key_points):
+            tiles = regions == label
+            if not tiles.any():
                 continue
             
             center_y, center_x = key_points[name]
             
             # 방 크기 결정
             if 'SITE' in name:
-                size_range = cls._active_rules['site_size']
+                size_range = ctx.rules['site_size']
             elif 'SPAWN' in name:
-                size_range = cls._active_rules['spawn_size']
+                size_range = ctx.rules['spawn_size']
             else:
-                size_range = cls._active_rules['room_size']
+                size_range = ctx.rules['room_size']
             
-            target_size = np.random.randint(size_range[0], size_range[1])
+            target_size = ctx.rng.randint(size_range[0], size_range[1])
             
             # 중심에서부터 타일 선택 (유기적 형태)
-            room_tiles = cls._grow_organic_room(tiles, center_y, center_x, target_size, s)
+            room_mask = cls._grow_organic_room(ctx, tiles, center_y, center_x, target_size, s)
+            if not room_mask.any():
+                continue
             
             # 타일을 FLOOR로 설정
-            for ty, tx in room_tiles:
-                if 0 <= ty < s and 0 <= tx < s:
-                    m[ty, tx] = Tile.FLOOR
+            m[room_mask] = Tile.FLOOR
             
             # 방 정보 저장
-            if room_tiles:
-                ys = [t[0] for t in room_tiles]
-                xs = [t[1] for t in room_tiles]
-                rooms[name] = {
-                    'x': min(xs),
-                    'y': min(ys),
-                    'w': max(xs) - min(xs) + 1,
-                    'h': max(ys) - min(ys) + 1,
-                    'center': (center_y, center_x),
-                    'tiles': room_tiles
-                }
+            ys, xs = np.nonzero(room_mask)
+            rooms[name] = {
+                'x': int(xs.min()),
+                'y': int(ys.min()),
+                'w': int(xs.max() - xs.min() + 1),
+                'h': int(ys.max() - ys.min() + 1),
+                'center': (center_y, center_x),
+                'mask': room_mask
+            }
+    
+    # 8방향 이웃 (대각선 포함)
+    NEIGHBORS_8 = np.array([(-1, 0), (1, 0), (0, -1), (0, 1),
+                            (-1, -1), (-1, 1), (1, -1), (1, 1)])
+    
+    # 한 번에 미리 뽑아 두는 난수 묶음 크기 (꺼낸 칸 수 기준)
+    GROW_DRAW_BATCH = 256
     
     @classmethod
-    def _grow_organic_room(cls, available: Set, center_y: int, center_x: int, 
-                           target_size: int, s: int) -> Set[Tuple[int, int]]:
-        """중심에서 유기적으로 방 확장"""
-        if (center_y, center_x) not in available:
+    def _grow_organic_room(cls, ctx: GenerationContext, available: np.ndarray, center_y: int, center_x: int, 
+                           target_size: int, s: int) -> np.ndarray:
+        """
+        중심에서 유기적으로 방 확장
+        
+        Args:
+            available: 방이 차지할 수 있는 영역 bool 마스크 (s x s)
+        
+        Returns:
+            방 bool 마스크 (s x s)
+        
+        frontier는 [head, tail) 구간의 고정 크기 배열:
+        - 기본은 head에서 꺼냄 (먼저 들어온 칸부터 = 둥근 확장)
+        - irregularity 확률로 임의 위치를 head와 교환 후 꺼냄 (불규칙 확장)
+        둘 다 O(1)이라 방 크기에 선형.
+        """
+        if not available[center_y, center_x]:
             # 가장 가까운 available 타일 찾기
-            if available:
-                center_y, center_x = min(available, 
-                    key=lambda t: abs(t[0] - center_y) + abs(t[1] - center_x))
-            else:
-                return set()
-        
-        room = {(center_y, center_x)}
-        frontier = [(center_y, center_x)]
-        
-        irregularity = cls._active_rules.get('room_irregularity', 0.4)
-        
-        while len(room) < target_size and frontier:
-            # 랜덤하게 frontier에서 선택 (불규칙성)
-            if np.random.random() < irregularity:
-                idx = np.random.randint(0, len(frontier))
-            else:
-                idx = 0
+            ys, xs = np.nonzero(available)
+            if ys.size == 0:
+                return np.zeros((s, s), dtype=bool)
+            nearest = np.argmin(np.abs(ys - center_y) + np.abs(xs - center_x))
+            center_y, center_x = int(ys[nearest]), int(xs[nearest])
+        
+        # 1칸 패딩된 평탄 인덱스: 이웃 인덱스가 항상 배열 안 (패딩 = 사용 불가)
+        stride = s + 2
+        open_flat = np.zeros((s + 2, s + 2), dtype=bool)
+        open_flat[1:-1, 1:-1] = available
+        open_flat = open_flat.ravel()
+        taken = np.zeros_like(open_flat)
+        offsets = cls.NEIGHBORS_8[:, 0] * stride + cls.NEIGHBORS_8[:, 1]
+        
+        start = (center_y + 1) * stride + (center_x + 1)
+        taken[start] = True
+        size = 1
+        
+        # 각 칸은 방에 들어갈 때 한 번만 frontier에 추가됨
+        frontier = np.empty(int(available.sum()), dtype=np.intp)
+        frontier[0] = start
+        head, tail = 0, 1
+        
+        irregularity = ctx.rules.get('room_irregularity', 0.4)
+        batch = cls.GROW_DRAW_BATCH
+        draw = batch
+        
+        while size < target_size and head < tail:
+            if draw == batch:
+                # 불규칙 여부, 꺼낼 위치, 이웃 순서를 묶음으로 생성
+                pick_random = ctx.rng.random_sample(batch) < irregularity
+                pick_pos = ctx.rng.random_sample(batch)
+                neighbor_order = np.argsort(ctx.rng.random_sample((batch, 8)), axis=1)
+                draw = 0
             
-            cy, cx = frontier.pop(idx)
+            # 랜덤하게 frontier에서 선택 (불규칙성) - head와 교환 후 꺼냄
+            if pick_random[draw]:
+                idx = head + int(pick_pos[draw] * (tail - head))
+                frontier[head], frontier[idx] = frontier[idx], frontier[head]
+            cell = frontier[head]
+            head += 1
             
-            # 8방향 이웃 (대각선 포함)
-            neighbors = [
-                (cy - 1, cx), (cy + 1, cx), (cy, cx - 1), (cy, cx + 1),
-                (cy - 1, cx - 1), (cy - 1, cx + 1), (cy + 1, cx - 1), (cy + 1, cx + 1)
-            ]
+            neighbors = cell + offsets[neighbor_order[draw]]
+            draw += 1
             
-            np.random.shuffle(neighbors)
-            
-            for ny, nx in neighbors:
-                if (ny, nx) in available and (ny, nx) not in room:
-                    if 0 <= ny < s and 0 <= nx < s:
-                        room.add((ny, nx))
-                        frontier.append((ny, nx))
-                        
-                        if len(room) >= target_size:
-                            break
-        
-        return room
+            new = neighbors[open_flat[neighbors] & ~taken[neighbors]][:target_size - size]
+            taken[new] = True
+            frontier[tail:tail + new.size] = new
+            tail += new.size
+            size += new.size
+        
+        return taken.reshape(s + 2, s + 2)[1:-1, 1:-1].copy()
     
     @classmethod
-    def _connect_organic(cls, m: np.ndarray, rooms: dict, s: int):
+    def _connect_organic(cls, ctx: GenerationContext, m: np.ndarray, rooms: dict, s: int):
         """유기적 통로로 방 연결 (대각선 포함)"""
         
         # 연결할 방 쌍 정의
@@ -308,7 +336,7 @@ class ProceduralV3Template(MapTemplate):
             ('DEF_SPAWN', 'MID_TOP'),
         ]
         
-        diagonal_ratio = cls._active_rules.get('diagonal_ratio', 0.3)
+        diagonal_ratio = ctx.rules.get('diagonal_ratio', 0.3)
         
         for room1, room2 in connections:
             if room1 not in rooms or room2 not in rooms:
@@ -318,23 +346,23 @@ class ProceduralV3Template(MapTemplate):
             c2 = rooms[room2].get('center', (rooms[room2]['y'], rooms[room2]['x']))
             
             # 대각선 또는 직선 선택
-            use_diagonal = np.random.random() < diagonal_ratio
+            use_diagonal = ctx.rng.random() < diagonal_ratio
             
             if use_diagonal:
-                cls._draw_diagonal_corridor(m, c1, c2, s)
+                cls._draw_diagonal_corridor(ctx, m, c1, c2, s)
             else:
-                cls._draw_organic_corridor(m, c1, c2, s)
+                cls._draw_organic_corridor(ctx, m, c1, c2, s)
     
     @classmethod
-    def _draw_diagonal_corridor(cls, m: np.ndarray, start: Tuple[int, int], 
+    def _draw_diagonal_corridor(cls, ctx: GenerationContext, m: np.ndarray, start: Tuple[int, int], 
                                  end: Tuple[int, int], s: int):
         """대각선 통로 그리기"""
         y1, x1 = start
         y2, x2 = end
         
-        width = np.random.randint(
-            cls._active_rules['corridor_min_width'],
-            cls._active_rules['corridor_max_width']
+        width = ctx.rng.randint(
+            ctx.rules['corridor_min_width'],
+            ctx.rules['corridor_max_width']
         )
         
         # Bresenham 라인 알고리즘 (두꺼운 선)
@@ -345,31 +373,28 @@ class ProceduralV3Template(MapTemplate):
         if steps == 0:
             return
         
+        lo, hi = -width // 2, width // 2
         for i in range(steps + 1):
             t = i / steps
             cy = int(y1 + t * (y2 - y1))
             cx = int(x1 + t * (x2 - x1))
             
             # 통로 너비만큼 채우기
-            for wy in range(-width // 2, width // 2 + 1):
-                for wx in range(-width // 2, width // 2 + 1):
-                    ny, nx = cy + wy, cx + wx
-                    if 0 <= ny < s and 0 <= nx < s:
-                        m[ny, nx] = Tile.FLOOR
+            cls.carve_rect(m, cy + lo, cy + hi, cx + lo, cx + hi, only_void=False)
     
     @classmethod
-    def _draw_organic_corridor(cls, m: np.ndarray, start: Tuple[int, int], 
+    def _draw_organic_corridor(cls, ctx: GenerationContext, m: np.ndarray, start: Tuple[int, int], 
                                 end: Tuple[int, int], s: int):
         """유기적 굴곡 통로 그리기"""
         y1, x1 = start
         y2, x2 = end
         
-        width = np.random.randint(
-            cls._active_rules['corridor_min_width'],
-            cls._active_rules['corridor_max_width']
+        width = ctx.rng.randint(
+            ctx.rules['corridor_min_width'],
+            ctx.rules['corridor_max_width']
         )
         
-        max_straight = cls._active_rules.get('max_straight_corridor', 20)
+        max_straight = ctx.rules.get('max_straight_corridor', 20)
         
         # 중간점 추가 (굴곡)
         dist = abs(y2 - y1) + abs(x2 - x1)
@@ -385,7 +410,7 @@ class ProceduralV3Template(MapTemplate):
                 mx = int(x1 + t * (x2 - x1))
                 
                 # 약간의 오프셋
-                offset = np.random.randint(-15, 16)
+                offset = ctx.rng.randint(-15, 16)
                 if abs(y2 - y1) > abs(x2 - x1):
                     mx += offset
                 else:
@@ -399,54 +424,38 @@ class ProceduralV3Template(MapTemplate):
             
             # 각 구간 연결
             for i in range(len(points) - 1):
-                cls._draw_corridor_segment(m, points[i], points[i + 1], width, s)
+                cls._draw_corridor_segment(ctx, m, points[i], points[i + 1], width, s)
         else:
-            cls._draw_corridor_segment(m, (y1, x1), (y2, x2), width, s)
+            cls._draw_corridor_segment(ctx, m, (y1, x1), (y2, x2), width, s)
     
     @classmethod
-    def _draw_corridor_segment(cls, m: np.ndarray, start: Tuple[int, int], 
+    def _draw_corridor_segment(cls, ctx: GenerationContext, m: np.ndarray, start: Tuple[int, int], 
                                 end: Tuple[int, int], width: int, s: int):
         """통로 세그먼트 그리기 (L자형)"""
         y1, x1 = start
         y2, x2 = end
         
         # 랜덤하게 수평-수직 또는 수직-수평
-        if np.random.random() < 0.5:
+        if ctx.rng.random() < 0.5:
             mid = (y1, x2)
         else:
             mid = (y2, x1)
         
+        lo, hi = -width // 2, width // 2
+        
         # 첫 번째 구간
-        for y in range(min(y1, mid[0]), max(y1, mid[0]) + 1):
-            for w in range(-width // 2, width // 2 + 1):
-                nx = x1 + w
-                if 0 <= y < s and 0 <= nx < s:
-                    m[y, nx] = Tile.FLOOR
-        
-        for x in range(min(x1, mid[1]), max(x1, mid[1]) + 1):
-            for w in range(-width // 2, width // 2 + 1):
-                ny = y1 + w
-                if 0 <= ny < s and 0 <= x < s:
-                    m[ny, x] = Tile.FLOOR
+        cls.carve_rect(m, y1, mid[0], x1 + lo, x1 + hi, only_void=False)
+        cls.carve_rect(m, y1 + lo, y1 + hi, x1, mid[1], only_void=False)
         
         # 두 번째 구간
-        for y in range(min(mid[0], y2), max(mid[0], y2) + 1):
-            for w in range(-width // 2, width // 2 + 1):
-                nx = mid[1] + w
-                if 0 <= y < s and 0 <= nx < s:
-                    m[y, nx] = Tile.FLOOR
-        
-        for x in range(min(mid[1], x2), max(mid[1], x2) + 1):
-            for w in range(-width // 2, width // 2 + 1):
-                ny = mid[0] + w
-                if 0 <= ny < s and 0 <= x < s:
-                    m[ny, x] = Tile.FLOOR
+        cls.carve_rect(m, mid[0], y2, mid[1] + lo, mid[1] + hi, only_void=False)
+        cls.carve_rect(m, mid[0] + lo, mid[0] + hi, mid[1], x2, only_void=False)
     
     @classmethod
-    def _add_loops_and_flanks(cls, m: np.ndarray, rooms: dict, s: int):
+    def _add_loops_and_flanks(cls, ctx: GenerationContext, m: np.ndarray, rooms: dict, s: int):
         """순환 경로 및 플랭크 경로 추가"""
-        loop_count = cls._active_rules.get('loop_count', 2)
-        flank_count = cls._active_rules.get('flank_routes', 2)
+        loop_count = ctx.rules.get('loop_count', 2)
+        flank_count = ctx.rules.get('flank_routes', 2)
         
         room_names = list(rooms.keys())
         
@@ -455,12 +464,12 @@ class ProceduralV3Template(MapTemplate):
             if len(room_names) < 2:
                 break
             
-            r1, r2 = np.random.choice(room_names, 2, replace=False)
+            r1, r2 = ctx.rng.choice(room_names, 2, replace=False)
             c1 = rooms[r1].get('center', (rooms[r1]['y'], rooms[r1]['x']))
             c2 = rooms[r2].get('center', (rooms[r2]['y'], rooms[r2]['x']))
             
             # 좁은 통로로 연결
-            cls._draw_narrow_corridor(m, c1, c2, s)
+            cls._draw_narrow_corridor(ctx, m, c1, c2, s)
         
         # 플랭크 경로: 사이트 주변 우회로
         flank_pairs = [
@@ -472,76 +481,78 @@ class ProceduralV3Template(MapTemplate):
             if r1 in rooms and r2 in rooms:
                 c1 = rooms[r1].get('center', (rooms[r1]['y'], rooms[r1]['x']))
                 c2 = rooms[r2].get('center', (rooms[r2]['y'], rooms[r2]['x']))
-                cls._draw_narrow_corridor(m, c1, c2, s)
+                cls._draw_narrow_corridor(ctx, m, c1, c2, s)
     
     @classmethod
-    def _draw_narrow_corridor(cls, m: np.ndarray, start: Tuple[int, int], 
+    def _draw_narrow_corridor(cls, ctx: GenerationContext, m: np.ndarray, start: Tuple[int, int], 
                                end: Tuple[int, int], s: int):
         """좁은 통로 (플랭크용)"""
-        width = cls._active_rules['corridor_min_width']
-        cls._draw_diagonal_corridor(m, start, end, s)
+        width = ctx.rules['corridor_min_width']
+        cls._draw_diagonal_corridor(ctx, m, start, end, s)
+    
+    # 4방향 이웃 (경계 판정용)
+    CROSS_4 = ndimage.generate_binary_structure(2, 1)
     
     @classmethod
-    def _apply_boundary_noise(cls, m: np.ndarray, s: int):
-        """경계에 노이즈 적용 (유기적 형태)"""
-        noise_level = cls._active_rules.get('corner_noise', 0.2)
+    def _apply_boundary_noise(cls, ctx: GenerationContext, m: np.ndarray, s: int):
+        """
+        경계에 노이즈 적용 (유기적 형태)
+        
+        경계 = 4방향 이웃에 VOID가 있는 FLOOR (맵 가장자리 1칸 제외).
+        경계 타일마다 noise_level * 0.3 확률로 제거, noise_level * 0.2 확률로
+        대각선 이웃 VOID 하나를 FLOOR로 추가 - 난수는 마스크 단위로 한 번에 생성.
+        """
+        noise_level = ctx.rules.get('corner_noise', 0.2)
         
         if noise_level <= 0:
             return
         
-        # 경계 타일 찾기
-        boundary_tiles = []
-        for y in range(1, s - 1):
-            for x in range(1, s - 1):
-                if m[y, x] == Tile.FLOOR:
-                    # 주변에 VOID가 있으면 경계
-                    neighbors = [m[y-1, x], m[y+1, x], m[y, x-1], m[y, x+1]]
-                    if Tile.VOID in neighbors:
-                        boundary_tiles.append((y, x))
-        
-        # 일부 경계 타일 제거/추가 (노이즈)
-        for y, x in boundary_tiles:
-            if np.random.random() < noise_level * 0.3:
-                # 랜덤하게 제거
-                m[y, x] = Tile.VOID
-            
-            # 또는 주변에 추가
-            if np.random.random() < noise_level * 0.2:
-                ny, nx = y + np.random.choice([-1, 1]), x + np.random.choice([-1, 1])
-                if 0 <= ny < s and 0 <= nx < s and m[ny, nx] == Tile.VOID:
-                    m[ny, nx] = Tile.FLOOR
+        # 경계 타일 찾기 (VOID를 4방향으로 팽창한 영역 ∩ FLOOR)
+        near_void = ndimage.binary_dilation(m == Tile.VOID, structure=cls.CROSS_4)
+        boundary = near_void & (m == Tile.FLOOR)
+        boundary[[0, -1], :] = False
+        boundary[:, [0, -1]] = False
+        
+        ys, xs = np.nonzero(boundary)
+        n = ys.size
+        if n == 0:
+            return
+        
+        remove = ctx.rng.random_sample(n) < noise_level * 0.3
+        grow = ctx.rng.random_sample(n) < noise_level * 0.2
+        dy, dx = ctx.rng.randint(0, 2, size=(2, n)) * 2 - 1
+        
+        # 일부 경계 타일 제거
+        m[ys[remove], xs[remove]] = Tile.VOID
+        
+        # 대각선 이웃에 추가 (가장자리 1칸 제외라 항상 맵 안)
+        gy, gx = ys[grow] + dy[grow], xs[grow] + dx[grow]
+        empty = m[gy, gx] == Tile.VOID
+        m[gy[empty], gx[empty]] = Tile.FLOOR
     
     @classmethod
-    def _validate_connectivity(cls, m: np.ndarray, rooms: dict, s: int):
-        """연결성 검증 및 수정"""
-        # 모든 방이 연결되어 있는지 확인
-        floor_tiles = set()
-        for y in range(s):
-            for x in range(s):
-                if m[y, x] == Tile.FLOOR:
-                    floor_tiles.add((y, x))
-        
-        if not floor_tiles:
+    def _validate_connectivity(cls, ctx: GenerationContext, m: np.ndarray, rooms: dict, s: int):
+        """
+        연결성 검증 및 수정
+        
+        FLOOR 연결 요소(4방향)를 라벨링하고 가장 큰 요소를 본체로 둔 뒤,
+        떨어진 요소마다 본체에 가장 가까운 타일 쌍을 찾아 통로 하나로 연결
+        """
+        labels, count = ndimage.label(m == Tile.FLOOR)
+        if count <= 1:
             return
         
-        # BFS로 연결된 타일 찾기
-        start = next(iter(floor_tiles))
-        visited = {start}
-        queue = deque([start])
-        
-        while queue:
-            cy, cx = queue.popleft()
-            for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                ny, nx = cy + dy, cx + dx
-                if (ny, nx) in floor_tiles and (ny, nx) not in visited:
-                    visited.add((ny, nx))
-                    queue.append((ny, nx))
-        
-        # 연결되지 않은 영역 연결
-        disconnected = floor_tiles - visited
-        if disconnected:
-            # 가장 가까운 연결된 타일과 연결
-            for dy, dx in disconnected:
-                closest = min(visited, key=lambda t: abs(t[0] - dy) + abs(t[1] - dx))
-                cls._draw_corridor_segment(m, (dy, dx), closest, 4, s)
-                visited.add((dy, dx))
+        sizes = np.bincount(labels.ravel())
+        sizes[0] = 0
+        main = int(np.argmax(sizes))
+        
+        # 모든 타일 → 본체의 가장 가까운 타일 (거리, 좌표)
+        dist, (near_y, near_x) = ndimage.distance_transform_edt(labels != main, return_indices=True)
+        
+        # 요소마다 본체와 가장 가까운 타일 한 개
+        others = [label for label in range(1, count + 1) if label != main]
+        positions = ndimage.minimum_position(dist, labels, others)
+        
+        for y, x in positions:
+            closest = (int(near_y[y, x]), int(near_x[y, x]))
+            cls._draw_corridor_segment(ctx, m, (int(y), int(x)), closest, 4, s)